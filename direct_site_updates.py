@@ -4,17 +4,40 @@ import os
 import re
 import smtplib
 import socket
+import threading
+import time as time_module
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime, time, timedelta
 from email.mime.text import MIMEText
-from email.utils import formataddr
+from email.utils import formataddr, parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import soupsieve
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from src.pattern_engine import UserPattern, compile_user_pattern, log_pattern_stats
+from src.sources.http_client import PooledHttpClient
+from src.sources.site_index import (
+    find_feed_links,
+    iso_to_date_text,
+    latest_children,
+    parse_index_document,
+    parse_robots_sitemaps,
+    robots_url,
+)
+from src.stores.list_page_cache import ListPageCache, content_hash
+from src.stores.search_cache_store import SearchCache
+from src.stores.seen_article_store import SeenArticleStore
+from src.stores.site_health_store import SiteHealthStore
+from src.stores.site_index_store import SiteIndexStore
 
 
 socket.setdefaulttimeout(12)
@@ -42,6 +65,47 @@ NOTION_DIRECT_SITES_ENABLED = os.getenv("NOTION_DIRECT_SITES_ENABLED", "false").
     "on",
 }
 SEARCH_API_KEY = os.getenv("SEARCH_API_KEY", "")
+SEARCH_API_ENDPOINT = os.getenv("SEARCH_API_ENDPOINT", "https://serpapi.com/search.json").strip()
+DIRECT_SITE_SEARCH_CACHE_TTL_HOURS = max(0, int(os.getenv("DIRECT_SITE_SEARCH_CACHE_TTL_HOURS", "20")))
+DIRECT_SITE_SEARCH_MONTHLY_BUDGET = max(0, int(os.getenv("DIRECT_SITE_SEARCH_MONTHLY_BUDGET", "0")))
+DIRECT_SITE_SEARCH_RUN_BUDGET = max(0, int(os.getenv("DIRECT_SITE_SEARCH_RUN_BUDGET", "0")))
+DIRECT_SITE_MAX_WORKERS = max(1, int(os.getenv("DIRECT_SITE_MAX_WORKERS", "4")))
+DIRECT_SITE_HTML_PARSER = os.getenv("DIRECT_SITE_HTML_PARSER", "auto").strip().lower() or "auto"
+DIRECT_SITE_SAVE_LIST_PAGES_DIR = os.getenv("DIRECT_SITE_SAVE_LIST_PAGES_DIR", "").strip()
+DIRECT_SITE_ENRICH_WORKERS = max(1, int(os.getenv("DIRECT_SITE_ENRICH_WORKERS", "4")))
+DIRECT_SITE_ARTICLE_TEXT_KB = max(1, int(os.getenv("DIRECT_SITE_ARTICLE_TEXT_KB", "64")))
+DIRECT_SITE_PER_HOST_CONCURRENCY = max(1, int(os.getenv("DIRECT_SITE_PER_HOST_CONCURRENCY", "2")))
+DIRECT_SITE_PER_HOST_DELAY_SECONDS = max(0.0, float(os.getenv("DIRECT_SITE_PER_HOST_DELAY_SECONDS", "0")))
+DIRECT_SITE_SITE_BUDGET_SECONDS = max(0.0, float(os.getenv("DIRECT_SITE_SITE_BUDGET_SECONDS", "180")))
+DIRECT_SITE_RUN_DEADLINE_SECONDS = max(0.0, float(os.getenv("DIRECT_SITE_RUN_DEADLINE_SECONDS", "900")))
+DIRECT_SITE_STATE_DIR = Path(os.getenv("DIRECT_SITE_STATE_DIR", "data/direct_site"))
+DIRECT_SITE_LIST_PAGE_CACHE = os.getenv("DIRECT_SITE_LIST_PAGE_CACHE", "true").strip().lower() in {"1", "true", "yes", "on"}
+DIRECT_SITE_LIST_PAGE_CACHE_TTL_DAYS = max(1, int(os.getenv("DIRECT_SITE_LIST_PAGE_CACHE_TTL_DAYS", "7")))
+DIRECT_SITE_SEEN_ARTICLES = os.getenv("DIRECT_SITE_SEEN_ARTICLES", "true").strip().lower() in {"1", "true", "yes", "on"}
+DIRECT_SITE_SEEN_ARTICLES_TTL_DAYS = max(1, int(os.getenv("DIRECT_SITE_SEEN_ARTICLES_TTL_DAYS", "30")))
+DIRECT_SITE_INDEX_TTL_DAYS = max(1, int(os.getenv("DIRECT_SITE_INDEX_TTL_DAYS", "7")))
+DIRECT_SITE_HEALTH = os.getenv("DIRECT_SITE_HEALTH", "true").strip().lower() in {"1", "true", "yes", "on"}
+DIRECT_SITE_BACKOFF_AFTER_FAILURES = max(1, int(os.getenv("DIRECT_SITE_BACKOFF_AFTER_FAILURES", "2")))
+DIRECT_SITE_BACKOFF_MAX_RUNS = max(1, int(os.getenv("DIRECT_SITE_BACKOFF_MAX_RUNS", "16")))
+INDEX_FETCH_MODES = {"sitemap", "auto"}
+MAX_INDEX_ENDPOINTS = 3
+MAX_CHILD_SITEMAPS = 2
+USER_PATTERN_FIELDS = (
+    "ArticleUrlPattern",
+    "ListDatePattern",
+    "ArticleDatePattern",
+    "IncludeTitlePattern",
+    "ExcludeTitlePattern",
+    "SearchUrlPattern",
+)
+LIST_EXTRACTION_FIELDS = (
+    "ArticleUrlPattern",
+    "ArticleLinkSelector",
+    "ListContainerSelector",
+    "ListDateSelector",
+    "ListDatePattern",
+    "NextPageSelector",
+)
 
 
 @dataclass
@@ -54,6 +118,133 @@ class SiteItem:
     date_source: str
 
 
+@dataclass(frozen=True)
+class SiteProfile:
+    """Compiled, read-only view of one watcher row; window bounds are filled by for_run()."""
+
+    site_name: str
+    timezone: ZoneInfo
+    granularity: str
+    target_date_mode: str
+    lookback_hours: int
+    article_url: Optional[UserPattern]
+    list_date: Optional[UserPattern]
+    article_date: Optional[UserPattern]
+    include_title: Optional[UserPattern]
+    exclude_title: Optional[UserPattern]
+    search_url: Optional[UserPattern]
+    list_container_selector: Optional[soupsieve.SoupSieve]
+    article_link_selector: Optional[soupsieve.SoupSieve]
+    list_date_selector: Optional[soupsieve.SoupSieve]
+    article_date_selector: Optional[soupsieve.SoupSieve]
+    next_page_selector: Optional[soupsieve.SoupSieve]
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+
+    def for_run(self, now_dt: datetime) -> "SiteProfile":
+        local_now = now_dt.astimezone(self.timezone)
+        if self.target_date_mode == "calendar_day":
+            today = datetime.combine(local_now.date(), time.min, tzinfo=self.timezone)
+            return replace(self, window_start=today - timedelta(days=1), window_end=today + timedelta(days=1, microseconds=-1))
+        return replace(self, window_start=local_now - timedelta(hours=self.lookback_hours), window_end=local_now)
+
+    def in_window(self, article_dt: datetime) -> bool:
+        return self.window_start <= article_dt <= self.window_end
+
+
+class HostThrottle:
+    """Per-host concurrency cap plus a minimum interval between request starts."""
+
+    def __init__(self, max_concurrency: int, min_interval: float) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_concurrency))
+        with semaphore:
+            if self.min_interval > 0:
+                with self._lock:
+                    start_at = max(time_module.monotonic(), self._next_start.get(host, 0.0))
+                    self._next_start[host] = start_at + self.min_interval
+                wait = start_at - time_module.monotonic()
+                if wait > 0:
+                    time_module.sleep(wait)
+            yield
+
+
+class SiteBudget:
+    """Time budget of one site, capped by the run deadline; checked between fetches, not during them."""
+
+    def __init__(self, seconds: float, run_deadline: Optional[float] = None) -> None:
+        self.seconds = seconds
+        self.started = time_module.monotonic()
+        limit = self.started + seconds if seconds > 0 else float("inf")
+        self.expires_at = min(limit, run_deadline) if run_deadline is not None else limit
+        self.exceeded_stage = ""
+
+    def exhausted(self, stage: str) -> bool:
+        """True once the budget is spent; the first stage that notices it is kept for reporting."""
+        if self.exceeded_stage:
+            return True
+        if time_module.monotonic() < self.expires_at:
+            return False
+        self.exceeded_stage = stage
+        return True
+
+    def elapsed(self) -> float:
+        return time_module.monotonic() - self.started
+
+
+HOST_THROTTLE = HostThrottle(DIRECT_SITE_PER_HOST_CONCURRENCY, DIRECT_SITE_PER_HOST_DELAY_SECONDS)
+HTTP_CLIENT = PooledHttpClient(pool_maxsize=DIRECT_SITE_PER_HOST_CONCURRENCY, timeout=12)
+
+
+@dataclass
+class CrawlState:
+    """Run-to-run stores; left empty (no persistence) unless main() opens them."""
+
+    list_pages: Optional[ListPageCache] = None
+    seen_articles: Optional[SeenArticleStore] = None
+    search_cache: Optional[SearchCache] = None
+    site_index: Optional[SiteIndexStore] = None
+    site_health: Optional[SiteHealthStore] = None
+
+    def open(self, state_dir: Path) -> None:
+        if DIRECT_SITE_LIST_PAGE_CACHE:
+            self.list_pages = ListPageCache(str(state_dir / "list_page_cache.json"), ttl_days=DIRECT_SITE_LIST_PAGE_CACHE_TTL_DAYS)
+        if DIRECT_SITE_SEEN_ARTICLES:
+            self.seen_articles = SeenArticleStore(str(state_dir / "seen_articles.json"), ttl_days=DIRECT_SITE_SEEN_ARTICLES_TTL_DAYS)
+        self.search_cache = SearchCache(str(state_dir / "search_cache.json"), ttl_hours=DIRECT_SITE_SEARCH_CACHE_TTL_HOURS)
+        self.site_index = SiteIndexStore(str(state_dir / "site_index.json"), ttl_days=DIRECT_SITE_INDEX_TTL_DAYS)
+        if DIRECT_SITE_HEALTH:
+            self.site_health = SiteHealthStore(
+                str(state_dir / "site_health.json"),
+                fail_threshold=DIRECT_SITE_BACKOFF_AFTER_FAILURES,
+                max_skip_runs=DIRECT_SITE_BACKOFF_MAX_RUNS,
+            )
+
+    def save(self, now_dt: Optional[datetime] = None) -> None:
+        if self.list_pages is not None:
+            self.list_pages.save(now_dt)
+        if self.seen_articles is not None:
+            self.seen_articles.save(now_dt)
+        if self.search_cache is not None:
+            self.search_cache.save(now_dt)
+        if self.site_index is not None:
+            self.site_index.save(now_dt)
+        if self.site_health is not None:
+            self.site_health.save(now_dt)
+
+
+CRAWL_STATE = CrawlState()
+
+
 def parse_recipients(raw: str) -> List[str]:
     if not raw:
         return []
@@ -156,6 +347,8 @@ def normalize_site_row(raw: Dict[str, Any]) -> Dict[str, Any]:
         "TargetDateMode": str(raw.get("TargetDateMode", "rolling_24h")).strip().lower() or "rolling_24h",
         "LookbackHours": max(1, _safe_int(raw.get("LookbackHours"), 24)),
         "MaxPages": max(1, _safe_int(raw.get("MaxPages"), 1)),
+        "TimeBudgetSeconds": max(0, _safe_int(raw.get("TimeBudgetSeconds"), 0)),
+        "StopPagingOutOfWindow": bool(raw.get("StopPagingOutOfWindow", False)),
         "ListContainerSelector": str(raw.get("ListContainerSelector", "")).strip(),
         "ArticleLinkSelector": str(raw.get("ArticleLinkSelector", "")).strip(),
         "ListDateSelector": str(raw.get("ListDateSelector", "")).strip(),
@@ -166,13 +359,58 @@ def normalize_site_row(raw: Dict[str, Any]) -> Dict[str, Any]:
         "FetchMode": str(raw.get("FetchMode", "")).strip().lower() or "direct",
         "SearchQuery": str(raw.get("SearchQuery", "")).strip(),
         "SearchUrlPattern": str(raw.get("SearchUrlPattern", "")).strip(),
+        "SearchPriority": str(raw.get("SearchPriority", "")).strip().lower(),
         "FetchArticleBody": bool(raw.get("FetchArticleBody", True)),
+        "DateFromHeaders": bool(raw.get("DateFromHeaders", False)),
         "DateFallbackMode": str(raw.get("DateFallbackMode", "")).strip().lower() or "require_date",
     }
+    if row["SearchPriority"] not in {"high", "low"}:
+        row["SearchPriority"] = "high" if row["FetchMode"] == "search_only" else "low"
     row["timezone"] = _safe_tz(row["DateTimezone"])
+    row["profile"] = build_site_profile(row)
     return row
 
 
+@lru_cache(maxsize=None)
+def compile_css_selector(selector: str) -> Optional[soupsieve.SoupSieve]:
+    if not selector:
+        return None
+    try:
+        return soupsieve.compile(selector)
+    except Exception as exc:
+        logging.warning("css selector disabled selector=%s error=%s", selector, exc)
+        return None
+
+
+def build_site_profile(row: Dict[str, Any]) -> SiteProfile:
+    patterns = {
+        key: compile_user_pattern(row[key], label=f"{row['SiteName']}.{key}") if row.get(key) else None
+        for key in USER_PATTERN_FIELDS
+    }
+    return SiteProfile(
+        site_name=row["SiteName"],
+        timezone=row.get("timezone") or _safe_tz(row.get("DateTimezone", "Asia/Tokyo")),
+        granularity=row["DateGranularity"],
+        target_date_mode=row["TargetDateMode"],
+        lookback_hours=row["LookbackHours"],
+        article_url=patterns["ArticleUrlPattern"],
+        list_date=patterns["ListDatePattern"],
+        article_date=patterns["ArticleDatePattern"],
+        include_title=patterns["IncludeTitlePattern"],
+        exclude_title=patterns["ExcludeTitlePattern"],
+        search_url=patterns["SearchUrlPattern"],
+        list_container_selector=compile_css_selector(row["ListContainerSelector"]),
+        article_link_selector=compile_css_selector(row["ArticleLinkSelector"]),
+        list_date_selector=compile_css_selector(row["ListDateSelector"]),
+        article_date_selector=compile_css_selector(row["ArticleDateSelector"]),
+        next_page_selector=compile_css_selector(row["NextPageSelector"]),
+    )
+
+
+def site_profile(cfg: Dict[str, Any]) -> SiteProfile:
+    return cfg.get("profile") or build_site_profile(cfg)
+
+
 def load_sites_from_notion() -> List[Dict[str, Any]]:
     if not (NOTION_DIRECT_SITES_ENABLED and NOTION_TOKEN and NOTION_DIRECT_SITES_DB_ID):
         raise RuntimeError("notion_disabled_or_missing_credentials")
@@ -214,6 +452,8 @@ def load_sites_from_notion() -> List[Dict[str, Any]]:
                 "TargetDateMode": extract_notion_prop(props.get("TargetDateMode")),
                 "LookbackHours": extract_notion_prop(props.get("LookbackHours")),
                 "MaxPages": extract_notion_prop(props.get("MaxPages")),
+                "TimeBudgetSeconds": extract_notion_prop(props.get("TimeBudgetSeconds")),
+                "StopPagingOutOfWindow": extract_notion_prop(props.get("StopPagingOutOfWindow")),
                 "ListContainerSelector": extract_notion_prop(props.get("ListContainerSelector")),
                 "ArticleLinkSelector": extract_notion_prop(props.get("ArticleLinkSelector")),
                 "ListDateSelector": extract_notion_prop(props.get("ListDateSelector")),
@@ -224,7 +464,9 @@ def load_sites_from_notion() -> List[Dict[str, Any]]:
                 "FetchMode": extract_notion_prop(props.get("FetchMode")),
                 "SearchQuery": extract_notion_prop(props.get("SearchQuery")),
                 "SearchUrlPattern": extract_notion_prop(props.get("SearchUrlPattern")),
+                "SearchPriority": extract_notion_prop(props.get("SearchPriority")),
                 "FetchArticleBody": extract_notion_prop(props.get("FetchArticleBody")),
+                "DateFromHeaders": extract_notion_prop(props.get("DateFromHeaders")),
                 "DateFallbackMode": extract_notion_prop(props.get("DateFallbackMode")),
             }
             rows.append(normalize_site_row(row))
@@ -266,26 +508,122 @@ def build_request_headers(url: str) -> Dict[str, str]:
         ),
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.9,ja;q=0.8",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
     }
     if origin:
         headers["Referer"] = f"{origin}/"
     return headers
 
 
-def fetch_html(url: str) -> Tuple[str, int, str]:
-    request = urllib.request.Request(url, headers=build_request_headers(url))
-    with urllib.request.urlopen(request, timeout=12) as response:
-        status = getattr(response, "status", 200)
-        charset = response.headers.get_content_charset() or "utf-8"
-        raw = response.read()
-        final_url = response.geturl()
-    try:
-        html = raw.decode(charset, errors="replace")
-    except Exception:
-        html = raw.decode("utf-8", errors="replace")
-    return html, status, final_url
+def fetch_html(
+    url: str,
+    validators: Optional[Dict[str, str]] = None,
+    until: Optional[Callable[[str], bool]] = None,
+) -> Tuple[str, int, str]:
+    # validators を渡すと条件付き GET になり、未変更なら本文なしの 304 を返す。
+    # 応答の ETag / Last-Modified は同じ dict に書き戻す。
+    # until を渡すと本文を少しずつ読み、until(ここまでの HTML) が True になった時点で読むのをやめる。
+    headers = build_request_headers(url)
+    if validators is not None:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    with HOST_THROTTLE.slot(url):
+        result = HTTP_CLIENT.get(url, headers) if until is None else HTTP_CLIENT.get_prefix(url, headers, until)
+    if result.status == 304 and validators is not None:
+        return "", 304, url
+    if result.status >= 400:
+        raise urllib.error.HTTPError(result.final_url, result.status, f"HTTP {result.status}", None, None)
+    if validators is not None:
+        validators["etag"] = result.headers.get("ETag", "") or ""
+        validators["last_modified"] = result.headers.get("Last-Modified", "") or ""
+    return result.text, result.status, result.final_url
+
+
+def fetch_headers(url: str) -> Tuple[int, Mapping[str, str], str]:
+    headers = build_request_headers(url)
+    with HOST_THROTTLE.slot(url):
+        result = HTTP_CLIENT.head(url, headers)
+        if result.status in {405, 501}:
+            # HEAD に対応していないサーバーには GET を送り、最初のチャンクで接続を閉じる。
+            result = HTTP_CLIENT.get_prefix(url, headers, lambda _: True, first_chunk_bytes=1)
+    if result.status >= 400:
+        raise urllib.error.HTTPError(result.final_url, result.status, f"HTTP {result.status}", None, None)
+    return result.status, result.headers, result.final_url
+
+
+def log_site_health() -> None:
+    health = CRAWL_STATE.site_health
+    if health is None:
+        return
+    backed_off = health.backed_off()
+    logging.info("direct-site health backed_off_count=%s sites=%s", len(backed_off), list(backed_off))
+    lines = []
+    for site, entry in backed_off.items():
+        logging.info(
+            "direct-site health backed_off site=%s skipped_this_run=%s skip_runs_remaining=%s consecutive_failures=%s last_status=%s last_success_at=%s error_rate=%s latency_ms=%s",
+            site,
+            site in health.skipped_this_run,
+            entry.get("skip_runs_remaining"),
+            entry.get("consecutive_failures"),
+            entry.get("last_status"),
+            entry.get("last_success_at") or "never",
+            entry.get("error_rate"),
+            entry.get("latency_ms"),
+        )
+        lines.append(
+            f"| {site} | {entry.get('last_status')} | {entry.get('consecutive_failures')} | "
+            f"{entry.get('skip_runs_remaining')} | {entry.get('last_success_at') or 'never'} |"
+        )
+    summary_path = os.getenv("GITHUB_STEP_SUMMARY", "").strip()
+    if summary_path and lines:
+        header = "### direct-site backed-off sites\n\n| site | last status | consecutive failures | runs to skip | last success |\n|---|---|---|---|---|\n"
+        with open(summary_path, "a", encoding="utf-8") as fh:
+            fh.write(header + "\n".join(lines) + "\n")
+
+
+def log_http_stats() -> None:
+    for host, s in sorted(HTTP_CLIENT.stats_snapshot().items(), key=lambda kv: -kv[1].total_ms):
+        logging.info(
+            "direct-site http host=%s requests=%s errors=%s wire_bytes=%s body_bytes=%s total_ms=%.0f avg_ms=%.0f max_ms=%.0f",
+            host,
+            s.requests,
+            s.errors,
+            s.wire_bytes,
+            s.body_bytes,
+            s.total_ms,
+            s.total_ms / s.requests if s.requests else 0,
+            s.max_ms,
+        )
+
+
+def resolve_html_parser(preferred: str = DIRECT_SITE_HTML_PARSER) -> str:
+    # lxml は C 実装で html.parser より速い。未インストールなら html.parser に戻す。
+    candidates = ["lxml", "html.parser"] if preferred == "auto" else [preferred, "html.parser"]
+    for name in candidates:
+        if builder_registry.lookup(name) is not None:
+            return name
+    return "html.parser"
+
+
+HTML_PARSER = resolve_html_parser()
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def save_list_page(html: str, site_name: str, url: str) -> None:
+    if not DIRECT_SITE_SAVE_LIST_PAGES_DIR:
+        return
+    out_dir = Path(DIRECT_SITE_SAVE_LIST_PAGES_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^0-9A-Za-z]+", "_", f"{site_name}_{urllib.parse.urlsplit(url).path}").strip("_")[:120]
+    (out_dir / f"{slug or 'page'}.html").write_text(html, encoding="utf-8")
+
+
+def list_extraction_fingerprint(cfg: Dict[str, Any]) -> str:
+    return content_hash([cfg.get(key, "") for key in LIST_EXTRACTION_FIELDS])
 
 
 def normalize_url(url: str) -> str:
@@ -298,17 +636,17 @@ def normalize_url(url: str) -> str:
     return urllib.parse.urlunsplit((scheme, netloc, path.rstrip("/") or "/", query, ""))
 
 
-def _find_text_by_selector(node: BeautifulSoup, selector: str) -> str:
-    if not selector:
+def _find_text_by_selector(node: BeautifulSoup, selector: Optional[soupsieve.SoupSieve]) -> str:
+    if selector is None:
         return ""
-    found = node.select_one(selector)
+    found = selector.select_one(node)
     return found.get_text(" ", strip=True) if found else ""
 
 
-def _extract_date_by_regex(text: str, pattern: str) -> str:
-    if not text or not pattern:
+def _extract_date_by_regex(text: str, pattern: Optional[UserPattern]) -> str:
+    if not text or pattern is None:
         return ""
-    m = re.search(pattern, text)
+    m = pattern.search(text)
     return m.group(0).strip() if m else ""
 
 
@@ -369,32 +707,39 @@ def parse_date_text(raw_text: str, tz: ZoneInfo, granularity: str) -> Optional[d
 
 
 def is_in_window(article_dt: datetime, cfg: Dict[str, Any], now_dt: datetime) -> bool:
-    mode = cfg["TargetDateMode"]
-    if mode == "calendar_day":
-        today = now_dt.astimezone(cfg["timezone"]).date()
-        return article_dt.astimezone(cfg["timezone"]).date() in {today, today - timedelta(days=1)}
-    start = now_dt.astimezone(cfg["timezone"]) - timedelta(hours=cfg["LookbackHours"])
-    return start <= article_dt.astimezone(cfg["timezone"]) <= now_dt.astimezone(cfg["timezone"])
+    return site_profile(cfg).for_run(now_dt).in_window(article_dt)
 
 
-def passes_title_filter(title: str, cfg: Dict[str, Any]) -> Tuple[bool, str]:
-    if cfg["IncludeTitlePattern"] and not re.search(cfg["IncludeTitlePattern"], title):
+def passes_title_filter(title: str, cfg: Union[Dict[str, Any], SiteProfile]) -> Tuple[bool, str]:
+    profile = cfg if isinstance(cfg, SiteProfile) else site_profile(cfg)
+    if profile.include_title and not profile.include_title.search(title):
         return False, "include_pattern_not_matched"
-    if cfg["ExcludeTitlePattern"] and re.search(cfg["ExcludeTitlePattern"], title):
+    if profile.exclude_title and profile.exclude_title.search(title):
         return False, "exclude_pattern_matched"
     return True, "accepted"
 
 
-def find_next_page_url(soup: BeautifulSoup, current_url: str, selector: str) -> Optional[str]:
-    if selector:
-        node = soup.select_one(selector)
+NEXT_LINK_SELECTOR = soupsieve.compile("a[rel='next'], a.next, a.pagination-next")
+ANCHOR_SELECTOR = soupsieve.compile("a")
+ANCHOR_WITH_HREF_SELECTOR = soupsieve.compile("a[href]")
+
+
+def find_next_page_url(
+    soup: BeautifulSoup,
+    current_url: str,
+    selector: Union[str, soupsieve.SoupSieve, None],
+) -> Optional[str]:
+    if isinstance(selector, str):
+        selector = compile_css_selector(selector)
+    if selector is not None:
+        node = selector.select_one(soup)
         if node and node.get("href"):
             return urllib.parse.urljoin(current_url, node.get("href"))
-    for node in soup.select("a[rel='next'], a.next, a.pagination-next"):
+    for node in NEXT_LINK_SELECTOR.select(soup):
         href = node.get("href")
         if href:
             return urllib.parse.urljoin(current_url, href)
-    for node in soup.select("a"):
+    for node in ANCHOR_SELECTOR.select(soup):
         label = node.get_text(" ", strip=True).lower()
         if label in {"next", "next >", ">", "older"} and node.get("href"):
             return urllib.parse.urljoin(current_url, node.get("href"))
@@ -402,20 +747,31 @@ def find_next_page_url(soup: BeautifulSoup, current_url: str, selector: str) ->
 
 
 def extract_candidates_from_list_page(
-    html: str,
+    document: Union[str, BeautifulSoup],
     page_url: str,
     cfg: Dict[str, Any],
 ) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = parse_html(document) if isinstance(document, str) else document
+    profile = site_profile(cfg)
     raw_pattern = str(cfg.get("ArticleUrlPattern", ""))
     normalized_pattern = normalize_article_url_pattern(raw_pattern)
-    anchors = soup.select(cfg["ArticleLinkSelector"]) if cfg["ArticleLinkSelector"] else soup.select("a[href]")
+    url_pattern = profile.article_url
+    link_selector = profile.article_link_selector or ANCHOR_WITH_HREF_SELECTOR
+    containers = profile.list_container_selector.select(soup) if profile.list_container_selector else []
+    if profile.list_container_selector and not containers:
+        logging.warning("site name=%s list container selector matched nothing selector=%s", cfg["SiteName"], cfg["ListContainerSelector"])
+    # ListContainerSelector があれば記事ごとの枠の中でリンク・日付を探し、なければ従来どおりアンカーの親要素を使う。
+    if containers:
+        pairs = [(a, box) for box in containers for a in link_selector.select(box)]
+    else:
+        pairs = [(a, a.parent) for a in link_selector.select(soup)]
+    block_texts: Dict[int, str] = {}
     href_samples: List[str] = []
     absolute_samples: List[str] = []
     total_with_href = 0
     seen = set()
     out: List[Dict[str, Any]] = []
-    for a in anchors:
+    for a, box in pairs:
         href = (a.get("href") or "").strip()
         if not href:
             continue
@@ -425,39 +781,42 @@ def extract_candidates_from_list_page(
         absolute_url = urllib.parse.urljoin(page_url, href)
         if len(absolute_samples) < 10:
             absolute_samples.append(absolute_url)
-        if normalized_pattern and not (
-            re.search(normalized_pattern, absolute_url) or re.search(normalized_pattern, href)
-        ):
+        if url_pattern and not (url_pattern.search(absolute_url) or url_pattern.search(href)):
             continue
         normalized = normalize_url(absolute_url)
         if normalized in seen:
             continue
-        seen.add(normalized)
         title = a.get_text(" ", strip=True) or (a.get("title") or "").strip()
+        if containers and not title:
+            # 画像リンクなど文字のないアンカーは飛ばし、同じ枠のテキストリンクを使う。
+            continue
+        seen.add(normalized)
         if not title:
             continue
 
         date_text = ""
         date_source = "failed"
-        if cfg["ListDateSelector"]:
-            container = a
-            date_text = _find_text_by_selector(container, cfg["ListDateSelector"]) if container else ""
+        if profile.list_date_selector:
+            date_text = _find_text_by_selector(box if containers else a, profile.list_date_selector)
             if date_text:
                 date_source = "list_selector"
-        if not date_text and cfg["ListDatePattern"]:
-            block = a.parent.get_text(" ", strip=True) if a.parent else ""
-            date_text = _extract_date_by_regex(block, cfg["ListDatePattern"])
+        if not date_text and profile.list_date and box is not None:
+            # 多数のアンカーが同じ親要素を共有する一覧でも、要素ごとのテキスト化は 1 回にする。
+            if id(box) not in block_texts:
+                block_texts[id(box)] = box.get_text(" ", strip=True)
+            date_text = _extract_date_by_regex(block_texts[id(box)], profile.list_date)
             if date_text:
                 date_source = "list_regex"
 
         out.append({"title": title, "url": absolute_url, "date_text": date_text, "date_source": date_source})
     logging.info(
-        "site name=%s raw ArticleUrlPattern=%s normalized ArticleUrlPattern=%s extracted links count=%s selector=%s a_href_total=%s href_samples=%s absolute_samples=%s",
+        "site name=%s raw ArticleUrlPattern=%s normalized ArticleUrlPattern=%s extracted links count=%s selector=%s containers=%s a_href_total=%s href_samples=%s absolute_samples=%s",
         cfg["SiteName"],
         raw_pattern or "(empty)",
         normalized_pattern or "(empty)",
         len(out),
         cfg["ArticleLinkSelector"] or "(default a[href])",
+        len(containers) if containers else "(none)",
         total_with_href,
         href_samples,
         absolute_samples,
@@ -465,11 +824,122 @@ def extract_candidates_from_list_page(
     return out
 
 
+ARTICLE_META_DATE_SELECTOR = soupsieve.compile(
+    "meta[property='article:published_time'], meta[itemprop='datePublished'], "
+    "meta[name='pubdate'], meta[name='publishdate'], meta[name='date']"
+)
+JSON_LD_SELECTOR = soupsieve.compile("script[type='application/ld+json']")
+# 途中まで読んだ本文の末尾は日付が途切れている可能性があるため、確定前は検索対象から外す。
+PARTIAL_TEXT_MARGIN = 256
+HEADER_DATE_MIN_AGE_SECONDS = 60
+
+
+def _json_ld_date(data: Any) -> str:
+    if isinstance(data, list):
+        return next((v for v in (_json_ld_date(item) for item in data) if v), "")
+    if isinstance(data, dict):
+        if data.get("datePublished"):
+            return str(data["datePublished"])
+        return _json_ld_date(data.get("@graph", []))
+    return ""
+
+
+def _find_meta_date(soup: BeautifulSoup, tz: ZoneInfo) -> str:
+    node = ARTICLE_META_DATE_SELECTOR.select_one(soup)
+    values = [node.get("content") or ""] if node else []
+    for script in JSON_LD_SELECTOR.select(soup):
+        try:
+            values.append(_json_ld_date(json.loads(script.string or "")))
+        except ValueError:
+            continue
+    return next((text for text in (iso_to_date_text(v, tz) for v in values) if text), "")
+
+
+def find_article_date(html: str, profile: SiteProfile, complete: bool = True) -> Tuple[str, str, bool]:
+    """Return (date_text, date_source, settled); settled means reading more of the page cannot change the result."""
+    soup = parse_html(html)
+    if profile.article_date_selector:
+        text = _find_text_by_selector(soup, profile.article_date_selector)
+        if text and (complete or parse_date_text(text, profile.timezone, profile.granularity)):
+            return text, "article_selector", True
+        if not complete:
+            return "", "failed", False
+    limit = DIRECT_SITE_ARTICLE_TEXT_KB * 1024
+    if profile.article_date:
+        body_text = (soup.body or soup).get_text(" ", strip=True)
+        settled = complete or len(body_text) >= limit + PARTIAL_TEXT_MARGIN
+        searchable = body_text[:limit] if settled else body_text[: max(0, len(body_text) - PARTIAL_TEXT_MARGIN)]
+        text = _extract_date_by_regex(searchable, profile.article_date)
+        if text:
+            return text, "article_regex", True
+    else:
+        settled = complete or soup.body is not None
+    if not settled:
+        return "", "failed", False
+    meta = _find_meta_date(soup, profile.timezone)
+    return (meta, "article_meta", True) if meta else ("", "failed", True)
+
+
+def _http_date(value: str) -> Optional[datetime]:
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=ZoneInfo("UTC"))
+
+
+def header_date_text(headers: Mapping[str, str], tz: ZoneInfo) -> Tuple[str, str]:
+    """Return (date_text, result) from Last-Modified; result explains an empty date_text."""
+    modified = _http_date(headers.get("Last-Modified") or "")
+    if modified is None:
+        return "", "no_last_modified"
+    served = _http_date(headers.get("Date") or "")
+    # 応答時刻とほぼ同じ Last-Modified は動的生成ページの値なので公開日時には使わない。
+    if served is not None and (served - modified).total_seconds() < HEADER_DATE_MIN_AGE_SECONDS:
+        return "", "dynamic_last_modified"
+    return modified.astimezone(tz).strftime("%Y/%m/%d %H:%M"), "last_modified"
+
+
+def probe_article_date(candidate: Dict[str, Any], cfg: Dict[str, Any]) -> bool:
+    started = time_module.monotonic()
+    status: Union[int, str] = "error"
+    try:
+        status, headers, _ = fetch_headers(candidate["url"])
+        date_text, result = header_date_text(headers, site_profile(cfg).timezone)
+    except Exception as exc:
+        date_text, result = "", f"error:{type(exc).__name__}"
+    logging.info(
+        "site name=%s header probe url=%s status=%s result=%s elapsed_ms=%.0f",
+        cfg["SiteName"],
+        candidate["url"],
+        status,
+        result,
+        (time_module.monotonic() - started) * 1000,
+    )
+    if not date_text:
+        return False
+    candidate["date_text"] = date_text
+    candidate["date_source"] = "last_modified"
+    return True
+
+
 def enrich_date_from_article(candidate: Dict[str, Any], cfg: Dict[str, Any]) -> Dict[str, Any]:
     if not cfg.get("FetchArticleBody", True):
         return candidate
+    # DateFromHeaders のサイトは Last-Modified を公開日時として扱い、取れたら本文を取得しない。
+    if cfg.get("DateFromHeaders") and probe_article_date(candidate, cfg):
+        candidate["date_checked"] = True
+        return candidate
+    profile = site_profile(cfg)
+    found: Dict[str, Any] = {}
+
+    def date_settled(prefix: str) -> bool:
+        date_text, source, settled = find_article_date(prefix, profile, complete=False)
+        found.update(date_text=date_text, date_source=source, settled=settled)
+        return settled
+
     try:
-        html, status, _ = fetch_html(candidate["url"])
+        html, status, _ = fetch_html(candidate["url"], None, date_settled)
         logging.info(
             "site name=%s fetched article url=%s status=%s",
             cfg["SiteName"],
@@ -489,23 +959,106 @@ def enrich_date_from_article(candidate: Dict[str, Any], cfg: Dict[str, Any]) ->
     except Exception as exc:
         logging.warning("site name=%s article fetch error url=%s error=%s", cfg["SiteName"], candidate["url"], exc)
         return candidate
-    soup = BeautifulSoup(html, "html.parser")
-    date_text = ""
-    source = "failed"
-    if cfg["ArticleDateSelector"]:
-        date_text = _find_text_by_selector(soup, cfg["ArticleDateSelector"])
-        if date_text:
-            source = "article_selector"
-    if not date_text and cfg["ArticleDatePattern"]:
-        date_text = _extract_date_by_regex(soup.get_text(" ", strip=True), cfg["ArticleDatePattern"])
-        if date_text:
-            source = "article_regex"
+    if found.get("date_text") or found.get("settled"):
+        date_text, source = found.get("date_text", ""), found.get("date_source", "failed")
+    else:
+        date_text, source, _ = find_article_date(html, profile, complete=True)
+    candidate["date_checked"] = True
     if date_text:
         candidate["date_text"] = date_text
         candidate["date_source"] = source
     return candidate
 
 
+def enrich_dates_from_articles(
+    candidates: Sequence[Dict[str, Any]],
+    cfg: Dict[str, Any],
+    budget: Optional[SiteBudget] = None,
+) -> None:
+    if not candidates or not cfg.get("FetchArticleBody", True):
+        return
+
+    def enrich(cand: Dict[str, Any]) -> Dict[str, Any]:
+        # 予算切れ後は未着手の記事を取りに行かない（取得中のものは最後まで待つ）。
+        if budget is not None and budget.exhausted("article"):
+            return cand
+        return enrich_date_from_article(cand, cfg)
+
+    workers = min(DIRECT_SITE_ENRICH_WORKERS, len(candidates))
+    if workers <= 1:
+        for cand in candidates:
+            enrich(cand)
+        return
+    started = time_module.monotonic()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="direct-site-enrich") as pool:
+        list(pool.map(enrich, candidates))
+    logging.info(
+        "site name=%s enriched articles count=%s workers=%s elapsed_seconds=%.1f",
+        cfg["SiteName"],
+        len(candidates),
+        workers,
+        time_module.monotonic() - started,
+    )
+
+
+def _call_search_api(cfg: Dict[str, Any], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    url = SEARCH_API_ENDPOINT + "?" + urllib.parse.urlencode({**params, "api_key": SEARCH_API_KEY})
+    try:
+        with HOST_THROTTLE.slot(url), urllib.request.urlopen(url, timeout=12) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except Exception as exc:
+        logging.warning("site name=%s search failed query=%s error=%s", cfg["SiteName"], params["q"], exc)
+        return None
+
+
+def fetch_search_payload(cfg: Dict[str, Any], params: Dict[str, Any], now_dt: datetime) -> Optional[Dict[str, Any]]:
+    cache = CRAWL_STATE.search_cache
+    if cache is None:
+        return _call_search_api(cfg, params)
+    key = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    # 同じクエリを同時に投げないよう、キーごとに直列化してから実行中の結果・保存済み結果を確認する。
+    with cache.key_lock(key):
+        payload, source = cache.lookup(key, now_dt)
+        if payload is not None:
+            logging.info("site name=%s search served from=%s query=%s", cfg["SiteName"], source, params["q"])
+            return payload
+        if cache.budget_exhausted(now_dt, DIRECT_SITE_SEARCH_MONTHLY_BUDGET, DIRECT_SITE_SEARCH_RUN_BUDGET):
+            if cfg["SearchPriority"] != "high":
+                cache.count_budget_skip()
+                payload = cache.stale(key)
+                logging.warning(
+                    "site name=%s search skipped reason=budget_exhausted priority=%s query=%s stale_cache=%s",
+                    cfg["SiteName"],
+                    cfg["SearchPriority"],
+                    params["q"],
+                    payload is not None,
+                )
+                return payload
+            logging.warning("site name=%s search over budget priority=high query=%s", cfg["SiteName"], params["q"])
+        payload = _call_search_api(cfg, params)
+        if payload is not None:
+            cache.count_call(now_dt)
+            cache.put(key, payload, now_dt)
+        return payload
+
+
+def log_search_stats(now_dt: datetime) -> None:
+    cache = CRAWL_STATE.search_cache
+    if cache is None:
+        return
+    logging.info(
+        "direct-site search calls run=%s month=%s monthly_budget=%s run_budget=%s cache_hits=%s run_dedupe_hits=%s budget_skips=%s stale_served=%s",
+        cache.run_calls,
+        cache.month_calls(now_dt),
+        DIRECT_SITE_SEARCH_MONTHLY_BUDGET or "unlimited",
+        DIRECT_SITE_SEARCH_RUN_BUDGET or "unlimited",
+        cache.counters["cache_hits"],
+        cache.counters["run_dedupe_hits"],
+        cache.counters["budget_skips"],
+        cache.counters["stale_served"],
+    )
+
+
 def search_candidates(cfg: Dict[str, Any], now_dt: datetime) -> List[Dict[str, Any]]:
     query = cfg.get("SearchQuery", "").strip()
     if not query:
@@ -514,24 +1067,20 @@ def search_candidates(cfg: Dict[str, Any], now_dt: datetime) -> List[Dict[str, A
     if not SEARCH_API_KEY:
         logging.warning("site name=%s search skipped reason=missing_search_api_key", cfg["SiteName"])
         return []
-    url = "https://serpapi.com/search.json?" + urllib.parse.urlencode(
-        {"engine": "google", "q": query, "api_key": SEARCH_API_KEY, "num": cfg["MaxItemsPerSite"]}
-    )
-    try:
-        with urllib.request.urlopen(url, timeout=12) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except Exception as exc:
-        logging.warning("site name=%s search failed query=%s error=%s", cfg["SiteName"], query, exc)
+    params = {"engine": "google", "q": query, "num": cfg["MaxItemsPerSite"]}
+    payload = fetch_search_payload(cfg, params, now_dt)
+    if payload is None:
         return []
 
     accepted: List[Dict[str, Any]] = []
     pattern = cfg.get("SearchUrlPattern", "").strip()
+    url_pattern = site_profile(cfg).search_url
     for item in payload.get("organic_results", []):
         link = str(item.get("link", "")).strip()
         title = str(item.get("title", "")).strip()
         if not link or not title:
             continue
-        if pattern and not re.search(pattern, link):
+        if url_pattern and not url_pattern.search(link):
             continue
         accepted.append(
             {
@@ -561,7 +1110,7 @@ def search_candidates(cfg: Dict[str, Any], now_dt: datetime) -> List[Dict[str, A
     return accepted
 
 
-def collect_site_items(cfg: Dict[str, Any], now_dt: datetime) -> List[SiteItem]:
+def collect_site_items(cfg: Dict[str, Any], now_dt: datetime, budget: Optional[SiteBudget] = None) -> List[SiteItem]:
     if not cfg["Enabled"]:
         logging.info("site name=%s skipped reason=disabled", cfg["SiteName"])
         return []
@@ -574,55 +1123,57 @@ def collect_site_items(cfg: Dict[str, Any], now_dt: datetime) -> List[SiteItem]:
     should_try_search = fetch_mode == "search_only"
     direct_status = "not_attempted"
     direct_links = 0
+    fingerprint = list_extraction_fingerprint(cfg)
+    profile = site_profile(cfg).for_run(now_dt)
+    seen_store = CRAWL_STATE.seen_articles
+    health = CRAWL_STATE.site_health
+    started = time_module.monotonic()
+
+    def process_candidates(candidates: List[Dict[str, Any]]) -> Optional[datetime]:
+        """Filter, date and accept candidates in order; return the newest non-fallback date seen."""
+        prepared: List[Tuple[Dict[str, Any], str, Optional[datetime], Optional[Dict[str, Any]]]] = []
+        page_newest: Optional[datetime] = None
+        for cand in candidates:
+            normalized_url = normalize_url(cand["url"])
+            if normalized_url in site_seen_urls:
+                logging.info("site name=%s skipped reason=site_url_duplicate url=%s", cfg["SiteName"], cand["url"])
+                continue
 
-    logging.info("site name=%s configured_url_count=%s configured_urls=%s", cfg["SiteName"], len(cfg["ListPageUrls"]), cfg["ListPageUrls"])
-    for list_url in (cfg["ListPageUrls"] if should_try_direct else []):
-        current_url = list_url
-        for _ in range(cfg["MaxPages"]):
-            if current_url in pages_visited:
-                break
-            pages_visited.add(current_url)
-            try:
-                html, status, final_url = fetch_html(current_url)
-                logging.info("site name=%s fetched list url=%s status=%s", cfg["SiteName"], current_url, status)
-                direct_status = str(status)
-            except urllib.error.HTTPError as exc:
-                if exc.code == 403:
-                    logging.warning(
-                        "site name=%s list fetch blocked reason=site_blocked_or_requires_auth status=403 url=%s",
-                        cfg["SiteName"],
-                        current_url,
-                    )
-                else:
-                    logging.warning("site name=%s list fetch error url=%s error=%s", cfg["SiteName"], current_url, exc)
-                direct_status = str(exc.code)
-                break
-            except Exception as exc:
-                logging.warning("site name=%s list fetch error url=%s error=%s", cfg["SiteName"], current_url, exc)
-                direct_status = "error"
-                break
-
-            candidates = extract_candidates_from_list_page(html, final_url, cfg)
-            logging.info("site name=%s extracted links count=%s", cfg["SiteName"], len(candidates))
-            direct_links += len(candidates)
-            for cand in candidates:
-                normalized_url = normalize_url(cand["url"])
-                if normalized_url in site_seen_urls:
-                    logging.info("site name=%s skipped reason=site_url_duplicate url=%s", cfg["SiteName"], cand["url"])
-                    continue
-
-                ok, reason = passes_title_filter(cand["title"], cfg)
-                if not ok:
-                    logging.info("site name=%s skipped reason=%s title=%s", cfg["SiteName"], reason, cand["title"])
-                    continue
+            ok, reason = passes_title_filter(cand["title"], profile)
+            if not ok:
+                logging.info("site name=%s skipped reason=%s title=%s", cfg["SiteName"], reason, cand["title"])
+                continue
 
-                parsed_dt = parse_date_text(cand["date_text"], cfg["timezone"], cfg["DateGranularity"])
+            parsed_dt = parse_date_text(cand["date_text"], profile.timezone, profile.granularity)
+            known = seen_store.get(cfg["SiteName"], normalized_url) if seen_store is not None else None
+            if not parsed_dt and known and known.get("published_at"):
+                parsed_dt = datetime.fromisoformat(known["published_at"])
+                cand["date_source"] = known.get("date_source") or cand["date_source"]
+            if parsed_dt and (page_newest is None or parsed_dt > page_newest):
+                page_newest = parsed_dt
+            prepared.append((cand, normalized_url, parsed_dt, known))
+
+        # 残り枠ぶんずつ記事ページを並列取得し、判定は一覧の並び順で行う。
+        index = 0
+        while index < len(prepared) and len(collected) < cfg["MaxItemsPerSite"]:
+            batch = prepared[index : index + cfg["MaxItemsPerSite"] - len(collected)]
+            index += len(batch)
+            # 日付が確定済みの URL は前回の結果（記事ページにも日付がなかった場合を含む）を使い、記事ページを取りに行かない。
+            # 取得エラーや予算切れで確認できなかった URL は次回また取りに行く。
+            enrich_dates_from_articles(
+                [cand for cand, _, parsed_dt, known in batch if not parsed_dt and not SeenArticleStore.is_resolved(known)], cfg, budget
+            )
+            for cand, normalized_url, parsed_dt, known in batch:
                 if not parsed_dt:
-                    cand = enrich_date_from_article(cand, cfg)
-                    parsed_dt = parse_date_text(cand["date_text"], cfg["timezone"], cfg["DateGranularity"])
+                    parsed_dt = parse_date_text(cand["date_text"], profile.timezone, profile.granularity)
+                    if parsed_dt and (page_newest is None or parsed_dt > page_newest):
+                        page_newest = parsed_dt
+                if seen_store is not None:
+                    seen_store.record(
+                        cfg["SiteName"], normalized_url, now_dt, parsed_dt, cand["date_source"], cand.get("date_checked", False)
+                    )
                 if not parsed_dt and cfg.get("DateFallbackMode") == "use_fetched_at":
-                    parsed_dt = now_dt.astimezone(cfg["timezone"])
-                    cand["date_source"] = "fetched_at"
+                    parsed_dt, cand["date_source"] = fallback_datetime(cfg, known, now_dt)
 
                 logging.info(
                     "site name=%s date extraction source=%s url=%s",
@@ -634,7 +1185,7 @@ def collect_site_items(cfg: Dict[str, Any], now_dt: datetime) -> List[SiteItem]:
                 if not parsed_dt:
                     logging.info("site name=%s skipped reason=date_parse_failed url=%s", cfg["SiteName"], cand["url"])
                     continue
-                if not is_in_window(parsed_dt, cfg, now_dt):
+                if not profile.in_window(parsed_dt):
                     logging.info("site name=%s skipped reason=out_of_window url=%s", cfg["SiteName"], cand["url"])
                     continue
 
@@ -652,31 +1203,142 @@ def collect_site_items(cfg: Dict[str, Any], now_dt: datetime) -> List[SiteItem]:
                 logging.info("site name=%s accepted url=%s", cfg["SiteName"], cand["url"])
                 if len(collected) >= cfg["MaxItemsPerSite"]:
                     break
+        return page_newest
+
+    logging.info("site name=%s configured_url_count=%s configured_urls=%s", cfg["SiteName"], len(cfg["ListPageUrls"]), cfg["ListPageUrls"])
+    index_links = 0
+    backed_off = fetch_mode != "search_only" and health is not None and health.take_skip(cfg["SiteName"])
+    if backed_off:
+        # 失敗が続いているサイトは直接取得を休み、検索へのフォールバックがあればそちらだけ行う。
+        entry = health.get(cfg["SiteName"]) or {}
+        logging.warning(
+            "site name=%s direct fetch skipped reason=backed_off consecutive_failures=%s last_status=%s skip_runs_remaining=%s",
+            cfg["SiteName"],
+            entry.get("consecutive_failures"),
+            entry.get("last_status"),
+            entry.get("skip_runs_remaining"),
+        )
+        should_try_direct = False
+        direct_status = "backed_off"
+    elif budget is not None and budget.exhausted("start"):
+        should_try_direct = False
+    elif fetch_mode in INDEX_FETCH_MODES:
+        # sitemap / RSS から候補と日付をまとめて取得し、何も取れなければ一覧ページの巡回に戻る。
+        index_candidates = collect_index_candidates(cfg, profile, now_dt)
+        index_links = len(index_candidates)
+        if index_candidates:
+            process_candidates(index_candidates)
+        else:
+            logging.info("site name=%s index empty fallback=list_pages", cfg["SiteName"])
+            should_try_direct = True
+    for list_url in (cfg["ListPageUrls"] if should_try_direct else []):
+        current_url = list_url
+        for _ in range(cfg["MaxPages"]):
+            if current_url in pages_visited or (budget is not None and budget.exhausted("list_page")):
+                break
+            pages_visited.add(current_url)
+            list_cache = CRAWL_STATE.list_pages
+            cached = list_cache.get(current_url, fingerprint) if list_cache is not None else None
+            validators = None
+            if list_cache is not None:
+                validators = {"etag": cached["etag"], "last_modified": cached["last_modified"]} if cached else {}
+            try:
+                html, status, final_url = fetch_html(current_url, validators)
+                logging.info("site name=%s fetched list url=%s status=%s", cfg["SiteName"], current_url, status)
+                direct_status = str(status)
+            except urllib.error.HTTPError as exc:
+                if exc.code == 403:
+                    logging.warning(
+                        "site name=%s list fetch blocked reason=site_blocked_or_requires_auth status=403 url=%s",
+                        cfg["SiteName"],
+                        current_url,
+                    )
+                else:
+                    logging.warning("site name=%s list fetch error url=%s error=%s", cfg["SiteName"], current_url, exc)
+                direct_status = str(exc.code)
+                break
+            except Exception as exc:
+                logging.warning("site name=%s list fetch error url=%s error=%s", cfg["SiteName"], current_url, exc)
+                direct_status = "error"
+                break
+
+            body_hash = content_hash(html) if status != 304 else ""
+            if cached and (status == 304 or cached["body_hash"] == body_hash):
+                # 未変更の一覧ページは前回抽出した候補をそのまま使い、パースを省く。
+                list_cache.touch(current_url)
+                candidates = cached["candidates"]
+                next_url = cached["next_url"] or None
+                logging.info(
+                    "site name=%s list page unchanged reason=%s url=%s cached_links=%s",
+                    cfg["SiteName"],
+                    "not_modified" if status == 304 else "same_body",
+                    current_url,
+                    len(candidates),
+                )
+            elif status == 304:
+                logging.warning("site name=%s list fetch not_modified without cache url=%s", cfg["SiteName"], current_url)
+                break
+            else:
+                save_list_page(html, cfg["SiteName"], final_url)
+                soup = parse_html(html)
+                candidates = extract_candidates_from_list_page(soup, final_url, cfg)
+                next_url = find_next_page_url(soup, final_url, profile.next_page_selector)
+                if list_cache is not None:
+                    changed = list_cache.put(current_url, fingerprint, validators, body_hash, candidates, next_url)
+                    logging.info("site name=%s list page parsed candidates_changed=%s url=%s", cfg["SiteName"], changed, current_url)
+            logging.info("site name=%s extracted links count=%s", cfg["SiteName"], len(candidates))
+            direct_links += len(candidates)
+            page_newest = process_candidates(candidates)
 
             if len(collected) >= cfg["MaxItemsPerSite"]:
                 break
+            # 新しい順の一覧では、ページ内の最新日付が対象期間より前なら次ページ以降もすべて期間外。
+            if cfg["StopPagingOutOfWindow"] and page_newest is not None and page_newest < profile.window_start:
+                logging.info(
+                    "site name=%s pagination stopped reason=page_older_than_window url=%s newest=%s window_start=%s",
+                    cfg["SiteName"],
+                    current_url,
+                    page_newest.isoformat(),
+                    profile.window_start.isoformat(),
+                )
+                break
 
-            soup = BeautifulSoup(html, "html.parser")
-            next_url = find_next_page_url(soup, final_url, cfg["NextPageSelector"])
             if not next_url or next_url in pages_visited:
                 break
             current_url = next_url
 
-    if fetch_mode == "direct_then_search" and (direct_status in {"403", "404", "error", "not_attempted"} or direct_links == 0):
+    if health is not None and not backed_off and (index_links or direct_status != "not_attempted"):
+        ok = bool(index_links) or (direct_status.isdigit() and int(direct_status) < 400)
+        entry = health.record(cfg["SiteName"], ok, direct_status, (time_module.monotonic() - started) * 1000, now_dt)
+        if entry["skip_runs_remaining"]:
+            logging.warning(
+                "site name=%s backoff scheduled consecutive_failures=%s skip_runs=%s",
+                cfg["SiteName"],
+                entry["consecutive_failures"],
+                entry["skip_runs_remaining"],
+            )
+    direct_failed = direct_status in {"403", "404", "error", "not_attempted", "backed_off"} or direct_links == 0
+    if fetch_mode == "direct_then_search" and direct_failed:
+        should_try_search = True
+    if fetch_mode == "auto" and not index_links and direct_failed and cfg.get("SearchQuery"):
         should_try_search = True
+    if should_try_search and budget is not None and budget.exhausted("search"):
+        should_try_search = False
     if should_try_search:
         search_rows = search_candidates(cfg, now_dt)
         for cand in search_rows:
             normalized_url = normalize_url(cand["url"])
             if normalized_url in site_seen_urls:
                 continue
-            parsed_dt = parse_date_text(cand.get("date_text", ""), cfg["timezone"], cfg["DateGranularity"])
+            parsed_dt = parse_date_text(cand.get("date_text", ""), profile.timezone, profile.granularity)
+            known = seen_store.get(cfg["SiteName"], normalized_url) if seen_store is not None else None
+            if seen_store is not None:
+                seen_store.record(cfg["SiteName"], normalized_url, now_dt, parsed_dt, cand.get("date_source", "search"))
             if not parsed_dt and cfg.get("DateFallbackMode") == "use_fetched_at":
-                parsed_dt = now_dt.astimezone(cfg["timezone"])
-                cand["date_source"] = "fetched_at"
+                parsed_dt, cand["date_source"] = fallback_datetime(cfg, known, now_dt)
             if not parsed_dt and cfg.get("DateFallbackMode") == "require_date":
                 continue
-            if parsed_dt and not is_in_window(parsed_dt, cfg, now_dt):
+            if parsed_dt and not profile.in_window(parsed_dt):
                 continue
             site_seen_urls.add(normalized_url)
             collected.append(
@@ -706,10 +1368,139 @@ def collect_site_items(cfg: Dict[str, Any], now_dt: datetime) -> List[SiteItem]:
         len(collected),
     )
 
+    if budget is not None and budget.exceeded_stage:
+        logging.warning(
+            "site name=%s budget exceeded stage=%s elapsed_seconds=%.1f budget_seconds=%s items=%s",
+            cfg["SiteName"],
+            budget.exceeded_stage,
+            budget.elapsed(),
+            budget.seconds,
+            len(collected),
+        )
     logging.info("site name=%s final items per site=%s", cfg["SiteName"], len(collected))
     return collected[: cfg["MaxItemsPerSite"]]
 
 
+def load_index_entries(url: str, profile: SiteProfile) -> Tuple[str, List[Dict[str, Any]]]:
+    text, _, final_url = fetch_html(url)
+    kind, entries, children = parse_index_document(text, final_url, profile.timezone)
+    for child in latest_children(children, MAX_CHILD_SITEMAPS):
+        child_text, _, child_url = fetch_html(child)
+        entries.extend(parse_index_document(child_text, child_url, profile.timezone)[1])
+    matched: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        if profile.article_url and not profile.article_url.search(entry["url"]):
+            continue
+        matched.setdefault(normalize_url(entry["url"]), entry)
+    return kind, list(matched.values())
+
+
+def discover_index_endpoints(cfg: Dict[str, Any], profile: SiteProfile) -> List[str]:
+    if not cfg["ListPageUrls"]:
+        return []
+    first_url = cfg["ListPageUrls"][0]
+    probes: List[str] = []
+    try:
+        html, _, final_url = fetch_html(first_url)
+        probes.extend(find_feed_links(parse_html(html), final_url))
+    except Exception as exc:
+        logging.info("site name=%s index discovery list fetch failed url=%s error=%s", cfg["SiteName"], first_url, exc)
+    try:
+        probes.extend(parse_robots_sitemaps(fetch_html(robots_url(first_url))[0]))
+    except Exception as exc:
+        logging.info("site name=%s index discovery robots.txt unavailable error=%s", cfg["SiteName"], exc)
+    endpoints: List[str] = []
+    for url in dict.fromkeys(probes):
+        try:
+            kind, entries = load_index_entries(url, profile)
+        except Exception as exc:
+            logging.info("site name=%s index probe failed url=%s error=%s", cfg["SiteName"], url, exc)
+            continue
+        logging.info("site name=%s index probe url=%s kind=%s matched=%s", cfg["SiteName"], url, kind or "unknown", len(entries))
+        if entries:
+            endpoints.append(url)
+        if len(endpoints) >= MAX_INDEX_ENDPOINTS:
+            break
+    logging.info("site name=%s index discovery probed=%s endpoints=%s", cfg["SiteName"], len(probes), endpoints)
+    return endpoints
+
+
+def collect_index_candidates(cfg: Dict[str, Any], profile: SiteProfile, now_dt: datetime) -> List[Dict[str, Any]]:
+    store = CRAWL_STATE.site_index
+    endpoints = store.get(cfg["SiteName"], now_dt) if store is not None else None
+    if endpoints is None:
+        endpoints = discover_index_endpoints(cfg, profile)
+        if store is not None:
+            store.put(cfg["SiteName"], endpoints, now_dt)
+    candidates: Dict[str, Dict[str, Any]] = {}
+    for url in endpoints:
+        try:
+            kind, entries = load_index_entries(url, profile)
+        except Exception as exc:
+            logging.warning("site name=%s index fetch error url=%s error=%s", cfg["SiteName"], url, exc)
+            continue
+        logging.info("site name=%s index fetched url=%s kind=%s matched=%s", cfg["SiteName"], url, kind or "unknown", len(entries))
+        for entry in entries:
+            candidates.setdefault(normalize_url(entry["url"]), entry)
+    return list(candidates.values())
+
+
+def fallback_datetime(cfg: Dict[str, Any], known: Optional[Dict[str, Any]], now_dt: datetime) -> Tuple[datetime, str]:
+    # 前回以前の実行で見た URL は、取得時刻ではなく初回検出時刻を日付とみなす。
+    if known and known.get("first_seen"):
+        return datetime.fromisoformat(known["first_seen"]).astimezone(cfg["timezone"]), "first_seen"
+    return now_dt.astimezone(cfg["timezone"]), "fetched_at"
+
+
+def _collect_site_items_safely(cfg: Dict[str, Any], now_dt: datetime, budget: Optional[SiteBudget] = None) -> List[SiteItem]:
+    try:
+        return collect_site_items(cfg, now_dt, budget)
+    except Exception as exc:
+        logging.exception("site name=%s collection failed error=%s", cfg["SiteName"], exc)
+        return []
+
+
+def collect_all_sites(
+    sites: Sequence[Dict[str, Any]],
+    now_dt: datetime,
+    max_workers: int = DIRECT_SITE_MAX_WORKERS,
+    run_deadline_seconds: float = DIRECT_SITE_RUN_DEADLINE_SECONDS,
+) -> Dict[str, List[SiteItem]]:
+    ordered = sorted(sites, key=lambda r: r["DisplayOrder"])
+    started = time_module.monotonic()
+    run_deadline = started + run_deadline_seconds if run_deadline_seconds > 0 else None
+    budgets: Dict[str, SiteBudget] = {}
+
+    def run_site(cfg: Dict[str, Any]) -> List[SiteItem]:
+        # 予算はサイトの処理開始時から数える。実行全体の締切を過ぎて始まったサイトは何も取得しない。
+        budget = SiteBudget(cfg.get("TimeBudgetSeconds") or DIRECT_SITE_SITE_BUDGET_SECONDS, run_deadline)
+        budgets[cfg["SiteName"]] = budget
+        return _collect_site_items_safely(cfg, now_dt, budget)
+
+    if max_workers <= 1 or len(ordered) <= 1:
+        results = [run_site(cfg) for cfg in ordered]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="direct-site") as pool:
+            futures = [pool.submit(run_site, cfg) for cfg in ordered]
+            results = [future.result() for future in futures]
+    # 完了順ではなく DisplayOrder 順でマージし、dedupe の優先順位を従来どおりに保つ。
+    site_results: Dict[str, List[SiteItem]] = {}
+    for cfg, items in zip(ordered, results):
+        site_results[cfg["SiteName"]] = items
+    exceeded = {name: b.exceeded_stage for name, b in budgets.items() if b.exceeded_stage}
+    logging.info(
+        "collect all sites count=%s max_workers=%s per_host_concurrency=%s per_host_delay_seconds=%s elapsed_seconds=%.1f budget_exceeded_count=%s budget_exceeded=%s",
+        len(ordered),
+        max_workers,
+        HOST_THROTTLE.max_concurrency,
+        HOST_THROTTLE.min_interval,
+        time_module.monotonic() - started,
+        len(exceeded),
+        exceeded,
+    )
+    return site_results
+
+
 def dedupe_and_limit(
     sites: Sequence[Dict[str, Any]],
     site_items: Dict[str, List[SiteItem]],
@@ -795,11 +1586,12 @@ def send_mail(subject: str, html_body: str) -> bool:
 def main() -> None:
     _, sites = load_sites()
     now_dt = datetime.now(ZoneInfo("Asia/Tokyo"))
+    logging.info("direct-site html parser=%s requested=%s", HTML_PARSER, DIRECT_SITE_HTML_PARSER)
 
     active_sites = [s for s in sites if s.get("Enabled")]
-    site_results: Dict[str, List[SiteItem]] = {}
-    for cfg in sorted(active_sites, key=lambda r: r["DisplayOrder"]):
-        site_results[cfg["SiteName"]] = collect_site_items(cfg, now_dt)
+    CRAWL_STATE.open(DIRECT_SITE_STATE_DIR)
+    site_results = collect_all_sites(active_sites, now_dt)
+    CRAWL_STATE.save(now_dt)
 
     sections, _ = dedupe_and_limit(active_sites, site_results)
     total = sum(len(items) for _, items in sections)
@@ -812,6 +1604,10 @@ def main() -> None:
 
     html_body = render_email(DEFAULT_TEMPLATE_PATH, sections, total, now_dt)
     send_mail(subject, html_body)
+    log_http_stats()
+    log_site_health()
+    log_search_stats(now_dt)
+    log_pattern_stats()
 
 
 if __name__ == "__main__":
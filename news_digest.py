@@ -19,6 +19,8 @@ from datetime import date, datetime, timedelta, timezone
 from html import escape
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from openai import OpenAI
+
+from src.pattern_engine import compile_user_pattern, log_pattern_stats, search_user_pattern
 # =====================
 # タイムアウト設定
 # =====================
@@ -359,6 +361,9 @@ def normalize_special_date_rule(media_name: str, overrides: Optional[Dict[str, A
         tz = ZoneInfo("Asia/Tokyo")
     rule["date_timezone"] = tz_name
     rule["timezone"] = tz
+    for key in ("date_parse_pattern", "fallback_date_parse_pattern"):
+        if rule.get(key):
+            compile_user_pattern(str(rule[key]), label=f"{media_name}.{key}", flags=re.DOTALL)
     return rule
 def fetch_article_html(link: str) -> Dict[str, Any]:
     if not link or not is_valid_http_url(link):
@@ -861,7 +866,7 @@ def parse_special_news_datetime_with_rule(entry: Any, media_name: str, rule: Dic
         if not pattern:
             _log_special_date_extract(media_name, source_type, extracted, pattern, "pattern_skipped", "pattern_not_matched")
             return {**extracted, "ok": False, "source_type": source_type, "reason": "date parse pattern is empty", "failure_reason": "pattern_not_matched", "allow_fallback": True}
-        m = re.search(pattern, used_value_for_parse, flags=re.DOTALL)
+        m = search_user_pattern(pattern, used_value_for_parse, flags=re.DOTALL, label=f"{media_name}.date_parse_pattern")
         if not m:
             failure_reason = "url_pattern_not_matched" if source_type == "url" else "pattern_not_matched"
             _log_special_date_extract(media_name, source_type, extracted, pattern, "pattern_not_matched", failure_reason)
@@ -1765,6 +1770,7 @@ def run_main_news_delivery():
 def run_special_news_delivery():
     now_jst = datetime.now(JST)
     result = collect_special_news_articles(now_jst)
+    log_pattern_stats()
     if not result["delivery_enabled"]:
         logging.info("Special-news delivery disabled by configuration")
         return
@@ -0,0 +1,94 @@
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from direct_site_updates import (
+    DEFAULT_CONFIG_PATH,
+    extract_candidates_from_list_page,
+    find_next_page_url,
+    load_sites_from_json,
+    normalize_site_row,
+)
+
+# 保存済み一覧ページ（DIRECT_SITE_SAVE_LIST_PAGES_DIR で保存）に対して、
+# HTML パーサーごとの「2回パース（従来）」と「1回パース」の所要時間を比較する。
+
+
+def collect_pages(paths):
+    pages = []
+    for raw in paths:
+        path = Path(raw)
+        files = sorted(path.glob("*.html")) if path.is_dir() else [path]
+        for f in files:
+            pages.append((f.name, f.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def pick_site(name):
+    if not name:
+        return normalize_site_row({"SiteName": "benchmark"})
+    for cfg in load_sites_from_json(DEFAULT_CONFIG_PATH):
+        if cfg["SiteName"] == name:
+            return cfg
+    raise SystemExit(f"site not found in {DEFAULT_CONFIG_PATH}: {name}")
+
+
+def run_parse_twice(html, parser, cfg):
+    extract_candidates_from_list_page(BeautifulSoup(html, parser), "https://example.com/list", cfg)
+    find_next_page_url(BeautifulSoup(html, parser), "https://example.com/list", cfg["NextPageSelector"])
+
+
+def run_parse_once(html, parser, cfg):
+    soup = BeautifulSoup(html, parser)
+    extract_candidates_from_list_page(soup, "https://example.com/list", cfg)
+    find_next_page_url(soup, "https://example.com/list", cfg["NextPageSelector"])
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="saved list page files or directories of *.html")
+    parser.add_argument("--site", default="", help="SiteName in config/direct_site_watchers.json to take patterns from")
+    parser.add_argument("--parsers", default="html.parser,lxml")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    cfg = pick_site(args.site)
+    pages = collect_pages(args.paths)
+    if not pages:
+        raise SystemExit("no html pages found")
+    parsers = [p.strip() for p in args.parsers.split(",") if p.strip()]
+    for name in parsers:
+        if builder_registry.lookup(name) is None:
+            print(f"parser={name} skipped reason=not_installed")
+            continue
+        twice = sum(time_ms(lambda html=html: run_parse_twice(html, name, cfg), args.repeat) for _, html in pages)
+        once = sum(time_ms(lambda html=html: run_parse_once(html, name, cfg), args.repeat) for _, html in pages)
+        print(
+            f"parser={name} pages={len(pages)} parse_twice_ms={twice:.1f} parse_once_ms={once:.1f} "
+            f"per_page_once_ms={once / len(pages):.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+import argparse
+import logging
+import re
+import statistics
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from direct_site_updates import (
+    extract_candidates_from_list_page,
+    normalize_article_url_pattern,
+    normalize_site_row,
+    normalize_url,
+    parse_html,
+    passes_title_filter,
+)
+
+# 大きなカテゴリページ（アンカー 1,000 件以上）で、
+# 文字列パターンを毎回引く従来の処理と、コンパイル済み SiteProfile を使う処理の所要時間を比較する。
+
+PAGE_URL = "https://www.example.com/en/news"
+BENCH_ROW = {
+    "SiteName": "benchmark",
+    "ArticleUrlPattern": r"https://www\.example\.com/en/news/\d+",
+    "ListDatePattern": r"\d{4}/\d{1,2}/\d{1,2}",
+    "IncludeTitlePattern": r"Steel|Iron|Scrap",
+    "ExcludeTitlePattern": r"\bPR\b",
+    "ArticleLinkSelector": "div.list a",
+}
+
+
+def build_page(anchors):
+    rows = []
+    for i in range(anchors):
+        href = f"/en/news/{i}" if i % 2 == 0 else f"/en/tag/{i}"
+        title = f"{'Steel' if i % 3 else 'PR'} market update {i}"
+        rows.append(f'<p><a href="{href}">{title}</a> <span>2026/05/{i % 28 + 1}</span></p>')
+    return f'<html><body><div class="list">{"".join(rows)}</div></body></html>'
+
+
+def run_string_dispatch(soup, cfg):
+    # 変更前（パターンエンジン導入前）の extract_candidates_from_list_page / passes_title_filter の写し。
+    # 行の dict から文字列パターンを引き、アンカー・候補ごとに re.search を呼ぶ。
+    normalized_pattern = normalize_article_url_pattern(str(cfg.get("ArticleUrlPattern", "")))
+    anchors = soup.select(cfg["ArticleLinkSelector"]) if cfg["ArticleLinkSelector"] else soup.select("a[href]")
+    seen = set()
+    rows = []
+    for a in anchors:
+        href = (a.get("href") or "").strip()
+        if not href:
+            continue
+        absolute_url = urllib.parse.urljoin(PAGE_URL, href)
+        if normalized_pattern and not (re.search(normalized_pattern, absolute_url) or re.search(normalized_pattern, href)):
+            continue
+        normalized = normalize_url(absolute_url)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        title = a.get_text(" ", strip=True) or (a.get("title") or "").strip()
+        if not title:
+            continue
+        date_text = ""
+        if cfg["ListDateSelector"]:
+            found = a.select_one(cfg["ListDateSelector"])
+            date_text = found.get_text(" ", strip=True) if found else ""
+        if not date_text and cfg["ListDatePattern"]:
+            block = a.parent.get_text(" ", strip=True) if a.parent else ""
+            m = re.search(cfg["ListDatePattern"], block) if block else None
+            date_text = m.group(0).strip() if m else ""
+        rows.append({"title": title, "url": absolute_url, "date_text": date_text})
+    out = []
+    for row in rows:
+        if cfg["IncludeTitlePattern"] and not re.search(cfg["IncludeTitlePattern"], row["title"]):
+            continue
+        if cfg["ExcludeTitlePattern"] and re.search(cfg["ExcludeTitlePattern"], row["title"]):
+            continue
+        out.append(row["url"])
+    return out
+
+
+def run_profile(soup, cfg):
+    profile = cfg["profile"]
+    rows = extract_candidates_from_list_page(soup, PAGE_URL, cfg)
+    return [r["url"] for r in rows if passes_title_filter(r["title"], profile)[0]]
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--anchors", type=int, nargs="+", default=[1000, 3000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    cfg = normalize_site_row(BENCH_ROW)
+    for count in args.anchors:
+        soup = parse_html(build_page(count))
+        accepted = run_profile(soup, cfg)
+        # 比較の前提として、両方の経路が同じ URL を同じ順で採用することを確かめる。
+        if run_string_dispatch(soup, cfg) != accepted:
+            raise SystemExit(f"anchors={count}: string dispatch and SiteProfile accepted different URLs")
+        legacy = time_ms(lambda: run_string_dispatch(soup, cfg), args.repeat)
+        compiled = time_ms(lambda: run_profile(soup, cfg), args.repeat)
+        print(f"anchors={count} string_dispatch_ms={legacy:.1f} site_profile_ms={compiled:.1f} accepted={len(accepted)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,15 @@
 import json
+import sys
 from pathlib import Path
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.sources.request_policy import shared_request_policy
+
 STORAGE_PATH = Path(".storage/nikkei_storage_state.json")
 INPUT_PATH = Path("logs/nikkei_issue_article_links.json")
 OUTPUT_PATH = Path("logs/nikkei_article_dom_debug.json")
@@ -32,6 +39,9 @@ def main():
             locale="ja-JP",
             timezone_id="Asia/Tokyo",
         )
+        policy = shared_request_policy()
+        if policy is not None:
+            policy.install(context)
         page = context.new_page()
         page.goto(url, wait_until="domcontentloaded", timeout=45000)
         wait_page(page)
@@ -78,6 +88,8 @@ def main():
         print("url:", data["url"])
         print("bodyLength:", data["bodyLength"])
         print("saved:", OUTPUT_PATH)
+        if policy is not None:
+            print("request_policy:", json.dumps(policy.summary(), ensure_ascii=False))
         print("--- candidates ---")
         for i, r in enumerate(data["rows"][:30], 1):
             print(f"{i}. len={r['textLength']} tag={r['tag']} id={r['id']} class={r['className'][:80]}")
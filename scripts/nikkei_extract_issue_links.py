@@ -1,10 +1,14 @@
-import json, os, re
+import json, os, re, sys
 from pathlib import Path
 from urllib.parse import urljoin, urlparse, parse_qs
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 
+ROOT_DIR=Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path: sys.path.insert(0,str(ROOT_DIR))
+from src.sources.request_policy import shared_request_policy
+
 load_dotenv()
 STORAGE_PATH=Path('.storage/nikkei_storage_state.json')
 OUTPUT_DIR=Path('logs'); OUTPUT_DIR.mkdir(exist_ok=True)
@@ -141,57 +145,72 @@ def pre_exclude(title):
     if PRE_SHORT and len(t)<=6: return 'pre_short_title'
     return ''
 
-def main():
+def new_issue_context(b):
     if not STORAGE_PATH.exists(): raise FileNotFoundError(STORAGE_PATH)
+    c=b.new_context(storage_state=str(STORAGE_PATH),locale='ja-JP',timezone_id='Asia/Tokyo')
+    policy=shared_request_policy()
+    if policy is not None: policy.install(c)
+    return c
+
+def extract_issue_articles(c):
+    """Collect the issue's article links in context c; writes the issue logs and returns (articles, edition_check)."""
     excluded=[]; fallback_entry_used=False
-    with sync_playwright() as p:
-        b=p.chromium.launch(headless=True); c=b.new_context(storage_state=str(STORAGE_PATH),locale='ja-JP',timezone_id='Asia/Tokyo'); page=c.new_page(); page.set_default_timeout(20000)
-        issue_url=build_direct_issue_url(); links=[]
-        print(f'use_direct_issue_url: {str(USE_DIRECT_ISSUE_URL).lower()}'); print('direct_issue_url:',issue_url)
-        if USE_DIRECT_ISSUE_URL:
-            try:
-                print('open_issue_directly: true'); print('open_issue_url:',issue_url); page.goto(issue_url,wait_until='domcontentloaded',timeout=45000); print('page.goto_after_url:',page.url); wait_for_url_stability(page); links=collect_links(page,issue_url)
-            except Exception:
-                if not ALLOW_DIRECT_FALLBACK: raise
-                print('open_issue_directly: false')
-        if not links:
-            if USE_DIRECT_ISSUE_URL and not ALLOW_DIRECT_FALLBACK:
-                save_collect_links_diagnostics(page)
-                raise RuntimeError('No links collected from direct issue URL and direct fallback is disabled.')
-            fallback_entry_used=True; print('open entry:',ENTRY_URL); page.goto(ENTRY_URL,wait_until='domcontentloaded',timeout=45000); print('page.goto_after_url:',page.url); wait_for_url_stability(page); entry_links=collect_links(page,ENTRY_URL)
-            cand=[x['url'] for x in entry_links if f'/paper/{EDITION}/' in x['url'] and get_b(x['url'])]
-            if cand: issue_url=cand[0]; print('open_issue_url:',issue_url); page.goto(issue_url,wait_until='domcontentloaded',timeout=45000); print('page.goto_after_url:',page.url); wait_for_url_stability(page); links=collect_links(page,issue_url)
-        issue_date = target_date_yyyymmdd()
-        page_text = (page.content() or "") + "\n" + (page.evaluate("""() => (document.body && document.body.innerText) ? document.body.innerText : ''""") or "")
-        link_text = "\n".join([f"{x.get('title','')}\n{x.get('url','')}" for x in links])
-        detected_ids = find_detected_edition_ids(f"{page_text}\n{link_text}", issue_date)
-        edition_check = edition_mismatch_summary(expected_edition=EDITION, issue_date=issue_date, detected_ids=detected_ids, issue_url=page.url, direct_issue_url=build_direct_issue_url())
-        print(f"expected_edition: {edition_check['expected_edition']}")
-        print(f"detected_edition_id: {edition_check['detected_edition_id']}")
-        print(f"edition_check_result: {edition_check['edition_check_result']}")
-        if edition_check["edition_check_result"] == "edition_mismatch":
-            (OUTPUT_DIR/'nikkei_issue_article_links.json').write_text("[]", encoding='utf-8')
-            (OUTPUT_DIR/'nikkei_issue_all_links.json').write_text(json.dumps(links,ensure_ascii=False,indent=2),encoding='utf-8')
-            (OUTPUT_DIR/'nikkei_issue_excluded_links.json').write_text("[]", encoding='utf-8')
-            (OUTPUT_DIR/'nikkei_issue_skip_summary.json').write_text(json.dumps(edition_check, ensure_ascii=False, indent=2), encoding='utf-8')
-            print(f"skip_reason: {edition_check['skip_reason']}")
-            print('article_count: 0')
-            b.close(); return
-        print(f'fallback_entry_used: {str(fallback_entry_used).lower()}'); print('final_issue_links_count:',len(links))
-        raw=0; arts=[]; seen=set()
-        for i in links:
-            if not is_article(i['url']): continue
-            raw+=1; ng=parse_qs(urlparse(i['url']).query).get('ng',[i['url']])[0]
-            if ng in seen: continue
-            seen.add(ng)
-            rec={'title':i['title'],'url':i['url'],'issue_url':issue_url,'issue_date':get_b(i['url']) or get_b(issue_url),'edition':EDITION}
-            reason=pre_exclude(i['title'])
-            if reason: rec['exclude_reason']=reason; excluded.append(rec)
-            else: arts.append(rec)
-        (OUTPUT_DIR/'nikkei_issue_article_links.json').write_text(json.dumps(arts,ensure_ascii=False,indent=2),encoding='utf-8')
+    page=c.new_page(); page.set_default_timeout(20000)
+    issue_url=build_direct_issue_url(); links=[]
+    print(f'use_direct_issue_url: {str(USE_DIRECT_ISSUE_URL).lower()}'); print('direct_issue_url:',issue_url)
+    if USE_DIRECT_ISSUE_URL:
+        try:
+            print('open_issue_directly: true'); print('open_issue_url:',issue_url); page.goto(issue_url,wait_until='domcontentloaded',timeout=45000); print('page.goto_after_url:',page.url); wait_for_url_stability(page); links=collect_links(page,issue_url)
+        except Exception:
+            if not ALLOW_DIRECT_FALLBACK: raise
+            print('open_issue_directly: false')
+    if not links:
+        if USE_DIRECT_ISSUE_URL and not ALLOW_DIRECT_FALLBACK:
+            save_collect_links_diagnostics(page)
+            raise RuntimeError('No links collected from direct issue URL and direct fallback is disabled.')
+        fallback_entry_used=True; print('open entry:',ENTRY_URL); page.goto(ENTRY_URL,wait_until='domcontentloaded',timeout=45000); print('page.goto_after_url:',page.url); wait_for_url_stability(page); entry_links=collect_links(page,ENTRY_URL)
+        cand=[x['url'] for x in entry_links if f'/paper/{EDITION}/' in x['url'] and get_b(x['url'])]
+        if cand: issue_url=cand[0]; print('open_issue_url:',issue_url); page.goto(issue_url,wait_until='domcontentloaded',timeout=45000); print('page.goto_after_url:',page.url); wait_for_url_stability(page); links=collect_links(page,issue_url)
+    issue_date = target_date_yyyymmdd()
+    page_text = (page.content() or "") + "\n" + (page.evaluate("""() => (document.body && document.body.innerText) ? document.body.innerText : ''""") or "")
+    link_text = "\n".join([f"{x.get('title','')}\n{x.get('url','')}" for x in links])
+    detected_ids = find_detected_edition_ids(f"{page_text}\n{link_text}", issue_date)
+    edition_check = edition_mismatch_summary(expected_edition=EDITION, issue_date=issue_date, detected_ids=detected_ids, issue_url=page.url, direct_issue_url=build_direct_issue_url())
+    print(f"expected_edition: {edition_check['expected_edition']}")
+    print(f"detected_edition_id: {edition_check['detected_edition_id']}")
+    print(f"edition_check_result: {edition_check['edition_check_result']}")
+    if edition_check["edition_check_result"] == "edition_mismatch":
+        (OUTPUT_DIR/'nikkei_issue_article_links.json').write_text("[]", encoding='utf-8')
         (OUTPUT_DIR/'nikkei_issue_all_links.json').write_text(json.dumps(links,ensure_ascii=False,indent=2),encoding='utf-8')
-        (OUTPUT_DIR/'nikkei_issue_excluded_links.json').write_text(json.dumps(excluded,ensure_ascii=False,indent=2),encoding='utf-8')
+        (OUTPUT_DIR/'nikkei_issue_excluded_links.json').write_text("[]", encoding='utf-8')
         (OUTPUT_DIR/'nikkei_issue_skip_summary.json').write_text(json.dumps(edition_check, ensure_ascii=False, indent=2), encoding='utf-8')
-        print('raw_article_count:',raw); print('pre_excluded_count:',len(excluded)); print('article_count_after_pre_filter:',len(arts)); print('article_count:',len(arts))
-        b.close()
+        print(f"skip_reason: {edition_check['skip_reason']}")
+        print('article_count: 0')
+        page.close(); return [], edition_check
+    print(f'fallback_entry_used: {str(fallback_entry_used).lower()}'); print('final_issue_links_count:',len(links))
+    raw=0; arts=[]; seen=set()
+    for i in links:
+        if not is_article(i['url']): continue
+        raw+=1; ng=parse_qs(urlparse(i['url']).query).get('ng',[i['url']])[0]
+        if ng in seen: continue
+        seen.add(ng)
+        rec={'title':i['title'],'url':i['url'],'issue_url':issue_url,'issue_date':get_b(i['url']) or get_b(issue_url),'edition':EDITION}
+        reason=pre_exclude(i['title'])
+        if reason: rec['exclude_reason']=reason; excluded.append(rec)
+        else: arts.append(rec)
+    (OUTPUT_DIR/'nikkei_issue_article_links.json').write_text(json.dumps(arts,ensure_ascii=False,indent=2),encoding='utf-8')
+    (OUTPUT_DIR/'nikkei_issue_all_links.json').write_text(json.dumps(links,ensure_ascii=False,indent=2),encoding='utf-8')
+    (OUTPUT_DIR/'nikkei_issue_excluded_links.json').write_text(json.dumps(excluded,ensure_ascii=False,indent=2),encoding='utf-8')
+    (OUTPUT_DIR/'nikkei_issue_skip_summary.json').write_text(json.dumps(edition_check, ensure_ascii=False, indent=2), encoding='utf-8')
+    print('raw_article_count:',raw); print('pre_excluded_count:',len(excluded)); print('article_count_after_pre_filter:',len(arts)); print('article_count:',len(arts))
+    policy=shared_request_policy()
+    if policy is not None: print('request_policy:',json.dumps(policy.summary(),ensure_ascii=False))
+    page.close()
+    return arts, edition_check
+
+def main():
+    with sync_playwright() as p:
+        b=p.chromium.launch(headless=True)
+        try: extract_issue_articles(new_issue_context(b))
+        finally: b.close()
 if __name__=='__main__': main()
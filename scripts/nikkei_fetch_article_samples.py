@@ -1,11 +1,18 @@
 import json
 import os
 import re
+import sys
 from pathlib import Path
 
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.sources.request_policy import shared_request_policy
+
 load_dotenv()
 
 STORAGE_PATH = Path(".storage/nikkei_storage_state.json")
@@ -171,6 +178,9 @@ def main():
             locale="ja-JP",
             timezone_id="Asia/Tokyo",
         )
+        policy = shared_request_policy()
+        if policy is not None:
+            policy.install(context)
         page = context.new_page()
         page.set_default_timeout(20000)
 
@@ -216,6 +226,8 @@ def main():
 
         browser.close()
 
+    if policy is not None:
+        print("request_policy:", json.dumps(policy.summary(), ensure_ascii=False))
     OUTPUT_PATH.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
     print("saved:", OUTPUT_PATH)
 
@@ -1,15 +1,30 @@
+import argparse
 import json
 import os
 import re
+import sys
+import threading
 import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
 import requests
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 from dotenv import load_dotenv
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.sources.request_policy import shared_request_policy
+from src.stores.jsonl_log import JsonlLog, read_jsonl
 
 load_dotenv()
 
@@ -21,6 +36,8 @@ FAILED_DIR = Path('logs/nikkei_failed_articles')
 SUMMARY_JSON = Path('logs/nikkei_fetch_summary.json')
 INVENTORY_JSON = Path('logs/nikkei_issue_run_inventory.json')
 DOM_CANDIDATES_JSONL = Path('logs/nikkei_article_dom_candidates.jsonl')
+OUTCOMES_JSONL = Path('logs/nikkei_fetch_outcomes.jsonl')
+CHECKPOINT_JSON = Path('logs/nikkei_fetch_checkpoint.json')
 
 MAX_SUCCESS_ARTICLES = int(os.getenv('NIKKEI_MAX_SUCCESS_ARTICLES', os.getenv('NIKKEI_MAX_ARTICLES_TO_FETCH', '0')))
 MAX_ARTICLE_ATTEMPTS = int(os.getenv('NIKKEI_MAX_ARTICLE_ATTEMPTS', '0'))
@@ -30,8 +47,22 @@ RETRIES = int(os.getenv('NIKKEI_ARTICLE_EXTRACT_RETRIES', '3'))
 GOTO_TIMEOUT = int(os.getenv('NIKKEI_ARTICLE_GOTO_TIMEOUT_MS', '25000'))
 WAIT_AFTER = int(os.getenv('NIKKEI_ARTICLE_WAIT_AFTER_LOAD_MS', '800'))
 BLOCK_HEAVY = os.getenv('NIKKEI_BLOCK_HEAVY_RESOURCES', 'true').lower() == 'true'
+REQUEST_POLICY = shared_request_policy()
 RETRY_WITHOUT_BLOCK = os.getenv('NIKKEI_RETRY_WITHOUT_RESOURCE_BLOCK_ON_FAILURE', 'true').lower() == 'true'
 WAIT_FOR_CONTENT_MS = int(os.getenv('NIKKEI_WAIT_FOR_CONTENT_MS', '6000'))
+FETCH_WORKERS = max(1, int(os.getenv('NIKKEI_FETCH_WORKERS', '1')))
+REUSE_CONTEXT = os.getenv('NIKKEI_REUSE_BROWSER_CONTEXT', 'true').lower() == 'true'
+HTTP_FIRST = os.getenv('NIKKEI_HTTP_FIRST', 'false').lower() == 'true'
+DOM_DIAGNOSTICS = os.getenv('NIKKEI_DOM_DIAGNOSTICS', 'false').lower() == 'true'
+RESUME = os.getenv('NIKKEI_FETCH_RESUME', 'false').lower() == 'true'
+RETRY_POLICY_SPEC = os.getenv('NIKKEI_RETRY_POLICY', '').strip()
+LOGIN_WALL_BREAKER_THRESHOLD = max(0, int(os.getenv('NIKKEI_LOGIN_WALL_BREAKER_THRESHOLD', '5')))
+HTTP_TIMEOUT = float(os.getenv('NIKKEI_HTTP_TIMEOUT_SECONDS', '15'))
+HTTP_USER_AGENT = os.getenv(
+    'NIKKEI_HTTP_USER_AGENT',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+)
+HTTP_HTML_PARSER = 'lxml' if builder_registry.lookup('lxml') is not None else 'html.parser'
 
 SKIP_EXISTING = os.getenv('NIKKEI_SKIP_EXISTING_NOTION_URLS', 'true').lower() == 'true'
 BACKFILL_EXISTING_EMPTY_BODY = os.getenv('NIKKEI_BACKFILL_EXISTING_EMPTY_BODY', 'true').lower() == 'true'
@@ -402,7 +433,242 @@ def extract_from_embedded_json(page):
     return page.evaluate(script)
 
 
-def select_text_with_candidates(page):
+BODY_REMOVAL_SELECTORS = [
+    'header', 'footer', 'nav', 'aside', 'script', 'style', 'noscript',
+    '[role="navigation"]', '.breadcrumb', '.breadcrumbs', '.related', '.recommend',
+    '[class*="ranking"]', '[class*="share"]', '[class*="sns"]', '[class*="advert"]',
+    '[class*="ad-"]', '[class*="paid"]', '[class*="subscription"]',
+]
+HTTP_BODY_SELECTORS = [
+    'div.cmn-section.cmn-indent',
+    'section.cmn-section.cmn-indent',
+    '.cmn-section',
+    '[data-track-article-body]',
+    '[itemprop="articleBody"]',
+]
+
+
+def open_http_session(storage_path: Path = STORAGE_PATH, pool_maxsize: int = FETCH_WORKERS) -> requests.Session:
+    """requests.Session carrying the Playwright storage-state cookies, pooled for the fetch workers."""
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_maxsize))
+    http.mount('https://', adapter)
+    http.mount('http://', adapter)
+    http.headers.update({'User-Agent': HTTP_USER_AGENT, 'Accept-Language': 'ja-JP,ja;q=0.9'})
+    state = json.loads(Path(storage_path).read_text(encoding='utf-8')) if Path(storage_path).exists() else {}
+    for cookie in state.get('cookies', []):
+        http.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+    return http
+
+
+def _find_string_key(obj, key: str, min_len: int = 80) -> str:
+    if isinstance(obj, dict):
+        value = obj.get(key)
+        if isinstance(value, str) and len(value.strip()) >= min_len:
+            return value.strip()
+        obj = list(obj.values())
+    if isinstance(obj, list):
+        for item in obj:
+            found = _find_string_key(item, key, min_len)
+            if found:
+                return found
+    return ''
+
+
+def _node_text(node) -> str:
+    blocks = node.find_all(['p', 'h2', 'h3', 'li'])
+    if not blocks:
+        return node.get_text('\n', strip=True)
+    return '\n'.join(t for t in (b.get_text('', strip=True) for b in blocks) if t)
+
+
+def parse_article_html(html: str) -> dict:
+    """Server-side counterpart of extract_from_embedded_json and the cmn-section DOM candidates.
+
+    Returns title, h1_text, page_text and candidates as (extractor, text) in preference order.
+    """
+    soup = BeautifulSoup(html or '', HTTP_HTML_PARSER)
+    h1 = soup.find('h1')
+    h1_text = h1.get_text(' ', strip=True) if h1 else ''
+    title = (soup.title.get_text(strip=True) if soup.title else '') or h1_text
+    candidates = []
+    for node in soup.select('script[type="application/ld+json"]'):
+        try:
+            parsed = json.loads(node.string or node.get_text() or '{}')
+        except ValueError:
+            continue
+        for item in (parsed if isinstance(parsed, list) else [parsed]):
+            body = (item.get('articleBody') or item.get('text') or '') if isinstance(item, dict) else ''
+            if isinstance(body, str) and body.strip():
+                candidates.append(('embedded_json:json_ld', body.strip()))
+                break
+        if candidates:
+            break
+    next_node = soup.select_one('script#__NEXT_DATA__')
+    if next_node is not None:
+        try:
+            body = _find_string_key(json.loads(next_node.string or next_node.get_text() or '{}'), 'articleBody')
+        except ValueError:
+            body = ''
+        if body:
+            candidates.append(('embedded_json:next_data', body))
+    for sel in BODY_REMOVAL_SELECTORS:
+        for node in soup.select(sel):
+            node.decompose()
+    for sel in HTTP_BODY_SELECTORS:
+        text = '\n'.join(_node_text(node) for node in soup.select(sel)).strip()
+        if text:
+            candidates.append((sel, text))
+    body = soup.body or soup
+    return {'title': title, 'h1_text': h1_text, 'page_text': body.get_text('\n', strip=True), 'candidates': candidates}
+
+
+def http_fetch_article(http, limiter, i: int, a: dict, existing_map: dict):
+    """Try one article over plain HTTP; returns (outcome, '') on success or (None, reason) to fall back to Playwright."""
+    started = time.monotonic()
+    try:
+        limiter.wait()
+        resp = http.get(a['url'], timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        return None, f'http_error:{type(e).__name__}'
+    if resp.status_code != 200:
+        return None, f'http_status:{resp.status_code}'
+    if urlparse(resp.url).path != urlparse(a['url']).path:
+        # ログイン画面などへリダイレクトされた。
+        return None, 'http_redirected'
+    if not resp.encoding or resp.encoding.lower() == 'iso-8859-1':
+        resp.encoding = 'utf-8'
+    parsed = parse_article_html(resp.text)
+    reason = 'http_no_body_candidate'
+    for extractor, raw_text in parsed['candidates']:
+        text = clean_article_text(raw_text)
+        valid_body, rejection_reason = validate_article_body(
+            text, page_title=parsed['title'], source_title=a.get('title', ''), h1_text=parsed['h1_text'], article_url=a.get('url', '')
+        )
+        if not valid_body:
+            reason = f'http_{rejection_reason}'
+            continue
+        login_wall, paid_wall, _, _ = detect_walls(text)
+        if login_wall or paid_wall or looks_like_noise(text):
+            # 本文に会員限定の案内が混ざる＝続きが切れている可能性があるので、ブラウザで取り直す。
+            reason = 'http_wall_in_body'
+            continue
+        out = {'index': i, 'res': None, 'fail': [], 'inventory': [], 'dom_logs': [], 'retry_without_resource_block_success': False, 'http_fallback_reason': ''}
+        ex, r = should_exclude_by_body(a.get('title', ''), text)
+        if ex:
+            out['fail'].append({'status': 'excluded', 'exclude_reason': r, 'url': a['url'], 'source_title': a.get('title', '')})
+            return out, ''
+        record = {
+            'status': 'success', 'source_title': a.get('title', ''), 'url': a['url'], 'issue_url': a.get('issue_url', ''),
+            'issue_date': a.get('issue_date', ''), 'edition': a.get('edition', ''), 'page_title': parsed['title'],
+            'text_length': len(text), 'text': text, 'selector_used': f'http:{extractor}', 'selector_candidates': [],
+            'fetch_method': 'http',
+        }
+        print(f"[article] index={i} url={a['url']} final_url={resp.url} title={parsed['title']} extracted_text_length={len(text)} selected_extractor_name=http:{extractor} failure_reason= elapsed_ms={round((time.monotonic() - started) * 1000)}")
+        out['dom_logs'].append({
+            'url': a['url'], 'final_url': resp.url, 'source_title': a.get('title', ''), 'page_title': parsed['title'], 'h1_text': parsed['h1_text'],
+            'selector_used': f'http:{extractor}', 'selected_text_length': len(text), 'selected_preview': text[:240], 'extraction_status': 'success',
+            'rejection_reason': '', 'candidates': [],
+        })
+        record_success(out, a, record, existing_map)
+        return out, ''
+    return None, reason
+
+
+def record_success(out: dict, a: dict, record: dict, existing_map: dict) -> None:
+    ex = existing_map.get(a['url'], {})
+    if ex.get('page_id'):
+        record['source'] = 'backfill_existing'
+        record['page_id'] = ex.get('page_id')
+        out['inventory'].append({'url': a['url'], 'title': a.get('title', ''), 'status': 'backfilled_existing', 'page_id': ex.get('page_id', ''), 'has_existing_body': True, 'source': 'backfill_existing'})
+    else:
+        out['inventory'].append({'url': a['url'], 'title': a.get('title', ''), 'status': 'fetched_new', 'page_id': '', 'has_existing_body': False, 'source': 'fetch_new'})
+    out['res'] = record
+
+
+PREFERRED_BODY_SELECTORS = [
+    # Prefer Nikkei's known paper article body container first.
+    # Historical good saves used div.cmn-section.cmn-indent as the clean body selector.
+    # Fall back to paragraph_fallback only when the structured body container is absent.
+    'div.cmn-section.cmn-indent',
+    '.cmn-section',
+    '[data-track-article-body]',
+    '[itemprop="articleBody"]',
+    '[class*="article-body"]',
+    '[class*="articleBody"]',
+    'paragraph_fallback',
+    'article',
+    'main',
+    '[class*="article"]',
+    '[class*="content"]',
+]
+# 優先順に候補を評価し、最初に条件を満たしたものだけを返す（DOM は変更しない）。
+FAST_SELECT_SCRIPT = r'''([preferred, removalSelectors]) => {
+  const removal = removalSelectors.join(',');
+  const sanitize = (node) => {
+    const c = node.cloneNode(true);
+    c.querySelectorAll(removal).forEach(n => n.remove());
+    return c;
+  };
+  const paragraphFallback = () => {
+    const navWords = ['メニュー', 'ランキング', '関連記事', '購読', '会員登録', 'ログイン', 'シェア', '一覧'];
+    const seen = new Set();
+    const out = [];
+    for (const p of document.querySelectorAll('p')) {
+      if (p.closest(removal)) continue;
+      const text = (p.innerText || '').replace(/\s+/g, ' ').trim();
+      if (!text || text.length < 20) continue;
+      if (seen.has(text)) continue;
+      seen.add(text);
+      const anchorTextLen = Array.from(p.querySelectorAll('a')).map(a => (a.innerText || '').trim().length).reduce((a, b) => a + b, 0);
+      if (text.length && anchorTextLen / text.length >= 0.6) continue;
+      if (navWords.filter(w => text.includes(w)).length >= 2 && text.length < 120) continue;
+      out.push(text);
+    }
+    return out;
+  };
+  const h1Text = document.querySelector('h1')?.innerText?.trim() || '';
+  const title = document.title || h1Text || '';
+  const base = {title, h1Text, readyState: document.readyState, locationHref: location.href, snippets: {}};
+  for (const sel of preferred) {
+    let txt = '';
+    let linkRatio = 0;
+    let paragraphs = 0;
+    if (sel === 'paragraph_fallback') {
+      const texts = paragraphFallback();
+      txt = texts.join('\n\n').trim();
+      paragraphs = texts.length;
+    } else {
+      // 全候補の診断は除去対象を DOM から消してから探すため、除去対象の内側にある一致はここでも除く。
+      const nodes = Array.from(document.querySelectorAll(sel)).filter(n => !n.closest(removal)).map(sanitize);
+      if (!nodes.length) continue;
+      txt = nodes.map(x => x.innerText || '').join('\n').trim();
+      let linkLen = 0;
+      for (const n of nodes) n.querySelectorAll('a').forEach(a => linkLen += (a.innerText || '').trim().length);
+      linkRatio = txt.length ? Number((linkLen / txt.length).toFixed(3)) : 0;
+      paragraphs = txt ? txt.split('\n').filter(x => x.trim().length >= 20).length : 0;
+    }
+    if (txt.length > 0 && linkRatio <= 0.6) {
+      return {...base, candidate: {selector: sel, text: txt, text_length: txt.length, preview: txt.slice(0, 240), paragraph_count: paragraphs, link_text_ratio: linkRatio}};
+    }
+  }
+  return {...base, candidate: null};
+}'''
+
+
+def select_text_with_candidates(page, diagnostics: bool = True):
+    """Pick the article body candidate; returns (data, title, candidates, best, page_text).
+
+    Without diagnostics the candidates are evaluated lazily in preference order and only the
+    winner is returned. Whenever that does not give a clean body of at least MIN_LEN, the full
+    pass (every candidate, snippets and body text) runs instead.
+    """
+    if not diagnostics:
+        data = page.evaluate(FAST_SELECT_SCRIPT, [PREFERRED_BODY_SELECTORS, BODY_REMOVAL_SELECTORS])
+        best = data.get('candidate')
+        if best and best.get('text_length', 0) >= MIN_LEN and not looks_like_noise(best.get('text', '')):
+            print("dom_candidate:", best.get('selector'), "text_length=", best.get('text_length', 0), "mode= fast")
+            return data, data.get('title', ''), [best], best, ''
     script = r'''() => {
       const removalSelectors = [
         'header','footer','nav','aside','script','style','noscript',
@@ -489,22 +755,6 @@ def select_text_with_candidates(page):
     }'''
     data = page.evaluate(script)
     candidates = data.get('candidates', [])
-    # Prefer Nikkei's known paper article body container first.
-    # Historical good saves used div.cmn-section.cmn-indent as the clean body selector.
-    # Fall back to paragraph_fallback only when the structured body container is absent.
-    preferred = [
-        'div.cmn-section.cmn-indent',
-        '.cmn-section',
-        '[data-track-article-body]',
-        '[itemprop="articleBody"]',
-        '[class*="article-body"]',
-        '[class*="articleBody"]',
-        'paragraph_fallback',
-        'article',
-        'main',
-        '[class*="article"]',
-        '[class*="content"]',
-    ]
     best = {'selector': 'none', 'text': '', 'text_length': 0}
     for c in candidates:
         print(
@@ -520,7 +770,7 @@ def select_text_with_candidates(page):
             (c.get('preview') or '').replace("\n", " ")[:160],
         )
     cand_map = {c.get('selector'): c for c in candidates}
-    for key in preferred:
+    for key in PREFERRED_BODY_SELECTORS:
         c = cand_map.get(key)
         if c and c.get('text_length', 0) > 0 and c.get('link_text_ratio', 0) <= 0.6 and not looks_like_noise(c.get('text', '')):
             best = c
@@ -528,25 +778,40 @@ def select_text_with_candidates(page):
     return data, data.get('title', ''), candidates, best, data.get('pageText', '')
 
 
-def wait_for_article_content(page):
-    deadline = time.time() + (WAIT_FOR_CONTENT_MS / 1000)
-    while time.time() < deadline:
-        try:
-            l1 = page.locator('article').first.inner_text(timeout=700).strip()
-        except Exception:
-            l1 = ''
-        try:
-            l2 = page.locator('main').first.inner_text(timeout=700).strip()
-        except Exception:
-            l2 = ''
-        try:
-            l3 = page.inner_text('body', timeout=700).strip()
-        except Exception:
-            l3 = ''
-        if max(len(l1), len(l2), len(l3)) >= max(120, MIN_LEN // 2):
-            return True
-        page.wait_for_timeout(400)
-    return False
+READY_SELECTORS = [
+    'div.cmn-section.cmn-indent',
+    '.cmn-section',
+    '[data-track-article-body]',
+    '[itemprop="articleBody"]',
+    'article',
+    'main',
+]
+READY_NO_CONTAINER_GRACE_MS = 2000
+# textContent はレイアウトを発生させないので、innerText のポーリングより軽い。
+READY_SCRIPT = r'''([selectors, minLen, graceMs]) => {
+  for (const sel of selectors) {
+    for (const node of document.querySelectorAll(sel)) {
+      if ((node.textContent || '').replace(/\s+/g, '').length >= minLen) return sel;
+    }
+  }
+  if (document.readyState === 'complete' && performance.now() >= graceMs) return 'document_complete';
+  return '';
+}'''
+
+
+def wait_for_article_content(page) -> str:
+    """Wait until a body container has enough text; returns its selector, 'document_complete' or '' on timeout.
+
+    Pages that finish loading without any known container (login walls, index pages) stop waiting
+    READY_NO_CONTAINER_GRACE_MS after navigation instead of running out the whole timeout.
+    """
+    try:
+        handle = page.wait_for_function(
+            READY_SCRIPT, arg=[READY_SELECTORS, max(120, MIN_LEN // 2), READY_NO_CONTAINER_GRACE_MS], timeout=WAIT_FOR_CONTENT_MS
+        )
+        return handle.json_value() or ''
+    except Exception:
+        return ''
 
 
 def classify_empty_body_reason(text, page_text, login_like, selector_logs, used_block):
@@ -614,8 +879,566 @@ def split_text_blocks(text: str, limit: int = 1800):
     return chunks
 
 
-def main():
-    raw_arts = json.loads(INPUT_PATH.read_text(encoding='utf-8')) if INPUT_PATH.exists() else []
+def fetch_article(session, limiter, i: int, a: dict, existing_map: dict, http=None, breaker=None) -> dict:
+    """Fetch one article, retrying per RETRY_POLICY; returns its res/fail/inventory/dom log entries.
+
+    With an HTTP session the article is first tried over plain HTTP and only falls back to the
+    browser when that body does not pass validation.
+    """
+    http_fallback_reason = ''
+    if http is not None:
+        http_out, http_fallback_reason = http_fetch_article(http, limiter, i, a, existing_map)
+        if http_out is not None:
+            return http_out
+        print(f"http_first_fallback: index={i} url={a['url']} reason={http_fallback_reason}")
+    out = {
+        'index': i, 'res': None, 'fail': [], 'inventory': [], 'dom_logs': [], 'retry_without_resource_block_success': False,
+        'http_fallback_reason': http_fallback_reason, 'attempt_failure_classes': [],
+    }
+    attempts = RETRIES + (1 if RETRY_WITHOUT_BLOCK else 0)
+    retries_used = Counter()
+    attempts_made = 0
+    t = 0
+    while t < attempts:
+        use_block = BLOCK_HEAVY and not (RETRY_WITHOUT_BLOCK and t == attempts - 1)
+        attempts_made += 1
+        page = session.open_page(use_block)
+        extract_data = {'snippets': {}, 'readyState': '', 'locationHref': ''}
+        selector_logs = []
+        ready_selector = ''
+        wall_text = ''
+        try:
+            limiter.wait()
+            page.goto(a['url'], wait_until='domcontentloaded', timeout=GOTO_TIMEOUT)
+            ready_selector = wait_for_article_content(page)
+            if not ready_selector:
+                # 準備完了を確認できなかったときだけ、従来の固定待ちを入れる。
+                page.wait_for_timeout(WAIT_AFTER)
+            extract_data, page_title, selector_logs, best, page_text = select_text_with_candidates(page, diagnostics=DOM_DIAGNOSTICS)
+            h1_text = extract_data.get('h1Text', '')
+            text = clean_article_text(best.get('text') or '')
+            extractor_name = best.get('selector', '')
+            if len(text) < MIN_LEN or looks_like_noise(text):
+                # DOM から本文が取れたときは埋め込み JSON で上書きしない（高速選択でも従来と同じ本文を採用するため）。
+                embedded = extract_from_embedded_json(page)
+                if embedded.get('articleBody'):
+                    text = embedded.get('articleBody', '').strip()
+                    extractor_name = f"embedded_json:{embedded.get('source','unknown')}"
+            valid_body, rejection_reason = validate_article_body(text, page_title=page_title, source_title=a.get('title', ''), h1_text=h1_text, article_url=a.get('url', ''))
+            if extractor_name in {'[class*="content"]', 'document.body.innerText fallback'}:
+                valid_body = False
+                rejection_reason = 'disallowed_selector'
+            candidate_diag = []
+            for candidate in selector_logs:
+                metrics = article_body_quality_metrics(candidate.get('text', ''))
+                candidate_diag.append({
+                    'selector': candidate.get('selector', ''),
+                    **metrics,
+                    'preview': (candidate.get('preview', '') or '')[:240],
+                })
+            wall_text = text + '\n' + page_text
+            login_wall, paid_wall, access_denied, wall_evidence = detect_walls(wall_text)
+            empty_body = len(text) == 0
+            too_short = len(text) < MIN_LEN
+            ex, r = should_exclude_by_body(a.get('title', ''), text)
+            if ex:
+                out['fail'].append({'status': 'excluded', 'exclude_reason': r, 'url': a['url'], 'source_title': a.get('title', '')})
+                break
+            if not valid_body:
+                raise RuntimeError(f'invalid_article_body:{rejection_reason}')
+            if looks_like_noise(text) and too_short:
+                raise RuntimeError('noise_or_empty_body')
+            if too_short and not (len(text) >= 40 and not login_wall and not paid_wall and not access_denied):
+                raise RuntimeError('too_short')
+            status = 'success_short' if too_short else 'success'
+            if RETRY_WITHOUT_BLOCK and (not use_block) and t == attempts - 1:
+                print('retry_without_resource_block_success: true')
+                out['retry_without_resource_block_success'] = True
+            record = {
+                'status': status, 'source_title': a.get('title', ''), 'url': a['url'], 'issue_url': a.get('issue_url', ''),
+                'issue_date': a.get('issue_date', ''), 'edition': a.get('edition', ''), 'page_title': page_title,
+                'text_length': len(text), 'text': text, 'selector_used': extractor_name, 'selector_candidates': selector_logs,
+                'fetch_method': 'playwright',
+            }
+            print(f"[article] index={i} url={a['url']} final_url={page.url} title={page_title} extracted_text_length={len(text)} selected_extractor_name={extractor_name} failure_reason= ready_selector={ready_selector}")
+            out['dom_logs'].append({
+                'url': a['url'], 'final_url': page.url, 'source_title': a.get('title', ''), 'page_title': page_title, 'h1_text': h1_text,
+                'selector_used': extractor_name, 'selected_text_length': len(text), 'selected_preview': text[:240], 'extraction_status': 'success',
+                'rejection_reason': '', 'candidates': candidate_diag,
+            })
+            record_success(out, a, record, existing_map)
+            if breaker is not None:
+                breaker.record(False)
+            break
+        except Exception as e:
+            failure_class = classify_attempt_failure(e, wall_text)
+            out['attempt_failure_classes'].append(failure_class)
+            if failure_class == 'login_wall':
+                if breaker is not None:
+                    breaker.record(True)
+                if session.reuses(use_block):
+                    # ログイン切れの疑いがあれば、次の試行は保存済みセッションから作り直したコンテキストで行う。
+                    session.reset('login_wall')
+            next_t = next_attempt(failure_class, t, attempts, retries_used, breaker)
+            if next_t is not None:
+                print(f"[article] index={i} attempt={t + 1} failure_class={failure_class} next_attempt={next_t + 1}")
+                backoff = RETRY_POLICY.get(failure_class, RETRY_POLICY['other'])[1]
+                if next_t == t + 1 and backoff > 0:
+                    time.sleep(backoff * retries_used[failure_class])
+            else:
+                page_title = ''
+                selector_used = ''
+                text = ''
+                page_text = ''
+                login_wall, paid_wall, access_denied = False, False, False
+                try:
+                    extract_data, page_title, selector_logs, best, page_text = select_text_with_candidates(page)
+                    selector_used = best.get('selector', '')
+                    text = (best.get('text') or '').strip()
+                    login_wall, paid_wall, access_denied, wall_evidence = detect_walls(text + '\n' + page_text)
+                except Exception:
+                    selector_logs = []
+                    wall_evidence = {}
+                html_path, png_path, txt_path, debug_json_path = save_failure_artifacts(page, i)
+                failure_reason = 'empty_body' if len(text) == 0 else ('too_short' if 0 < len(text) < MIN_LEN else type(e).__name__)
+                if 'invalid_article_body:' in str(e):
+                    failure_reason = str(e).split(':', 1)[1]
+                h1_text = (extract_data or {}).get('h1Text', '')
+                candidate_diag = []
+                for candidate in selector_logs:
+                    metrics = article_body_quality_metrics(candidate.get('text', ''))
+                    candidate_diag.append({'selector': candidate.get('selector', ''), **metrics, 'preview': (candidate.get('preview', '') or '')[:240]})
+                if failure_reason == 'empty_body':
+                    failure_reason = classify_empty_body_reason(text, page_text, login_wall, selector_logs, use_block)
+                Path(debug_json_path).write_text(json.dumps({
+                    'final_url': page.url if page else '',
+                    'page_title': page_title,
+                    'body_inner_text_head_1000': (page_text or '')[:1000],
+                    'html_snippets': (extract_data or {}).get('snippets', {}),
+                    'document_ready_state': (extract_data or {}).get('readyState', ''),
+                    'location_href': (extract_data or {}).get('locationHref', ''),
+                    'selector_lengths': {candidate.get('selector', ''): int(candidate.get('text_length', 0)) for candidate in selector_logs if candidate.get('selector')},
+                }, ensure_ascii=False, indent=2), encoding='utf-8')
+                is_timeout = isinstance(e, PlaywrightTimeoutError)
+                ex = existing_map.get(a['url'], {})
+                out['fail'].append({
+                    'status': 'failed', 'title': a.get('title', ''), 'url': a['url'], 'source_title': a.get('title', ''), 'attempt_count': attempts_made,
+                    'failure_class': failure_class, 'attempt_failure_classes': list(out['attempt_failure_classes']),
+                    'final_page_url': page.url if page else '', 'final_url': page.url if page else '', 'error_type': type(e).__name__, 'error_message': str(e),
+                    'text_length': len(text), 'body_length': len(text), 'page_title': page_title, 'body_text_preview': text[:500],
+                    'selector_used': selector_used, 'selector_candidates': selector_logs,
+                    'selector_lengths': {candidate.get('selector', ''): int(candidate.get('text_length', 0)) for candidate in selector_logs if candidate.get('selector')},
+                    'is_login_wall_detected': login_wall, 'is_paid_article_wall_detected': paid_wall,
+                    'is_access_denied_detected': access_denied, 'is_timeout': is_timeout,
+                    'is_empty_body': len(text) == 0, 'is_too_short': 0 < len(text) < MIN_LEN,
+                    'block_heavy_resources': BLOCK_HEAVY, 'resource_block_enabled': use_block,
+                    'retried_without_resource_block': RETRY_WITHOUT_BLOCK,
+                    'final_attempt_without_resource_block': RETRY_WITHOUT_BLOCK and (not use_block) and t == attempts - 1,
+                    'retry_without_resource_block_success': False,
+                    'wait_strategy_used': {'wait_until': 'domcontentloaded', 'ready_selector': ready_selector, 'wait_after_ms': 0 if ready_selector else WAIT_AFTER, 'goto_timeout_ms': GOTO_TIMEOUT},
+                    'screenshot_path': png_path, 'html_path': html_path, 'text_path': txt_path, 'artifact_html_path': html_path, 'artifact_screenshot_path': png_path,
+                    'page_id': ex.get('page_id', ''), 'existing_page': bool(ex.get('page_id')),
+                    'reason': failure_reason,
+                    'failure_reason': failure_reason,
+                    'selected_extractor_name': selector_used,
+                    'extracted_text_length': len(text),
+                    'extracted_text_head_1000': text[:1000],
+                    'paragraph_count': article_body_quality_metrics(text).get('paragraph_count', 0),
+                    'link_text_ratio': article_body_quality_metrics(text).get('link_text_ratio', 0),
+                    'paid_wall_detected': paid_wall,
+                    'login_wall_detected': login_wall,
+                    'wall_detection_evidence': wall_evidence,
+                    'h1_text': h1_text,
+                    'validation_metrics': article_body_quality_metrics(text),
+                    'article_title_match_result': article_title_match_result(a.get('title', ''), page_title),
+                    'status_code': None,
+                    'debug_json_path': debug_json_path,
+                })
+                out['dom_logs'].append({
+                    'url': a['url'], 'final_url': page.url if page else '', 'source_title': a.get('title', ''), 'page_title': page_title,
+                    'h1_text': h1_text, 'selector_used': selector_used, 'selected_text_length': len(text), 'selected_preview': text[:240],
+                    'extraction_status': 'failed', 'rejection_reason': failure_reason, 'candidates': candidate_diag,
+                })
+                print(f"[article] index={i} url={a['url']} final_url={page.url if page else ''} title={page_title} extracted_text_length={len(text)} selected_extractor_name={selector_used} failure_reason={failure_reason}")
+                reason = 'failed_timeout' if is_timeout else ('failed_access_denied' if access_denied else ('failed_empty_body' if len(text) == 0 else 'failed_other'))
+                out['inventory'].append({'url': a['url'], 'title': a.get('title', ''), 'status': reason, 'page_id': '', 'has_existing_body': False, 'source': 'fetch_failed', 'final_url': page.url if page else '', 'artifact_path': {'html': html_path, 'screenshot': png_path, 'text': txt_path}})
+                if login_wall and session.reuses(use_block):
+                    session.reset('login_wall')
+            t = attempts if next_t is None else next_t
+        finally:
+            session.release(use_block)
+    return out
+
+
+def parse_retry_policy(spec: str, retries: int) -> dict:
+    """Failure class -> (retries, backoff seconds); spec such as 'timeout=2:3,paid_wall=0' overrides the defaults."""
+    policy = {
+        'timeout': (max(retries - 1, 0), 2.0),
+        'other': (max(retries - 1, 0), 1.0),
+        'login_wall': (1, 0.0),
+        'paid_wall': (0, 0.0),
+        'invalid_body': (0, 0.0),
+    }
+    for part in filter(None, (x.strip() for x in (spec or '').split(','))):
+        name, _, value = part.partition('=')
+        count, _, backoff = value.partition(':')
+        name = name.strip()
+        policy[name] = (max(0, int(count)), float(backoff) if backoff else policy.get(name, (0, 0.0))[1])
+    return policy
+
+
+RETRY_POLICY = parse_retry_policy(RETRY_POLICY_SPEC, RETRIES)
+# リソース遮断が原因かもしれない失敗だけ、最後の遮断なし試行に回す（ログイン/有料の壁は回さない）。
+BLOCK_SENSITIVE_CLASSES = {'timeout', 'other', 'invalid_body'}
+
+
+def classify_attempt_failure(e: Exception, wall_text: str) -> str:
+    """Failure class of one attempt; walls are detected on the selected body and sanitized page text only."""
+    if isinstance(e, PlaywrightTimeoutError):
+        return 'timeout'
+    # ヘッダー/ナビの「ログイン」「購読」を拾わないよう、生の innerText ではなく本文候補と除去済みの本文テキストで判定する。
+    login_wall, paid_wall, _, _ = detect_walls(wall_text or '')
+    if login_wall:
+        return 'login_wall'
+    if paid_wall:
+        return 'paid_wall'
+    if str(e).startswith('invalid_article_body:') or str(e) in {'noise_or_empty_body', 'too_short'}:
+        return 'invalid_body'
+    return 'other'
+
+
+def next_attempt(failure_class: str, t: int, attempts: int, retries_used: Counter, breaker=None):
+    """Index of the attempt to run after attempt t failed with failure_class, or None to give up."""
+    if t >= attempts - 1 or (breaker is not None and breaker.tripped):
+        return None
+    allowed = RETRY_POLICY.get(failure_class, RETRY_POLICY['other'])[0]
+    unblocked_retry = RETRY_WITHOUT_BLOCK and BLOCK_HEAVY
+    last_blocked = attempts - 2 if unblocked_retry else attempts - 1
+    if retries_used[failure_class] < allowed and t + 1 <= last_blocked:
+        retries_used[failure_class] += 1
+        return t + 1
+    if unblocked_retry and failure_class in BLOCK_SENSITIVE_CLASSES:
+        return attempts - 1
+    return None
+
+
+class LoginWallBreaker:
+    """Opens after `threshold` login-wall failures with no successful article in between (0 disables).
+
+    An expired session makes every remaining article fail the same way, so once open the
+    scheduler hands out no more articles and in-flight articles stop retrying.
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.consecutive = 0
+        self.tripped = False
+        self._lock = threading.Lock()
+
+    def record(self, login_wall: bool) -> None:
+        with self._lock:
+            if not login_wall:
+                self.consecutive = 0
+                return
+            self.consecutive += 1
+            if self.threshold > 0 and self.consecutive >= self.threshold and not self.tripped:
+                self.tripped = True
+                print(f'login_wall_circuit_breaker: open after {self.consecutive} consecutive login walls; stopping article fetch')
+
+
+class ArticleSession:
+    """One worker's browser contexts.
+
+    With reuse enabled, one context (blocking heavy resources when BLOCK_HEAVY is set) and its page
+    are created once and the page is reset to about:blank between articles; attempts with the other
+    blocking setting get a throwaway context, and reset() drops the long-lived one (e.g. after a
+    login wall). A caller's already-authenticated context can be adopted as the long-lived one.
+    """
+
+    def __init__(self, browser, reuse: bool = True, context=None):
+        self.browser = browser
+        self.reuse = reuse
+        self.context = None
+        self.page = None
+        self._temp_context = None
+        self.contexts_created = 0
+        if context is not None and reuse:
+            # 既に認証済みのコンテキスト（号面リンク抽出で使ったもの）をそのまま記事取得に使う。
+            if BLOCK_HEAVY and REQUEST_POLICY is not None:
+                REQUEST_POLICY.install(context)
+            self.context = context
+
+    def reuses(self, use_block: bool) -> bool:
+        # 長寿命コンテキストは BLOCK_HEAVY の設定で作る。それと違うブロック設定の試行だけ使い捨てにする。
+        return self.reuse and use_block == BLOCK_HEAVY
+
+    def _new_context(self, use_block: bool):
+        context = self.browser.new_context(storage_state=str(STORAGE_PATH), locale='ja-JP', timezone_id='Asia/Tokyo')
+        if use_block and REQUEST_POLICY is not None:
+            REQUEST_POLICY.install(context)
+        self.contexts_created += 1
+        return context
+
+    def open_page(self, use_block: bool):
+        if not self.reuses(use_block):
+            self._temp_context = self._new_context(use_block)
+            return self._temp_context.new_page()
+        if self.context is None:
+            self.context = self._new_context(use_block)
+        if self.page is None or self.page.is_closed():
+            self.page = self.context.new_page()
+        else:
+            try:
+                self.page.goto('about:blank', timeout=5000)
+            except Exception as reset_err:
+                print(f'page_reset_warning: {type(reset_err).__name__}: {reset_err}')
+                self.page.close()
+                self.page = self.context.new_page()
+        return self.page
+
+    def release(self, use_block: bool) -> None:
+        if self._temp_context is not None:
+            self._close(self._temp_context)
+            self._temp_context = None
+
+    def reset(self, reason: str) -> None:
+        if self.context is not None:
+            print(f'context_reset: reason={reason}')
+            self._close(self.context)
+        self.context = None
+        self.page = None
+
+    def close(self) -> None:
+        self.release(False)
+        if self.context is not None:
+            self.reset('worker_done')
+        print(f'contexts_created: {self.contexts_created}')
+
+    @staticmethod
+    def _close(context) -> None:
+        try:
+            context.close()
+        except Exception as close_err:
+            print(f"context_close_warning: {type(close_err).__name__}: {close_err}")
+
+
+class LazyBrowser:
+    """Launches Chromium on first use, so a worker whose articles all succeed over HTTP never starts one."""
+
+    def __init__(self, launch):
+        self._launch = launch
+        self.browser = None
+
+    def new_context(self, **kwargs):
+        if self.browser is None:
+            self.browser = self._launch()
+        return self.browser.new_context(**kwargs)
+
+    def close(self) -> None:
+        if self.browser is not None:
+            self.browser.close()
+
+
+class PolitenessLimiter:
+    """Spaces article navigations of all workers at least min_interval seconds apart."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            start_at = max(time.monotonic(), self._next_start)
+            self._next_start = start_at + self.min_interval
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ArticleScheduler:
+    """Hands out articles in input order until the attempt or success limit is reached.
+
+    Outcomes already known from a checkpoint (by index) are counted against the limits and
+    collected in `resumed` instead of being handed out again.
+    """
+
+    def __init__(self, arts: list, max_success_articles: int, max_article_attempts: int, done: dict = None, stop=None):
+        self.arts = arts
+        self.stop = stop
+        self.max_success_articles = max_success_articles
+        self.max_article_attempts = max_article_attempts
+        self.done_outcomes = dict(done or {})
+        self.resumed = []
+        self.claimed = 0
+        self.successes = 0
+        self._lock = threading.Lock()
+
+    def claim(self):
+        with self._lock:
+            while True:
+                if self.stop is not None and self.stop():
+                    return None
+                if self.claimed >= len(self.arts) or should_stop_attempting(self.claimed, self.max_article_attempts):
+                    return None
+                if self.max_success_articles > 0 and self.successes >= self.max_success_articles:
+                    return None
+                self.claimed += 1
+                prior = self.done_outcomes.get(self.claimed)
+                if prior is None:
+                    return self.claimed, self.arts[self.claimed - 1]
+                self.resumed.append(prior)
+                if prior.get('res') is not None:
+                    self.successes += 1
+
+    def done(self, outcome: dict) -> None:
+        with self._lock:
+            if outcome.get('res') is not None:
+                self.successes += 1
+
+
+def run_article_pool(
+    arts: list, open_worker, workers: int, max_success_articles: int, max_article_attempts: int, done: dict = None, on_outcome=None,
+    stop=None,
+) -> list:
+    """Run fetches on `workers` workers; open_worker() is a context manager yielding fetch(i, article).
+
+    `done` maps indexes to outcomes restored from a checkpoint; on_outcome(article, outcome) is
+    called as each fetch finishes, and no further articles are handed out once stop() is true.
+    """
+    scheduler = ArticleScheduler(arts, max_success_articles, max_article_attempts, done, stop)
+    outcomes = {}
+
+    def worker_loop():
+        with open_worker() as fetch:
+            while True:
+                item = scheduler.claim()
+                if item is None:
+                    return
+                outcome = fetch(*item)
+                scheduler.done(outcome)
+                outcomes[item[0]] = outcome
+                if on_outcome is not None:
+                    on_outcome(item[1], outcome)
+
+    workers = max(1, min(workers, len(arts)))
+    if workers == 1:
+        worker_loop()
+    else:
+        # 1 つは呼び出し元スレッドで回す（そのスレッドで起動済みのブラウザを使えるようにするため）。
+        with ThreadPoolExecutor(max_workers=workers - 1, thread_name_prefix='nikkei-fetch') as pool:
+            futures = [pool.submit(worker_loop) for _ in range(workers - 1)]
+            worker_loop()
+            for future in futures:
+                future.result()
+    for outcome in scheduler.resumed:
+        outcomes[outcome['index']] = outcome
+    return [outcomes[i] for i in sorted(outcomes)]
+
+
+def is_completed_outcome(outcome: dict) -> bool:
+    """Succeeded or excluded; failed articles are fetched again on --resume."""
+    return outcome.get('res') is not None or any(x.get('status') == 'excluded' for x in outcome.get('fail', []))
+
+
+class FetchCheckpoint:
+    """Per-article JSONL outputs and the completed-URL checkpoint, flushed after every article.
+
+    The outcome log is the resume source: with resume=True completed outcomes of the previous
+    run are loaded and re-emitted to the fresh JSONL outputs before new articles are appended.
+    """
+
+    def __init__(self, resume: bool = False, outcomes_path: Path = OUTCOMES_JSONL, checkpoint_path: Path = CHECKPOINT_JSON,
+                 articles_path: Path = OUTPUT_JSON.with_suffix('.jsonl'), failed_path: Path = FAILED_JSON.with_suffix('.jsonl'),
+                 inventory_path: Path = INVENTORY_JSON.with_suffix('.jsonl'), dom_path: Path = DOM_CANDIDATES_JSONL):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.completed = {}
+        if resume and Path(outcomes_path).exists():
+            for line in read_jsonl(outcomes_path):
+                if is_completed_outcome(line.get('outcome', {})):
+                    self.completed[line['url']] = line['outcome']
+        self._lock = threading.Lock()
+        self.outcomes = JsonlLog(outcomes_path)
+        self.articles = JsonlLog(articles_path)
+        self.failed = JsonlLog(failed_path)
+        self.inventory = JsonlLog(inventory_path)
+        self.dom_logs = JsonlLog(dom_path)
+        for url, outcome in self.completed.items():
+            self._write(url, outcome)
+        self._save_checkpoint()
+
+    def resumed_outcomes(self, arts: list) -> dict:
+        """Completed outcomes for the current article list, keyed (and re-indexed) by position."""
+        done = {}
+        for i, a in enumerate(arts, 1):
+            outcome = self.completed.get(a['url'])
+            if outcome is not None:
+                done[i] = {**outcome, 'index': i}
+        return done
+
+    def record(self, a: dict, outcome: dict) -> None:
+        with self._lock:
+            self._write(a['url'], outcome)
+            if is_completed_outcome(outcome):
+                self.completed[a['url']] = outcome
+                self._save_checkpoint()
+
+    def _write(self, url: str, outcome: dict) -> None:
+        self.outcomes.write({'url': url, 'outcome': outcome})
+        if outcome.get('res') is not None:
+            self.articles.write(outcome['res'])
+        self.failed.write(*outcome.get('fail', []))
+        self.inventory.write(*outcome.get('inventory', []))
+        self.dom_logs.write(*outcome.get('dom_logs', []))
+
+    def _save_checkpoint(self) -> None:
+        tmp = self.checkpoint_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'completed_urls': list(self.completed)}, ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp.replace(self.checkpoint_path)
+
+    def close(self) -> None:
+        for log in (self.outcomes, self.articles, self.failed, self.inventory, self.dom_logs):
+            log.close()
+
+
+def merge_article_outcomes(outcomes: list, max_success_articles: int, max_article_attempts: int):
+    """Merge per-article outcomes in input order, applying the limits exactly as a sequential run would."""
+    res, fail, inventory, dom_logs = [], [], [], []
+    attempted_count = 0
+    retry_success = False
+    for outcome in outcomes:
+        if should_stop_attempting(attempted_count, max_article_attempts):
+            break
+        if max_success_articles > 0 and len(res) >= max_success_articles:
+            break
+        attempted_count += 1
+        for item in outcome['fail']:
+            if item.get('status') == 'failed':
+                item['retry_without_resource_block_success'] = retry_success
+            fail.append(item)
+        retry_success = retry_success or outcome['retry_without_resource_block_success']
+        if outcome['res'] is not None:
+            res.append(outcome['res'])
+        inventory.extend(outcome['inventory'])
+        dom_logs.extend(outcome['dom_logs'])
+    return res, fail, inventory, dom_logs, attempted_count, retry_success
+
+
+def main(arts=None, browser=None, context=None, resume=None):
+    """Fetch the issue's articles; the combined pipeline passes its links, browser and context in directly.
+
+    Returns the exit status: 1 when the Notion lookup failed or the login-wall breaker tripped.
+
+    With resume (default NIKKEI_FETCH_RESUME) articles completed by the previous run are taken
+    from logs/nikkei_fetch_outcomes.jsonl instead of being fetched again.
+    """
+    resume = RESUME if resume is None else resume
+    if arts is not None:
+        raw_arts = list(arts)
+    else:
+        raw_arts = json.loads(INPUT_PATH.read_text(encoding='utf-8')) if INPUT_PATH.exists() else []
     arts = list(raw_arts)
     raw_article_count = len(raw_arts)
     max_success_articles = MAX_SUCCESS_ARTICLES
@@ -674,187 +1497,50 @@ def main():
         ex = existing_map.get(a['url'], {})
         inventory.append({'url': a['url'], 'title': a.get('title', ''), 'status': 'existing_in_notion', 'page_id': ex.get('page_id', ''), 'has_existing_body': bool(ex.get('text')), 'source': 'notion_existing', 'notion_existing': ex})
 
-    res, fail = [], []
-    dom_candidate_logs = []
-    retry_without_resource_block_success = False
-    with sync_playwright() as p:
-        b = p.chromium.launch(headless=True)
-        attempted_count = 0
-        for i, a in enumerate(arts, 1):
-            if should_stop_attempting(attempted_count, max_article_attempts):
-                break
-            if max_success_articles > 0 and len(res) >= max_success_articles:
-                break
-            attempted_count += 1
-            attempts = RETRIES + (1 if RETRY_WITHOUT_BLOCK else 0)
-            ok = False
-            for t in range(attempts):
-                use_block = BLOCK_HEAVY and not (RETRY_WITHOUT_BLOCK and t == attempts - 1)
-                context = None
-                context = b.new_context(storage_state=str(STORAGE_PATH), locale='ja-JP', timezone_id='Asia/Tokyo')
-                if use_block:
-                    def _route_handler(route, req):
-                        try:
-                            if req.resource_type in {'image', 'media', 'font'}:
-                                route.abort()
-                            else:
-                                route.continue_()
-                        except Exception as route_err:
-                            print(f'route_handler_warning: {type(route_err).__name__}: {route_err}')
-                    context.route('**/*', _route_handler)
-                page = context.new_page()
-                extract_data = {'snippets': {}, 'readyState': '', 'locationHref': ''}
-                selector_logs = []
-                try:
-                    page.goto(a['url'], wait_until='domcontentloaded', timeout=GOTO_TIMEOUT)
-                    page.wait_for_timeout(WAIT_AFTER)
-                    wait_for_article_content(page)
-                    extract_data, page_title, selector_logs, best, page_text = select_text_with_candidates(page)
-                    h1_text = extract_data.get('h1Text', '')
-                    embedded = extract_from_embedded_json(page)
-                    text = clean_article_text(best.get('text') or '')
-                    extractor_name = best.get('selector', '')
-                    if embedded.get('articleBody'):
-                        text = embedded.get('articleBody', '').strip()
-                        extractor_name = f"embedded_json:{embedded.get('source','unknown')}"
-                    valid_body, rejection_reason = validate_article_body(text, page_title=page_title, source_title=a.get('title', ''), h1_text=h1_text, article_url=a.get('url', ''))
-                    if extractor_name in {'[class*="content"]', 'document.body.innerText fallback'}:
-                        valid_body = False
-                        rejection_reason = 'disallowed_selector'
-                    candidate_diag = []
-                    for candidate in selector_logs:
-                        metrics = article_body_quality_metrics(candidate.get('text', ''))
-                        candidate_diag.append({
-                            'selector': candidate.get('selector', ''),
-                            **metrics,
-                            'preview': (candidate.get('preview', '') or '')[:240],
-                        })
-                    login_wall, paid_wall, access_denied, wall_evidence = detect_walls(text + '\n' + page_text)
-                    empty_body = len(text) == 0
-                    too_short = len(text) < MIN_LEN
-                    ex, r = should_exclude_by_body(a.get('title', ''), text)
-                    if ex:
-                        fail.append({'status': 'excluded', 'exclude_reason': r, 'url': a['url'], 'source_title': a.get('title', '')})
-                        ok = True
-                        break
-                    if not valid_body:
-                        raise RuntimeError(f'invalid_article_body:{rejection_reason}')
-                    if looks_like_noise(text) and too_short:
-                        raise RuntimeError('noise_or_empty_body')
-                    if too_short and not (len(text) >= 40 and not login_wall and not paid_wall and not access_denied):
-                        raise RuntimeError('too_short')
-                    status = 'success_short' if too_short else 'success'
-                    if RETRY_WITHOUT_BLOCK and (not use_block) and t == attempts - 1:
-                        print('retry_without_resource_block_success: true')
-                        retry_without_resource_block_success = True
-                    record = {
-                        'status': status, 'source_title': a.get('title', ''), 'url': a['url'], 'issue_url': a.get('issue_url', ''),
-                        'issue_date': a.get('issue_date', ''), 'edition': a.get('edition', ''), 'page_title': page_title,
-                        'text_length': len(text), 'text': text, 'selector_used': extractor_name, 'selector_candidates': selector_logs,
-                    }
-                    print(f"[article] index={i} url={a['url']} final_url={page.url} title={page_title} extracted_text_length={len(text)} selected_extractor_name={extractor_name} failure_reason=")
-                    dom_candidate_logs.append({
-                        'url': a['url'], 'final_url': page.url, 'source_title': a.get('title', ''), 'page_title': page_title, 'h1_text': h1_text,
-                        'selector_used': extractor_name, 'selected_text_length': len(text), 'selected_preview': text[:240], 'extraction_status': 'success',
-                        'rejection_reason': '', 'candidates': candidate_diag,
-                    })
-                    ex = existing_map.get(a['url'], {})
-                    if ex.get('page_id'):
-                        record['source'] = 'backfill_existing'
-                        record['page_id'] = ex.get('page_id')
-                        inventory.append({'url': a['url'], 'title': a.get('title', ''), 'status': 'backfilled_existing', 'page_id': ex.get('page_id', ''), 'has_existing_body': True, 'source': 'backfill_existing'})
-                    else:
-                        inventory.append({'url': a['url'], 'title': a.get('title', ''), 'status': 'fetched_new', 'page_id': '', 'has_existing_body': False, 'source': 'fetch_new'})
-                    res.append(record)
-                    ok = True
-                    break
-                except Exception as e:
-                    if t == attempts - 1:
-                        page_title = ''
-                        selector_used = ''
-                        text = ''
-                        page_text = ''
-                        login_wall, paid_wall, access_denied = False, False, False
-                        try:
-                            extract_data, page_title, selector_logs, best, page_text = select_text_with_candidates(page)
-                            selector_used = best.get('selector', '')
-                            text = (best.get('text') or '').strip()
-                            login_wall, paid_wall, access_denied, wall_evidence = detect_walls(text + '\n' + page_text)
-                        except Exception:
-                            selector_logs = []
-                            wall_evidence = {}
-                        html_path, png_path, txt_path, debug_json_path = save_failure_artifacts(page, i)
-                        failure_reason = 'empty_body' if len(text) == 0 else ('too_short' if 0 < len(text) < MIN_LEN else type(e).__name__)
-                        if 'invalid_article_body:' in str(e):
-                            failure_reason = str(e).split(':', 1)[1]
-                        h1_text = (extract_data or {}).get('h1Text', '')
-                        candidate_diag = []
-                        for candidate in selector_logs:
-                            metrics = article_body_quality_metrics(candidate.get('text', ''))
-                            candidate_diag.append({'selector': candidate.get('selector', ''), **metrics, 'preview': (candidate.get('preview', '') or '')[:240]})
-                        if failure_reason == 'empty_body':
-                            failure_reason = classify_empty_body_reason(text, page_text, login_wall, selector_logs, use_block)
-                        Path(debug_json_path).write_text(json.dumps({
-                            'final_url': page.url if page else '',
-                            'page_title': page_title,
-                            'body_inner_text_head_1000': (page_text or '')[:1000],
-                            'html_snippets': (extract_data or {}).get('snippets', {}),
-                            'document_ready_state': (extract_data or {}).get('readyState', ''),
-                            'location_href': (extract_data or {}).get('locationHref', ''),
-                            'selector_lengths': {candidate.get('selector', ''): int(candidate.get('text_length', 0)) for candidate in selector_logs if candidate.get('selector')},
-                        }, ensure_ascii=False, indent=2), encoding='utf-8')
-                        is_timeout = isinstance(e, PlaywrightTimeoutError)
-                        ex = existing_map.get(a['url'], {})
-                        fail.append({
-                            'status': 'failed', 'title': a.get('title', ''), 'url': a['url'], 'source_title': a.get('title', ''), 'attempt_count': attempts,
-                            'final_page_url': page.url if page else '', 'final_url': page.url if page else '', 'error_type': type(e).__name__, 'error_message': str(e),
-                            'text_length': len(text), 'body_length': len(text), 'page_title': page_title, 'body_text_preview': text[:500],
-                            'selector_used': selector_used, 'selector_candidates': selector_logs,
-                            'selector_lengths': {candidate.get('selector', ''): int(candidate.get('text_length', 0)) for candidate in selector_logs if candidate.get('selector')},
-                            'is_login_wall_detected': login_wall, 'is_paid_article_wall_detected': paid_wall,
-                            'is_access_denied_detected': access_denied, 'is_timeout': is_timeout,
-                            'is_empty_body': len(text) == 0, 'is_too_short': 0 < len(text) < MIN_LEN,
-                            'block_heavy_resources': BLOCK_HEAVY, 'resource_block_enabled': use_block,
-                            'retried_without_resource_block': RETRY_WITHOUT_BLOCK,
-                            'final_attempt_without_resource_block': RETRY_WITHOUT_BLOCK and (not use_block) and t == attempts - 1,
-                            'retry_without_resource_block_success': retry_without_resource_block_success,
-                            'wait_strategy_used': {'wait_until': 'domcontentloaded', 'wait_after_ms': WAIT_AFTER, 'goto_timeout_ms': GOTO_TIMEOUT},
-                            'screenshot_path': png_path, 'html_path': html_path, 'text_path': txt_path, 'artifact_html_path': html_path, 'artifact_screenshot_path': png_path,
-                            'page_id': ex.get('page_id', ''), 'existing_page': bool(ex.get('page_id')),
-                            'reason': failure_reason,
-                            'failure_reason': failure_reason,
-                            'selected_extractor_name': selector_used,
-                            'extracted_text_length': len(text),
-                            'extracted_text_head_1000': text[:1000],
-                            'paragraph_count': article_body_quality_metrics(text).get('paragraph_count', 0),
-                            'link_text_ratio': article_body_quality_metrics(text).get('link_text_ratio', 0),
-                            'paid_wall_detected': paid_wall,
-                            'login_wall_detected': login_wall,
-                            'wall_detection_evidence': wall_evidence,
-                            'h1_text': h1_text,
-                            'validation_metrics': article_body_quality_metrics(text),
-                            'article_title_match_result': article_title_match_result(a.get('title', ''), page_title),
-                            'status_code': None,
-                            'debug_json_path': debug_json_path,
-                        })
-                        dom_candidate_logs.append({
-                            'url': a['url'], 'final_url': page.url if page else '', 'source_title': a.get('title', ''), 'page_title': page_title,
-                            'h1_text': h1_text, 'selector_used': selector_used, 'selected_text_length': len(text), 'selected_preview': text[:240],
-                            'extraction_status': 'failed', 'rejection_reason': failure_reason, 'candidates': candidate_diag,
-                        })
-                        print(f"[article] index={i} url={a['url']} final_url={page.url if page else ''} title={page_title} extracted_text_length={len(text)} selected_extractor_name={selector_used} failure_reason={failure_reason}")
-                        reason = 'failed_timeout' if is_timeout else ('failed_access_denied' if access_denied else ('failed_empty_body' if len(text) == 0 else 'failed_other'))
-                        inventory.append({'url': a['url'], 'title': a.get('title', ''), 'status': reason, 'page_id': '', 'has_existing_body': False, 'source': 'fetch_failed', 'final_url': page.url if page else '', 'artifact_path': {'html': html_path, 'screenshot': png_path, 'text': txt_path}})
-                finally:
-                    if context is not None:
-                        try:
-                            context.close()
-                        except Exception as close_err:
-                            print(f"context_close_warning: {type(close_err).__name__}: {close_err}")
-            time.sleep(SLEEP_SECONDS)
-            if not ok:
-                pass
-        b.close()
+    limiter = PolitenessLimiter(SLEEP_SECONDS)
+    http = open_http_session() if HTTP_FIRST else None
+    breaker = LoginWallBreaker(LOGIN_WALL_BREAKER_THRESHOLD)
+    owner_thread = threading.get_ident()
+
+    @contextmanager
+    def open_worker():
+        if browser is not None and threading.get_ident() == owner_thread:
+            # 呼び出し元スレッドのワーカーは、渡されたブラウザと認証済みコンテキストをそのまま使う（閉じるのは呼び出し元）。
+            session = ArticleSession(browser, reuse=REUSE_CONTEXT, context=context)
+            try:
+                yield lambda i, a: fetch_article(session, limiter, i, a, existing_map, http, breaker)
+            finally:
+                if session.context is context:
+                    session.release(False)
+                else:
+                    session.close()
+            return
+        # Playwright の sync API はスレッドをまたいで使えないため、ワーカーごとに Chromium を起動し、保存済みセッションを共有する。
+        with sync_playwright() as p:
+            worker_browser = LazyBrowser(lambda: p.chromium.launch(headless=True))
+            session = ArticleSession(worker_browser, reuse=REUSE_CONTEXT)
+            try:
+                yield lambda i, a: fetch_article(session, limiter, i, a, existing_map, http, breaker)
+            finally:
+                session.close()
+                worker_browser.close()
+
+    checkpoint = FetchCheckpoint(resume=resume)
+    checkpoint.inventory.write(*inventory)
+    done = checkpoint.resumed_outcomes(arts)
+    if resume:
+        print('resume_completed_count:', len(done))
+    try:
+        outcomes = run_article_pool(
+            arts, open_worker, FETCH_WORKERS, max_success_articles, max_article_attempts, done=done, on_outcome=checkpoint.record,
+            stop=lambda: breaker.tripped,
+        )
+    finally:
+        checkpoint.close()
+    res, fail, fetched_inventory, dom_candidate_logs, attempted_count, retry_without_resource_block_success = merge_article_outcomes(
+        outcomes, max_success_articles, max_article_attempts
+    )
+    inventory.extend(fetched_inventory)
 
     OUTPUT_JSON.write_text(json.dumps(res, ensure_ascii=False, indent=2), encoding='utf-8')
     DOM_CANDIDATES_JSONL.parent.mkdir(parents=True, exist_ok=True)
@@ -883,6 +1569,9 @@ def main():
         'max_success_articles': max_success_articles,
         'max_article_attempts': max_article_attempts,
         'attempted_count': attempted_count,
+        'resumed_count': len(done),
+        'attempt_failure_class_counts': dict(Counter(c for o in outcomes for c in o.get('attempt_failure_classes', []))),
+        'login_wall_breaker_tripped': breaker.tripped,
         'remaining_unattempted_count': remaining_unattempted_count,
         'fetch_success_count': fetch_success_count,
         'fetch_failed_count': fetch_failed_count,
@@ -907,6 +1596,11 @@ def main():
         'backfill_failed_count': backfill_failed_count,
         'backfill_updated_existing_page_count': backfill_success_count,
         'retry_without_resource_block_success': retry_without_resource_block_success,
+        'request_policy': REQUEST_POLICY.summary() if REQUEST_POLICY is not None else {},
+        'http_first_enabled': HTTP_FIRST,
+        'http_success_count': sum(1 for x in res if x.get('fetch_method') == 'http'),
+        'http_fallback_count': sum(1 for o in outcomes if o.get('http_fallback_reason')),
+        'http_fallback_reason_counts': dict(Counter(o['http_fallback_reason'] for o in outcomes if o.get('http_fallback_reason'))),
         'notion_article_db_id_present': bool(DB),
         **notion_diag,
         'url_normalization_match_samples': compare_logs,
@@ -925,6 +1619,10 @@ def main():
         summary['systemic_failure_reason'] = systemic_reason
     else:
         summary['systemic_empty_body_failure'] = False
+    if breaker.tripped:
+        summary['systemic_failure_reason'] = 'login_state_invalid'
+        print(f'ERROR: login wall circuit breaker tripped after {LOGIN_WALL_BREAKER_THRESHOLD} consecutive login walls; '
+              f'{remaining_unattempted_count} articles left unattempted. Refresh NIKKEI_SESSION_STATE_JSON.')
     SUMMARY_JSON.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
     print('raw_article_count:', summary['raw_article_count'])
     print('pre_excluded_count:', summary['pre_excluded_count'])
@@ -945,9 +1643,18 @@ def main():
     print('timeout_count:', timeout_count)
     print('too_short_count:', sum(1 for x in only_failed if x.get('is_too_short')))
     print('empty_body_count:', empty_body_count)
+    if REQUEST_POLICY is not None:
+        print('request_policy:', json.dumps(summary['request_policy'], ensure_ascii=False))
+    if HTTP_FIRST:
+        print('http_success_count:', summary['http_success_count'])
+        print('http_fallback_count:', summary['http_fallback_count'])
     print('failed_json_path:', summary['failed_json_path'])
     print('failed_artifacts_dir:', summary['failed_artifacts_dir'])
+    # ログイン切れで打ち切った回は失敗として終了し、保存・メールに進ませない。
+    return 1 if breaker.tripped else 0
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true', help='skip articles completed by the previous (interrupted) run')
+    sys.exit(main(resume=parser.parse_args().resume or None))
@@ -1,4 +1,4 @@
-import json, os, time, re
+import json, os, sys, time, re
 from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
@@ -6,6 +6,12 @@ import requests
 from requests.exceptions import ConnectionError, ReadTimeout, Timeout
 from dotenv import load_dotenv
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.stores.jsonl_log import read_records
+
 load_dotenv()
 NOTION_TOKEN = os.getenv('NOTION_TOKEN', '').strip()
 DATABASE_ID = (os.getenv('NIKKEI_ARTICLES_DB_ID', '') or os.getenv('NOTION_ARTICLE_DB_ID', '')).strip()
@@ -422,7 +428,7 @@ def delete_existing_body_blocks(page_id):
 
 
 def main():
-    arts = json.loads(INPUT_JSON.read_text()) if INPUT_JSON.exists() else []
+    arts = read_records(INPUT_JSON)
     props = req('GET', f'https://api.notion.com/v1/databases/{DATABASE_ID}').json().get('properties', {})
     mapn = {k: find_prop(props, v) for k, v in PROP_CANDS.items()}
     skip_existing = os.getenv("NIKKEI_SKIP_EXISTING_NOTION_URLS", "true").strip().lower() in {"1", "true", "yes", "on"}
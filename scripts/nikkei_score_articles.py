@@ -1,6 +1,7 @@
 import json
 import os
 import re
+import sys
 from pathlib import Path
 from statistics import mean
 from typing import Any
@@ -9,6 +10,12 @@ import requests
 from dotenv import load_dotenv
 from urllib.parse import urlparse, parse_qs
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.stores.jsonl_log import read_records
+
 load_dotenv()
 
 INPUT_JSON = Path("logs/nikkei_articles_full.json")
@@ -346,8 +353,8 @@ def main() -> int:
     report_include_ties = env_bool("NIKKEI_REPORT_INCLUDE_TIES", "true")
 
     rules = load_rules(token, rules_db_id, rule_types)
-    fetched_articles = json.loads(INPUT_JSON.read_text(encoding="utf-8")) if INPUT_JSON.exists() else []
-    inventory = json.loads(INVENTORY_JSON.read_text(encoding="utf-8")) if INVENTORY_JSON.exists() else []
+    fetched_articles = read_records(INPUT_JSON)
+    inventory = read_records(INVENTORY_JSON)
     existing_articles = []
     backfilled_articles = []
     for item in inventory:
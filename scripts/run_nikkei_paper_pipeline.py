@@ -5,8 +5,15 @@ import sys
 import time
 from pathlib import Path
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.stores.jsonl_log import read_records
+
 LOGS = Path("logs")
 PIPELINE_SKIP_JSON = LOGS / "nikkei_paper_pipeline_skip.json"
+COMBINED_BROWSER = os.getenv("NIKKEI_COMBINED_BROWSER", "false").lower() == "true"
 
 
 def run(cmd: list[str]) -> float:
@@ -18,11 +25,42 @@ def run(cmd: list[str]) -> float:
     return sec
 
 
+def run_combined_extract_and_fetch() -> tuple[float, float, int]:
+    """Extract issue links and fetch the articles in this process with one browser and context.
+
+    Returns (extract_seconds, fetch_seconds, article_count); the fetch is skipped (0 seconds) on an
+    edition mismatch or an empty issue, leaving the usual skip handling to main().
+    """
+    from playwright.sync_api import sync_playwright
+
+    import nikkei_extract_issue_links
+    import nikkei_fetch_articles_full
+
+    print("run_start: combined issue link extraction and article fetch")
+    start = time.monotonic()
+    step_fetch = 0.0
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            context = nikkei_extract_issue_links.new_issue_context(browser)
+            arts, edition_check = nikkei_extract_issue_links.extract_issue_articles(context)
+            step_extract = time.monotonic() - start
+            print("run_end_seconds:", round(step_extract, 1))
+            if arts and edition_check.get("edition_check_result") != "edition_mismatch":
+                fetch_start = time.monotonic()
+                returncode = nikkei_fetch_articles_full.main(arts=arts, browser=browser, context=context)
+                if returncode:
+                    # 単独実行時の subprocess.run(check=True) と同じく、記事取得の失敗でパイプラインを止める。
+                    raise subprocess.CalledProcessError(returncode, "nikkei_fetch_articles_full.main")
+                step_fetch = time.monotonic() - fetch_start
+                print("run_end_seconds:", round(step_fetch, 1))
+        finally:
+            browser.close()
+    return step_extract, step_fetch, len(arts)
+
+
 def read_count(file_name: str) -> int:
-    p = LOGS / file_name
-    if not p.exists():
-        return 0
-    return len(json.loads(p.read_text(encoding="utf-8")))
+    return len(read_records(LOGS / file_name))
 
 
 def read_score_summary() -> tuple[int, float, int, dict]:
@@ -78,8 +116,12 @@ def main() -> int:
     LOGS.mkdir(parents=True, exist_ok=True)
     pipeline_start = time.monotonic()
 
-    step_extract = run([sys.executable, "scripts/nikkei_extract_issue_links.py"])
-    article_count = read_count("nikkei_issue_article_links.json")
+    step_fetch = None
+    if COMBINED_BROWSER:
+        step_extract, step_fetch, article_count = run_combined_extract_and_fetch()
+    else:
+        step_extract = run([sys.executable, "scripts/nikkei_extract_issue_links.py"])
+        article_count = read_count("nikkei_issue_article_links.json")
     issue_skip = read_issue_skip_summary()
     if issue_skip.get("edition_check_result") == "edition_mismatch":
         write_pipeline_skip({
@@ -112,7 +154,8 @@ def main() -> int:
         print("mail_send_allowed: false")
         return 0
 
-    step_fetch = run([sys.executable, "scripts/nikkei_fetch_articles_full.py"])
+    if step_fetch is None:
+        step_fetch = run([sys.executable, "scripts/nikkei_fetch_articles_full.py"])
 
     fetch_summary = read_fetch_summary()
     fetch_success_count = int(fetch_summary.get("fetch_success_count", read_count("nikkei_articles_full.json")))
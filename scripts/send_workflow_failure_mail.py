@@ -5,11 +5,18 @@ import json
 import os
 import re
 import smtplib
+import sys
 import traceback
 from email.mime.text import MIMEText
 from pathlib import Path
 from typing import Any
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.stores.jsonl_log import read_records
+
 
 def _env(name: str, default: str = "") -> str:
     v = os.getenv(name)
@@ -37,6 +44,14 @@ def _read_json(path: str) -> Any:
         return {"_read_error": str(e)}
 
 
+def _read_records(path: str) -> Any:
+    # 取得途中で落ちた場合は記事ごとに追記される .jsonl の方が新しい（読み方はパイプラインと共通）。
+    try:
+        return read_records(path) or None
+    except Exception as e:
+        return {"_read_error": str(e)}
+
+
 def _tail(path: str, limit: int = 6000) -> str:
     p = Path(path)
     if not p.exists():
@@ -107,7 +122,7 @@ def _build_body() -> str:
         ("nikkei_score_summary.json", _read_json("logs/nikkei_score_summary.json")),
         ("nikkei_final_report_summary.json", _read_json("logs/nikkei_final_report_summary.json")),
         ("nikkei_save_failed.json", _read_json("logs/nikkei_save_failed.json")),
-        ("nikkei_articles_failed.json", _read_json("logs/nikkei_articles_failed.json")),
+        ("nikkei_articles_failed.json", _read_records("logs/nikkei_articles_failed.json")),
     ]
     for label, data in summaries:
         section = _summarize_json(label, data)
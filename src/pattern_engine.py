@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import regex
+
+# Notion / JSON で編集されるユーザー定義正規表現を安全に実行するための共通エンジン。
+PATTERN_MAX_INPUT_CHARS = int(os.getenv("PATTERN_MAX_INPUT_CHARS", "200000"))
+PATTERN_MATCH_TIMEOUT_MS = int(os.getenv("PATTERN_MATCH_TIMEOUT_MS", "250"))
+# 検証で警告のないパターンを短い入力（URL・タイトル）に使うときはタイマーを張らず、実行後の計測だけにする。
+PATTERN_UNGUARDED_MAX_CHARS = int(os.getenv("PATTERN_UNGUARDED_MAX_CHARS", "512"))
+# timeout で止まらずに予算を超えただけの実行（スレッドの待ちでも起きる）は、連続してこの回数に達したときだけ無効化する。
+PATTERN_SLOW_CALLS_TO_TRIP = max(1, int(os.getenv("PATTERN_SLOW_CALLS_TO_TRIP", "3")))
+
+_BRACE_QUANTIFIER = re.compile(r"\{(\d*)(,?)(\d*)\}")
+_ADJACENT_WILDCARDS = re.compile(r"\.[*+]\??\.[*+]")
+
+
+class PatternTimeout(Exception):
+    pass
+
+
+@dataclass
+class PatternStats:
+    calls: int = 0
+    matches: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    timeouts: int = 0
+    slow_calls: int = 0
+    truncated_inputs: int = 0
+
+
+@dataclass
+class UserPattern:
+    source: str
+    flags: int = 0
+    label: str = ""
+    compiled: Any = None
+    status: str = "empty"
+    reason: str = ""
+    warnings: List[str] = field(default_factory=list)
+    tripped: bool = False
+    slow_streak: int = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.compiled is not None and not self.tripped
+
+    def search(self, text: str) -> Optional[Any]:
+        return _bounded_search(self, text)
+
+
+_CACHE: Dict[Tuple[str, int], UserPattern] = {}
+_STATS: Dict[Tuple[str, int], PatternStats] = {}
+_LOCK = threading.Lock()
+
+
+def _read_quantifier(pattern: str, pos: int) -> Tuple[str, int]:
+    """Return (kind, length) of the quantifier at pos; kind is '', 'bounded' or 'unbounded'."""
+    if pos >= len(pattern):
+        return "", 0
+    ch = pattern[pos]
+    if ch in "*+":
+        return "unbounded", 1
+    if ch == "?":
+        return "bounded", 1
+    if ch == "{":
+        m = _BRACE_QUANTIFIER.match(pattern, pos)
+        if m and (m.group(1) or m.group(3)):
+            unbounded = bool(m.group(2)) and not m.group(3)
+            return ("unbounded" if unbounded else "bounded"), len(m.group(0))
+    return "", 0
+
+
+def find_backtracking_risks(pattern: str) -> Tuple[List[str], List[str]]:
+    errors: List[str] = []
+    warnings: List[str] = []
+    stack: List[Dict[str, bool]] = []
+    in_class = False
+    i = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if in_class:
+            if ch == "]":
+                in_class = False
+            i += 1
+            continue
+        if ch == "[":
+            in_class = True
+            i += 1
+            if i < n and pattern[i] == "^":
+                i += 1
+            if i < n and pattern[i] == "]":
+                i += 1
+            continue
+        if ch == "(":
+            stack.append({"inner_unbounded": False, "alternation": False})
+        elif ch == ")":
+            group = stack.pop() if stack else {"inner_unbounded": False, "alternation": False}
+            kind, _ = _read_quantifier(pattern, i + 1)
+            if kind == "unbounded":
+                if group["inner_unbounded"] and "nested_quantifier" not in errors:
+                    errors.append("nested_quantifier")
+                elif group["alternation"] and "quantified_alternation" not in warnings:
+                    warnings.append("quantified_alternation")
+            if stack and group["inner_unbounded"]:
+                stack[-1]["inner_unbounded"] = True
+        elif ch == "|":
+            if stack:
+                stack[-1]["alternation"] = True
+        else:
+            kind, length = _read_quantifier(pattern, i)
+            if kind == "unbounded" and stack:
+                stack[-1]["inner_unbounded"] = True
+            if length > 1:
+                i += length
+                continue
+        i += 1
+    if _ADJACENT_WILDCARDS.search(pattern):
+        warnings.append("adjacent_wildcards")
+    return errors, warnings
+
+
+def compile_user_pattern(source: str, label: str = "", flags: int = 0) -> UserPattern:
+    text = (source or "").strip()
+    key = (text, flags)
+    with _LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None:
+        return cached
+    entry = UserPattern(source=text, flags=flags, label=label)
+    if text:
+        errors, warnings = find_backtracking_risks(text)
+        entry.warnings = warnings
+        try:
+            compiled = regex.compile(text, flags)
+        except Exception as exc:
+            entry.status = "invalid"
+            entry.reason = f"{type(exc).__name__}: {exc}"
+        else:
+            if errors:
+                entry.status = "rejected"
+                entry.reason = ",".join(errors)
+            else:
+                entry.status = "ok"
+                entry.compiled = compiled
+        if entry.status != "ok":
+            logging.warning("user pattern disabled label=%s status=%s reason=%s pattern=%s", label, entry.status, entry.reason, text)
+        elif warnings:
+            logging.warning("user pattern warning label=%s warnings=%s pattern=%s", label, warnings, text)
+    with _LOCK:
+        return _CACHE.setdefault(key, entry)
+
+
+def _run_with_budget(entry: UserPattern, text: str, budget_sec: float) -> Optional[Any]:
+    if budget_sec <= 0 or (not entry.warnings and len(text) <= PATTERN_UNGUARDED_MAX_CHARS):
+        return entry.compiled.search(text)
+    # regex の timeout はサイト巡回・記事取得のワーカースレッドでも効く（SIGALRM はメインスレッド限定）。
+    try:
+        return entry.compiled.search(text, timeout=budget_sec)
+    except TimeoutError as exc:
+        raise PatternTimeout() from exc
+
+
+def _bounded_search(entry: UserPattern, text: str) -> Optional[Any]:
+    if not entry.usable or not text:
+        return None
+    truncated = len(text) > PATTERN_MAX_INPUT_CHARS
+    if truncated:
+        text = text[:PATTERN_MAX_INPUT_CHARS]
+    budget_sec = PATTERN_MATCH_TIMEOUT_MS / 1000
+    timed_out = False
+    match = None
+    started = time.perf_counter()
+    try:
+        match = _run_with_budget(entry, text, budget_sec)
+    except PatternTimeout:
+        timed_out = True
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    slow = not timed_out and budget_sec > 0 and elapsed_ms > PATTERN_MATCH_TIMEOUT_MS
+    with _LOCK:
+        stats = _STATS.setdefault((entry.source, entry.flags), PatternStats())
+        stats.calls += 1
+        stats.matches += 1 if match else 0
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.timeouts += 1 if timed_out else 0
+        stats.slow_calls += 1 if slow else 0
+        stats.truncated_inputs += 1 if truncated else 0
+        entry.slow_streak = entry.slow_streak + 1 if slow else 0
+        trip = timed_out or entry.slow_streak >= PATTERN_SLOW_CALLS_TO_TRIP
+        newly_tripped = trip and not entry.tripped
+        if trip:
+            entry.tripped = True
+    if newly_tripped:
+        logging.warning(
+            "user pattern tripped label=%s elapsed_ms=%.1f budget_ms=%s input_chars=%s pattern=%s",
+            entry.label,
+            elapsed_ms,
+            PATTERN_MATCH_TIMEOUT_MS,
+            len(text),
+            entry.source,
+        )
+    return None if timed_out else match
+
+
+def search_user_pattern(source: str, text: str, flags: int = 0, label: str = "") -> Optional[Any]:
+    return compile_user_pattern(source, label=label, flags=flags).search(text)
+
+
+def pattern_stats_snapshot() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        return {
+            (source if not flags else f"{source} (flags={int(flags)})"): {
+                "label": _CACHE.get((source, flags), UserPattern(source)).label,
+                "calls": s.calls,
+                "matches": s.matches,
+                "total_ms": round(s.total_ms, 2),
+                "max_ms": round(s.max_ms, 2),
+                "timeouts": s.timeouts,
+                "slow_calls": s.slow_calls,
+                "truncated_inputs": s.truncated_inputs,
+            }
+            for (source, flags), s in _STATS.items()
+        }
+
+
+def log_pattern_stats() -> None:
+    for source, s in sorted(pattern_stats_snapshot().items(), key=lambda kv: -kv[1]["total_ms"]):
+        logging.info(
+            "user pattern cost label=%s calls=%s matches=%s total_ms=%s max_ms=%s timeouts=%s slow_calls=%s truncated_inputs=%s pattern=%s",
+            s["label"],
+            s["calls"],
+            s["matches"],
+            s["total_ms"],
+            s["max_ms"],
+            s["timeouts"],
+            s["slow_calls"],
+            s["truncated_inputs"],
+            source,
+        )
+
+
+def reset_pattern_engine() -> None:
+    with _LOCK:
+        _CACHE.clear()
+        _STATS.clear()
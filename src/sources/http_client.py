@@ -0,0 +1,179 @@
+import codecs
+import re
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:  # urllib3 decodes "br" only when one of these is installed
+    import brotli  # noqa: F401
+
+    BROTLI_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        import brotlicffi  # noqa: F401
+
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([A-Za-z0-9_\-:.]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([A-Za-z0-9_\-:.]+)", re.I)
+META_SNIFF_BYTES = 4096
+
+
+@dataclass
+class HttpResult:
+    status: int
+    text: str
+    final_url: str
+    headers: Mapping[str, str]
+    encoding: str
+    complete: bool = True
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    errors: int = 0
+    wire_bytes: int = 0
+    body_bytes: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+def _known_codec(name: str) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def detect_charset(content_type: str, raw: bytes) -> str:
+    m = _HEADER_CHARSET.search(content_type or "")
+    if m and _known_codec(m.group(1)):
+        return _known_codec(m.group(1))
+    m = _META_CHARSET.search(raw[:META_SNIFF_BYTES])
+    if m and _known_codec(m.group(1).decode("ascii", errors="ignore")):
+        return _known_codec(m.group(1).decode("ascii", errors="ignore"))
+    return "utf-8"
+
+
+class PooledHttpClient:
+    """Shared requests.Session with per-host keep-alive pools and per-host transfer counters."""
+
+    def __init__(self, pool_maxsize: int = 4, pool_connections: int = 32, timeout: float = 12) -> None:
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, HostStats] = {}
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResult:
+        merged = dict(headers or {})
+        merged.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=merged, timeout=self.timeout, allow_redirects=True)
+            raw = response.content
+        except Exception:
+            self._record(host, started, 0, 0, error=True)
+            raise
+        wire_bytes = int(getattr(response.raw, "tell", lambda: 0)() or 0) or len(raw)
+        self._record(host, started, wire_bytes, len(raw), error=response.status_code >= 400)
+        encoding = detect_charset(response.headers.get("Content-Type", ""), raw)
+        return HttpResult(
+            status=response.status_code,
+            text=raw.decode(encoding, errors="replace"),
+            final_url=response.url or url,
+            headers=response.headers,
+            encoding=encoding,
+        )
+
+    def head(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResult:
+        """HEAD request for response headers only; text is always empty."""
+        merged = dict(headers or {})
+        merged.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        started = time.perf_counter()
+        try:
+            response = self.session.head(url, headers=merged, timeout=self.timeout, allow_redirects=True)
+        except Exception:
+            self._record(host, started, 0, 0, error=True)
+            raise
+        self._record(host, started, 0, 0, error=response.status_code >= 400)
+        return HttpResult(status=response.status_code, text="", final_url=response.url or url, headers=response.headers, encoding="")
+
+    def get_prefix(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        done: Callable[[str], bool],
+        first_chunk_bytes: int = 32 * 1024,
+    ) -> HttpResult:
+        """Read the body in doubling chunks and stop as soon as done(decoded_prefix) is True."""
+        merged = dict(headers or {})
+        merged.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        started = time.perf_counter()
+        raw = bytearray()
+        response = None
+        try:
+            response = self.session.get(url, headers=merged, timeout=self.timeout, allow_redirects=True, stream=True)
+            encoding = ""
+            checkpoint = first_chunk_bytes
+            complete = True
+            if response.status_code < 400:
+                for chunk in response.iter_content(chunk_size=16 * 1024):
+                    raw += chunk
+                    if len(raw) < checkpoint:
+                        continue
+                    encoding = encoding or detect_charset(response.headers.get("Content-Type", ""), bytes(raw[:META_SNIFF_BYTES]))
+                    if done(raw.decode(encoding, errors="replace")):
+                        complete = False
+                        break
+                    checkpoint = len(raw) * 2
+            wire_bytes = int(getattr(response.raw, "tell", lambda: 0)() or 0) or len(raw)
+        except Exception:
+            self._record(host, started, len(raw), len(raw), error=True)
+            raise
+        finally:
+            if response is not None:
+                response.close()
+        self._record(host, started, wire_bytes, len(raw), error=response.status_code >= 400)
+        encoding = encoding or detect_charset(response.headers.get("Content-Type", ""), bytes(raw[:META_SNIFF_BYTES]))
+        return HttpResult(
+            status=response.status_code,
+            text=raw.decode(encoding, errors="replace"),
+            final_url=response.url or url,
+            headers=response.headers,
+            encoding=encoding,
+            complete=complete,
+        )
+
+    def _record(self, host: str, started: float, wire_bytes: int, body_bytes: int, error: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats.setdefault(host, HostStats())
+            stats.requests += 1
+            stats.errors += 1 if error else 0
+            stats.wire_bytes += wire_bytes
+            stats.body_bytes += body_bytes
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def stats_snapshot(self) -> Dict[str, HostStats]:
+        with self._lock:
+            return {host: HostStats(**vars(s)) for host, s in self._stats.items()}
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,156 @@
+import os
+import threading
+import urllib.parse
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+# Playwright のリクエスト遮断ポリシー。日経の号面リンク抽出・記事取得・サンプル/デバッグ用スクリプトで共有する。
+DEFAULT_BLOCK_RESOURCE_TYPES = "image,media,font,stylesheet"
+DEFAULT_FIRST_PARTY_DOMAINS = "nikkei.com,nikkei.co.jp,nikkei.jp"
+DEFAULT_THIRD_PARTY_BLOCKLIST = ",".join(
+    [
+        "googletagmanager.com",
+        "google-analytics.com",
+        "analytics.google.com",
+        "doubleclick.net",
+        "googlesyndication.com",
+        "googleadservices.com",
+        "adservice.google.com",
+        "facebook.net",
+        "facebook.com",
+        "twitter.com",
+        "ads-twitter.com",
+        "adobedtm.com",
+        "omtrdc.net",
+        "demdex.net",
+        "everesttech.net",
+        "criteo.com",
+        "criteo.net",
+        "scorecardresearch.com",
+        "taboola.com",
+        "outbrain.com",
+        "popin.cc",
+        "krxd.net",
+        "rubiconproject.com",
+        "amazon-adsystem.com",
+        "yads.yahoo.co.jp",
+        "yjtag.yahoo.co.jp",
+        "yads.c.yimg.jp",
+        "clarity.ms",
+        "hotjar.com",
+        "newrelic.com",
+        "nr-data.net",
+    ]
+)
+
+
+def _split(value: str) -> list:
+    return [x.strip().lower().lstrip(".") for x in (value or "").split(",") if x.strip()]
+
+
+def host_matches(host: str, domains: Iterable[str]) -> bool:
+    host = (host or "").lower()
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class RequestPolicy:
+    """Decides which browser requests to abort and counts what was blocked or allowed.
+
+    A request is aborted when its host is on the blocklist (ad iframes included), or, for
+    anything but a document, when its resource type is in block_types or (with block_third_party)
+    its host is not first-party. Allowed bytes come from Content-Length, so they are a lower bound.
+    """
+
+    def __init__(
+        self,
+        block_types: Iterable[str] = (),
+        first_party: Iterable[str] = (),
+        blocklist: Iterable[str] = (),
+        block_third_party: bool = False,
+    ):
+        self.block_types = frozenset(block_types)
+        self.first_party = tuple(first_party)
+        self.blocklist = tuple(blocklist)
+        self.block_third_party = block_third_party
+        self._lock = threading.Lock()
+        self._blocked: Counter = Counter()
+        self._allowed = 0
+        self._allowed_bytes = 0
+        self._allowed_third_party = 0
+
+    def decide(self, url: str, resource_type: str) -> str:
+        """Return the block reason, or '' to let the request through."""
+        host = urllib.parse.urlsplit(url).hostname or ""
+        if host_matches(host, self.blocklist):
+            return "blocklist"
+        if resource_type == "document":
+            return ""
+        if resource_type in self.block_types:
+            return f"type:{resource_type}"
+        if self.block_third_party and host and not host_matches(host, self.first_party):
+            return "third_party"
+        return ""
+
+    def install(self, context) -> None:
+        """Route every request of a browser context through the policy (once per context)."""
+        if getattr(context, "_request_policy", None) is self:
+            return
+        context._request_policy = self
+        context.route("**/*", self._route)
+        context.on("response", self._on_response)
+
+    def _route(self, route, req) -> None:
+        try:
+            reason = self.decide(req.url, req.resource_type)
+            if reason:
+                with self._lock:
+                    self._blocked[reason] += 1
+                route.abort()
+            else:
+                route.continue_()
+        except Exception as route_err:
+            print(f"route_handler_warning: {type(route_err).__name__}: {route_err}")
+
+    def _on_response(self, response) -> None:
+        try:
+            size = int(response.headers.get("content-length") or 0)
+            third_party = not host_matches(urllib.parse.urlsplit(response.url).hostname or "", self.first_party)
+        except Exception:
+            size, third_party = 0, False
+        with self._lock:
+            self._allowed += 1
+            self._allowed_bytes += size
+            self._allowed_third_party += int(third_party)
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "blocked_requests": sum(self._blocked.values()),
+                "blocked_by_reason": dict(sorted(self._blocked.items())),
+                "allowed_requests": self._allowed,
+                "allowed_third_party_requests": self._allowed_third_party,
+                "allowed_bytes": self._allowed_bytes,
+            }
+
+
+_SHARED: Dict[str, Optional[RequestPolicy]] = {}
+
+
+def shared_request_policy() -> Optional[RequestPolicy]:
+    """One policy per process, so scripts sharing a browser context also share its counters."""
+    if "policy" not in _SHARED:
+        _SHARED["policy"] = request_policy_from_env()
+    return _SHARED["policy"]
+
+
+def request_policy_from_env(env: Optional[Dict[str, str]] = None) -> Optional[RequestPolicy]:
+    """Build the shared policy from NIKKEI_* settings; None when NIKKEI_BLOCK_HEAVY_RESOURCES is off."""
+    env = os.environ if env is None else env
+    if env.get("NIKKEI_BLOCK_HEAVY_RESOURCES", "true").lower() != "true":
+        return None
+    return RequestPolicy(
+        block_types=_split(env.get("NIKKEI_BLOCK_RESOURCE_TYPES", DEFAULT_BLOCK_RESOURCE_TYPES)),
+        first_party=_split(env.get("NIKKEI_FIRST_PARTY_DOMAINS", DEFAULT_FIRST_PARTY_DOMAINS)),
+        blocklist=_split(env.get("NIKKEI_THIRD_PARTY_BLOCKLIST", DEFAULT_THIRD_PARTY_BLOCKLIST)),
+        block_third_party=env.get("NIKKEI_BLOCK_THIRD_PARTY", "false").lower() == "true",
+    )
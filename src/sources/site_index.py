@@ -0,0 +1,109 @@
+import calendar
+import re
+import urllib.parse
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import feedparser
+from bs4 import BeautifulSoup
+
+# direct-site の sitemap / RSS 取得用。取得は呼び出し側（fetch_html）で行い、ここでは解析だけを行う。
+FEED_LINK_TYPES = {"application/rss+xml", "application/atom+xml", "application/feed+json", "application/rdf+xml"}
+_ROBOTS_SITEMAP = re.compile(r"^\s*sitemap\s*:\s*(\S+)", re.I | re.M)
+
+
+def iso_to_date_text(value: str, tz: ZoneInfo) -> str:
+    try:
+        dt = datetime.fromisoformat((value or "").strip().replace("Z", "+00:00"))
+    except ValueError:
+        return ""
+    dt = dt if dt.tzinfo else dt.replace(tzinfo=tz)
+    return dt.astimezone(tz).strftime("%Y/%m/%d %H:%M")
+
+
+def find_feed_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+    links = []
+    for node in soup.select("link[rel~=alternate][href]"):
+        if (node.get("type") or "").strip().lower() in FEED_LINK_TYPES:
+            links.append(urllib.parse.urljoin(base_url, node["href"].strip()))
+    return list(dict.fromkeys(links))
+
+
+def robots_url(page_url: str) -> str:
+    parts = urllib.parse.urlsplit(page_url)
+    return f"{parts.scheme}://{parts.netloc}/robots.txt"
+
+
+def parse_robots_sitemaps(text: str) -> List[str]:
+    return list(dict.fromkeys(m.group(1) for m in _ROBOTS_SITEMAP.finditer(text or "")))
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(node: ET.Element, name: str) -> str:
+    for child in node.iter():
+        if _local(child.tag) == name and child.text:
+            return child.text.strip()
+    return ""
+
+
+def parse_sitemap(text: str, tz: ZoneInfo) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """Return (entries, child sitemaps as (loc, lastmod)); entries without a news title are dropped."""
+    try:
+        root = ET.fromstring(text.strip().encode("utf-8"))
+    except ET.ParseError:
+        return [], []
+    if _local(root.tag) == "sitemapindex":
+        children = [(_child_text(n, "loc"), _child_text(n, "lastmod")) for n in root if _local(n.tag) == "sitemap"]
+        return [], [(loc, lastmod) for loc, lastmod in children if loc]
+    entries = []
+    for node in root:
+        if _local(node.tag) != "url":
+            continue
+        news = next((child for child in node if _local(child.tag) == "news"), None)
+        loc = _child_text(node, "loc")
+        title = _child_text(news, "title") if news is not None else ""
+        if not loc or not title:
+            continue
+        published = _child_text(news, "publication_date") if news is not None else ""
+        date_text = iso_to_date_text(published or _child_text(node, "lastmod"), tz)
+        entries.append({"title": title, "url": loc, "date_text": date_text, "date_source": "sitemap" if date_text else "failed"})
+    return entries, []
+
+
+def parse_feed(text: str, base_url: str, tz: ZoneInfo) -> List[Dict[str, Any]]:
+    parsed = feedparser.parse(text)
+    entries = []
+    for entry in parsed.entries:
+        link = urllib.parse.urljoin(base_url, str(entry.get("link", "")).strip())
+        title = str(entry.get("title", "")).strip()
+        if not link or not title:
+            continue
+        stamp = entry.get("published_parsed") or entry.get("updated_parsed")
+        date_text = ""
+        if stamp:
+            dt = datetime.fromtimestamp(calendar.timegm(stamp), tz=timezone.utc)
+            date_text = dt.astimezone(tz).strftime("%Y/%m/%d %H:%M")
+        entries.append({"title": title, "url": link, "date_text": date_text, "date_source": "feed" if date_text else "failed"})
+    return entries
+
+
+def parse_index_document(
+    text: str, base_url: str, tz: ZoneInfo
+) -> Tuple[str, List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """Detect a sitemap or a feed and return (kind, entries, child sitemaps)."""
+    head = (text or "").lstrip()[:2048]
+    if re.search(r"<(?:\w+:)?(?:urlset|sitemapindex)\b", head):
+        entries, children = parse_sitemap(text, tz)
+        return "sitemap", entries, children
+    entries = parse_feed(text, base_url, tz)
+    return ("feed" if entries else ""), entries, []
+
+
+def latest_children(children: List[Tuple[str, str]], limit: int) -> List[str]:
+    ordered = sorted(children, key=lambda c: c[1], reverse=True) if any(c[1] for c in children) else children
+    return [loc for loc, _ in ordered[:limit]]
@@ -0,0 +1,53 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, List, Union
+
+
+class JsonlLog:
+    """Append-only JSON Lines file, flushed after every record so a crashed run keeps what it wrote."""
+
+    def __init__(self, path: Union[str, Path], append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fh = self.path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, *records: Any) -> None:
+        with self._lock:
+            for record in records:
+                self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+def read_jsonl(path: Union[str, Path]) -> List[Any]:
+    """Read a JSON Lines file; a torn last line from an interrupted write is ignored."""
+    records = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break
+    return records
+
+
+def read_records(path: Union[str, Path]) -> List[Any]:
+    """Read a JSON list from path, or from its .jsonl sibling when that one is newer or the only one.
+
+    The fetch step streams X.jsonl while it runs and writes X.json at the end, so the newer file is
+    the current one either way.
+    """
+    path = Path(path)
+    jsonl = path if path.suffix == ".jsonl" else path.with_suffix(".jsonl")
+    json_path = path.with_suffix(".json")
+    if json_path.exists() and (not jsonl.exists() or json_path.stat().st_mtime >= jsonl.stat().st_mtime):
+        return json.loads(json_path.read_text(encoding="utf-8"))
+    if jsonl.exists():
+        return read_jsonl(jsonl)
+    return []
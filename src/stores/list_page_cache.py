@@ -0,0 +1,91 @@
+import copy
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def content_hash(value: Any) -> str:
+    if isinstance(value, str):
+        raw = value.encode("utf-8", errors="replace")
+    else:
+        raw = json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ListPageCache:
+    """Per-URL validators and extracted candidates of direct-site list pages."""
+
+    def __init__(self, path: str = "data/direct_site/list_page_cache.json", ttl_days: int = 7):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = timedelta(days=ttl_days)
+        self.state: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+
+    def get(self, url: str, fingerprint: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.state.get(url)
+            if not entry or entry.get("fingerprint") != fingerprint:
+                return None
+            return copy.deepcopy(entry)
+
+    def put(
+        self,
+        url: str,
+        fingerprint: str,
+        validators: Dict[str, str],
+        body_hash: str,
+        candidates: List[Dict[str, Any]],
+        next_url: Optional[str],
+        now: Optional[datetime] = None,
+    ) -> bool:
+        """Store the page and return True when the candidate list changed since the last run."""
+        stamp = (now or datetime.now(timezone.utc)).isoformat()
+        candidates_hash = content_hash(candidates)
+        with self._lock:
+            previous = self.state.get(url) or {}
+            changed = previous.get("candidates_hash") != candidates_hash or previous.get("fingerprint") != fingerprint
+            self.state[url] = {
+                "fingerprint": fingerprint,
+                "etag": validators.get("etag", ""),
+                "last_modified": validators.get("last_modified", ""),
+                "body_hash": body_hash,
+                "candidates_hash": candidates_hash,
+                "candidates": copy.deepcopy(candidates),
+                "next_url": next_url or "",
+                "checked_at": stamp,
+                "changed_at": stamp if changed else previous.get("changed_at", stamp),
+            }
+        return changed
+
+    def touch(self, url: str, now: Optional[datetime] = None) -> None:
+        with self._lock:
+            if url in self.state:
+                self.state[url]["checked_at"] = (now or datetime.now(timezone.utc)).isoformat()
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        limit = (now or datetime.now(timezone.utc)) - self.ttl
+        with self._lock:
+            stale = [url for url, entry in self.state.items() if _parse_ts(entry.get("checked_at")) < limit]
+            for url in stale:
+                del self.state[url]
+        return len(stale)
+
+    def save(self, now: Optional[datetime] = None) -> None:
+        self.prune(now)
+        with self._lock:
+            payload = json.dumps(self.state, ensure_ascii=False, indent=2)
+        self.path.write_text(payload, encoding="utf-8")
+
+
+def _parse_ts(value: Optional[str]) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value or "")
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
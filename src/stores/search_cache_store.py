@@ -0,0 +1,84 @@
+import copy
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class SearchCache:
+    """Query-keyed search API results with a TTL, plus per-run and monthly call counters."""
+
+    def __init__(self, path: str = "data/direct_site/search_cache.json", ttl_hours: int = 20, keep_days: int = 14):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = timedelta(hours=ttl_hours)
+        self.keep = timedelta(days=keep_days)
+        self.state: Dict[str, Any] = {"entries": {}, "monthly_calls": {}}
+        if self.path.exists():
+            self.state.update(json.loads(self.path.read_text(encoding="utf-8") or "{}"))
+        self.run_calls = 0
+        self.counters = {"cache_hits": 0, "run_dedupe_hits": 0, "budget_skips": 0, "stale_served": 0}
+        self._run_results: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def lookup(self, key: str, now: datetime) -> Tuple[Optional[dict], str]:
+        """Return (payload, source) where source is run, cache or miss."""
+        with self._lock:
+            if key in self._run_results:
+                self.counters["run_dedupe_hits"] += 1
+                return copy.deepcopy(self._run_results[key]), "run"
+            entry = self.state["entries"].get(key)
+            if entry and now - datetime.fromisoformat(entry["fetched_at"]) < self.ttl:
+                self.counters["cache_hits"] += 1
+                self._run_results[key] = entry["payload"]
+                return copy.deepcopy(entry["payload"]), "cache"
+        return None, "miss"
+
+    def stale(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.state["entries"].get(key)
+            if entry:
+                self.counters["stale_served"] += 1
+                return copy.deepcopy(entry["payload"])
+        return None
+
+    def put(self, key: str, payload: dict, now: datetime) -> None:
+        with self._lock:
+            self._run_results[key] = copy.deepcopy(payload)
+            self.state["entries"][key] = {"fetched_at": now.isoformat(), "payload": copy.deepcopy(payload)}
+
+    def count_call(self, now: datetime) -> None:
+        month = now.strftime("%Y-%m")
+        with self._lock:
+            self.run_calls += 1
+            self.state["monthly_calls"][month] = self.state["monthly_calls"].get(month, 0) + 1
+
+    def count_budget_skip(self) -> None:
+        with self._lock:
+            self.counters["budget_skips"] += 1
+
+    def month_calls(self, now: datetime) -> int:
+        with self._lock:
+            return self.state["monthly_calls"].get(now.strftime("%Y-%m"), 0)
+
+    def budget_exhausted(self, now: datetime, monthly_budget: int, run_budget: int) -> bool:
+        with self._lock:
+            month = self.state["monthly_calls"].get(now.strftime("%Y-%m"), 0)
+            return (monthly_budget > 0 and month >= monthly_budget) or (run_budget > 0 and self.run_calls >= run_budget)
+
+    def save(self, now: Optional[datetime] = None) -> None:
+        with self._lock:
+            if now is not None:
+                self.state["entries"] = {
+                    key: entry
+                    for key, entry in self.state["entries"].items()
+                    if now - datetime.fromisoformat(entry["fetched_at"]) < self.keep
+                }
+            payload = json.dumps(self.state, ensure_ascii=False, indent=2)
+        self.path.write_text(payload, encoding="utf-8")
@@ -0,0 +1,79 @@
+import copy
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class SeenArticleStore:
+    """First-seen time and resolved date of each article URL, per direct-site watcher."""
+
+    def __init__(self, path: str = "data/direct_site/seen_articles.json", ttl_days: int = 30):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = timedelta(days=ttl_days)
+        self.state: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+
+    def get(self, site: str, url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.state.get(site, {}).get(url)
+            return copy.deepcopy(entry) if entry else None
+
+    def record(
+        self,
+        site: str,
+        url: str,
+        seen_at: datetime,
+        published_at: Optional[datetime] = None,
+        date_source: str = "",
+        date_checked: bool = False,
+    ) -> dict:
+        stamp = seen_at.isoformat()
+        with self._lock:
+            entry = self.state.setdefault(site, {}).setdefault(
+                url, {"first_seen": stamp, "last_seen": stamp, "published_at": "", "date_source": ""}
+            )
+            entry["last_seen"] = stamp
+            if published_at is not None:
+                entry["published_at"] = published_at.isoformat()
+                entry["date_source"] = date_source
+            if date_checked:
+                entry["date_checked"] = True
+            return copy.deepcopy(entry)
+
+    @staticmethod
+    def is_resolved(entry: Optional[dict]) -> bool:
+        """True once the URL has a date, or its article page was fetched and had none."""
+        return bool(entry and (entry.get("published_at") or entry.get("date_checked")))
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        # 一覧から消えて ttl を過ぎた URL だけを削除する（first_seen 基準だと掲載中の記事が新着扱いに戻るため）。
+        limit = (now or datetime.now(timezone.utc)) - self.ttl
+        removed = 0
+        with self._lock:
+            for site in list(self.state):
+                urls = self.state[site]
+                for url in [u for u, e in urls.items() if _parse_ts(e.get("last_seen")) < limit]:
+                    del urls[url]
+                    removed += 1
+                if not urls:
+                    del self.state[site]
+        return removed
+
+    def save(self, now: Optional[datetime] = None) -> None:
+        self.prune(now)
+        with self._lock:
+            payload = json.dumps(self.state, ensure_ascii=False, indent=2)
+        self.path.write_text(payload, encoding="utf-8")
+
+
+def _parse_ts(value: Optional[str]) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value or "")
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -0,0 +1,96 @@
+import copy
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class SiteHealthStore:
+    """Per-site fetch health (rolling latency / error rate, last success) with run-count backoff.
+
+    After fail_threshold consecutive failures a site sits out 1, 2, 4, ... runs (capped at
+    max_skip_runs) and is then probed again; one success clears the backoff.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/direct_site/site_health.json",
+        fail_threshold: int = 2,
+        max_skip_runs: int = 16,
+        alpha: float = 0.3,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fail_threshold = max(1, fail_threshold)
+        self.max_skip_runs = max(1, max_skip_runs)
+        self.alpha = alpha
+        self.state: Dict[str, dict] = {}
+        self.skipped_this_run: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+
+    def get(self, site: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.state.get(site)
+            return copy.deepcopy(entry) if entry else None
+
+    def take_skip(self, site: str) -> bool:
+        """Consume one skipped run if the site is backed off; call once per site per run."""
+        with self._lock:
+            entry = self.state.get(site)
+            if not entry or entry.get("skip_runs_remaining", 0) <= 0:
+                return False
+            entry["skip_runs_remaining"] -= 1
+            self.skipped_this_run[site] = entry["skip_runs_remaining"]
+            return True
+
+    def record(self, site: str, ok: bool, status: str, latency_ms: float, now: datetime) -> dict:
+        with self._lock:
+            entry = self.state.setdefault(
+                site,
+                {
+                    "runs": 0,
+                    "latency_ms": None,
+                    "error_rate": 0.0,
+                    "consecutive_failures": 0,
+                    "last_status": "",
+                    "last_attempt_at": "",
+                    "last_success_at": "",
+                    "backoff_runs": 0,
+                    "skip_runs_remaining": 0,
+                },
+            )
+            entry["runs"] += 1
+            previous = entry["latency_ms"]
+            entry["latency_ms"] = round(latency_ms if previous is None else self.alpha * latency_ms + (1 - self.alpha) * previous, 1)
+            entry["error_rate"] = round(self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * entry["error_rate"], 4)
+            entry["last_status"] = status
+            entry["last_attempt_at"] = now.isoformat()
+            if ok:
+                entry["consecutive_failures"] = 0
+                entry["last_success_at"] = now.isoformat()
+                entry["backoff_runs"] = 0
+                entry["skip_runs_remaining"] = 0
+            else:
+                entry["consecutive_failures"] += 1
+                over = entry["consecutive_failures"] - self.fail_threshold
+                if over >= 0:
+                    entry["backoff_runs"] = min(2**over, self.max_skip_runs)
+                    entry["skip_runs_remaining"] = entry["backoff_runs"]
+            return copy.deepcopy(entry)
+
+    def backed_off(self) -> Dict[str, dict]:
+        """Sites skipped in this run or scheduled to be skipped in coming runs."""
+        with self._lock:
+            return {
+                site: copy.deepcopy(entry)
+                for site, entry in sorted(self.state.items())
+                if site in self.skipped_this_run or entry.get("skip_runs_remaining", 0) > 0
+            }
+
+    def save(self, now: Optional[datetime] = None) -> None:
+        with self._lock:
+            payload = json.dumps(self.state, ensure_ascii=False, indent=2)
+        self.path.write_text(payload, encoding="utf-8")
@@ -0,0 +1,36 @@
+import copy
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class SiteIndexStore:
+    """Discovered sitemap / feed endpoints per direct-site watcher, re-probed after ttl_days."""
+
+    def __init__(self, path: str = "data/direct_site/site_index.json", ttl_days: int = 7):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = timedelta(days=ttl_days)
+        self.state: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+
+    def get(self, site: str, now: datetime) -> Optional[List[str]]:
+        """Return cached endpoints (possibly empty) or None when discovery is due."""
+        with self._lock:
+            entry = self.state.get(site)
+            if not entry or now - datetime.fromisoformat(entry["checked_at"]) >= self.ttl:
+                return None
+            return copy.deepcopy(entry["endpoints"])
+
+    def put(self, site: str, endpoints: List[str], now: datetime) -> None:
+        with self._lock:
+            self.state[site] = {"endpoints": list(endpoints), "checked_at": now.isoformat()}
+
+    def save(self, now: Optional[datetime] = None) -> None:
+        with self._lock:
+            payload = json.dumps(self.state, ensure_ascii=False, indent=2)
+        self.path.write_text(payload, encoding="utf-8")
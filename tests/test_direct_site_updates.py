@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import json
 import sys
@@ -7,6 +7,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from direct_site_updates import (
+    HostThrottle,
+    collect_all_sites,
     collect_site_items,
     dedupe_and_limit,
     extract_candidates_from_list_page,
@@ -19,6 +21,10 @@ from direct_site_updates import (
     parse_list_page_urls,
     search_candidates,
     enrich_date_from_article,
+    find_next_page_url,
+    parse_html,
+    passes_title_filter,
+    resolve_html_parser,
 )
 
 
@@ -252,3 +258,574 @@ def test_missing_search_api_key_no_crash(monkeypatch):
     now = datetime(2026, 5, 1, 0, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
     monkeypatch.setattr("direct_site_updates.SEARCH_API_KEY", "")
     assert search_candidates(cfg, now) == []
+
+
+def test_collect_all_sites_merges_in_display_order(monkeypatch):
+    import time
+
+    sites = [
+        normalize_site_row({"SiteName": "slow", "DisplayOrder": 1}),
+        normalize_site_row({"SiteName": "fast", "DisplayOrder": 2}),
+        normalize_site_row({"SiteName": "broken", "DisplayOrder": 3}),
+    ]
+    now = datetime(2026, 5, 1, 0, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+
+    def fake_collect(cfg, now_dt, budget=None):
+        if cfg["SiteName"] == "broken":
+            raise RuntimeError("boom")
+        time.sleep(0.05 if cfg["SiteName"] == "slow" else 0)
+        return [SiteItem(cfg["SiteName"], "t", f"https://example.com/{cfg['SiteName']}", now_dt, "", "list_regex")]
+
+    monkeypatch.setattr("direct_site_updates.collect_site_items", fake_collect)
+    results = collect_all_sites(list(reversed(sites)), now, max_workers=3)
+    assert list(results) == ["slow", "fast", "broken"]
+    assert results["slow"][0].url == "https://example.com/slow"
+    assert results["broken"] == []
+
+
+def test_host_throttle_limits_concurrency_per_host():
+    import threading
+    import time
+
+    throttle = HostThrottle(max_concurrency=1, min_interval=0)
+    active = {"a.example.com": 0}
+    peak = {"a.example.com": 0}
+    lock = threading.Lock()
+
+    def worker():
+        with throttle.slot("https://a.example.com/list"):
+            with lock:
+                active["a.example.com"] += 1
+                peak["a.example.com"] = max(peak["a.example.com"], active["a.example.com"])
+            time.sleep(0.01)
+            with lock:
+                active["a.example.com"] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak["a.example.com"] == 1
+
+
+def test_article_enrichment_runs_in_batches_and_keeps_list_order(monkeypatch):
+    import time
+
+    cfg = normalize_site_row(
+        {
+            "SiteName": "enrich",
+            "ListPageUrls": "https://example.com/list",
+            "ArticleUrlPattern": r"/a/\d+",
+            "ArticleDatePattern": r"\d{4}/\d{2}/\d{2} \d{2}:\d{2}",
+            "MaxItemsPerSite": 2,
+        }
+    )
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    list_html = "".join(f'<p><a href="/a/{i}">Article {i}</a></p>' for i in range(1, 6))
+    article_dates = {
+        "https://example.com/a/1": "2026/05/01 10:00",
+        "https://example.com/a/2": "2026/04/01 10:00",
+        "https://example.com/a/3": "2026/05/01 09:00",
+        "https://example.com/a/4": "2026/05/01 08:00",
+        "https://example.com/a/5": "2026/05/01 07:00",
+    }
+    fetched = []
+
+    def fake_fetch(url, validators=None, until=None):
+        if url == "https://example.com/list":
+            return list_html, 200, url
+        fetched.append(url)
+        time.sleep(0.03 if url.endswith("/1") else 0)
+        return f"<html><body>{article_dates[url]}</body></html>", 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    items = collect_site_items(cfg, now)
+    assert [item.url for item in items] == ["https://example.com/a/1", "https://example.com/a/3"]
+    assert sorted(fetched) == ["https://example.com/a/1", "https://example.com/a/2", "https://example.com/a/3"]
+
+
+def test_list_page_tree_is_shared_between_extract_and_next_page():
+    cfg = normalize_site_row({"SiteName": "once", "ArticleUrlPattern": r"/news/"})
+    soup = parse_html('<a href="/news/1">One</a><a rel="next" href="/list?page=2">next</a>')
+    rows = extract_candidates_from_list_page(soup, "https://example.com/list", cfg)
+    assert [r["url"] for r in rows] == ["https://example.com/news/1"]
+    assert find_next_page_url(soup, "https://example.com/list", "") == "https://example.com/list?page=2"
+
+
+def test_html_parser_falls_back_when_backend_missing():
+    assert resolve_html_parser("no-such-parser") == "html.parser"
+    assert resolve_html_parser("html.parser") == "html.parser"
+    assert resolve_html_parser("auto") in {"lxml", "html.parser"}
+
+
+def test_unchanged_list_page_reuses_cached_candidates(monkeypatch, tmp_path):
+    import direct_site_updates
+    from src.stores.list_page_cache import ListPageCache
+
+    cfg = normalize_site_row(
+        {
+            "SiteName": "cond",
+            "ListPageUrls": "https://example.com/list",
+            "ArticleUrlPattern": r"/a/\d+",
+            "ListDatePattern": r"\d{4}/\d{2}/\d{2}",
+            "DateGranularity": "date",
+        }
+    )
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    cache = ListPageCache(str(tmp_path / "list_page_cache.json"))
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "list_pages", cache)
+    requests = []
+
+    def fake_fetch(url, validators=None, until=None):
+        requests.append(dict(validators or {}))
+        if validators and validators.get("etag") == '"v1"':
+            return "", 304, url
+        validators["etag"] = '"v1"'
+        return '<p><a href="/a/1">One</a> 2026/05/01</p>', 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    first = collect_site_items(cfg, now)
+    cache.save()
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "list_pages", ListPageCache(str(tmp_path / "list_page_cache.json")))
+    monkeypatch.setattr("direct_site_updates.parse_html", lambda *_: (_ for _ in ()).throw(RuntimeError("should not parse")))
+    second = collect_site_items(cfg, now)
+    assert requests == [{}, {"etag": '"v1"', "last_modified": ""}]
+    assert [i.url for i in first] == [i.url for i in second] == ["https://example.com/a/1"]
+
+    changed = normalize_site_row({**{k: cfg[k] for k in ("SiteName", "ArticleUrlPattern")}, "ListPageUrls": "https://example.com/list"})
+    assert direct_site_updates.CRAWL_STATE.list_pages.get("https://example.com/list", direct_site_updates.list_extraction_fingerprint(changed)) is None
+
+
+def test_seen_articles_skip_enrichment_and_fall_back_to_first_seen(monkeypatch, tmp_path):
+    import direct_site_updates
+    from src.stores.seen_article_store import SeenArticleStore
+
+    cfg = normalize_site_row(
+        {
+            "SiteName": "seen",
+            "ListPageUrls": "https://example.com/list",
+            "ArticleUrlPattern": r"/a/\d+",
+            "ArticleDatePattern": r"\d{4}/\d{2}/\d{2} \d{2}:\d{2}",
+            "DateFallbackMode": "use_fetched_at",
+        }
+    )
+    store = SeenArticleStore(str(tmp_path / "seen_articles.json"))
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "seen_articles", store)
+    article_fetches = []
+
+    def fake_fetch(url, validators=None, until=None):
+        if url == "https://example.com/list":
+            return '<a href="/a/1">Dated</a><a href="/a/2">Undated</a>', 200, url
+        article_fetches.append(url)
+        return ("<p>2026/05/01 09:00</p>" if url.endswith("/1") else "<p>no date</p>"), 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    day1 = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    first = collect_site_items(cfg, day1)
+    assert [(i.url, i.date_source) for i in first] == [
+        ("https://example.com/a/1", "article_regex"),
+        ("https://example.com/a/2", "fetched_at"),
+    ]
+    assert len(article_fetches) == 2
+
+    store.save(day1)
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "seen_articles", SeenArticleStore(str(tmp_path / "seen_articles.json")))
+    day3 = datetime(2026, 5, 3, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    assert collect_site_items(cfg, day3) == []
+    assert len(article_fetches) == 2
+    entry = direct_site_updates.CRAWL_STATE.seen_articles.get("seen", "https://example.com/a/2")
+    assert entry["first_seen"] == day1.isoformat()
+    assert entry["last_seen"] == day3.isoformat()
+
+
+def test_seen_articles_refetch_dates_when_enrichment_did_not_finish(monkeypatch, tmp_path):
+    import direct_site_updates
+    from src.stores.seen_article_store import SeenArticleStore
+
+    cfg = normalize_site_row(
+        {
+            "SiteName": "seen-retry",
+            "ListPageUrls": "https://example.com/list",
+            "ArticleUrlPattern": r"/a/\d+",
+            "ArticleDatePattern": r"\d{4}/\d{2}/\d{2} \d{2}:\d{2}",
+            "DateFallbackMode": "use_fetched_at",
+        }
+    )
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "seen_articles", SeenArticleStore(str(tmp_path / "seen_articles.json")))
+    article_fetches = []
+
+    def fake_fetch(url, validators=None, until=None):
+        if url == "https://example.com/list":
+            return '<a href="/a/1">Story</a>', 200, url
+        article_fetches.append(url)
+        if len(article_fetches) == 1:
+            raise TimeoutError("read timed out")
+        return "<p>2026/05/02 09:00</p>", 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    day1 = datetime(2026, 5, 2, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    assert [i.date_source for i in collect_site_items(cfg, day1)] == ["fetched_at"]
+    entry = direct_site_updates.CRAWL_STATE.seen_articles.get("seen-retry", "https://example.com/a/1")
+    assert not SeenArticleStore.is_resolved(entry)
+
+    direct_site_updates.CRAWL_STATE.seen_articles.save(day1)
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "seen_articles", SeenArticleStore(str(tmp_path / "seen_articles.json")))
+    collect_site_items(cfg, day1 + timedelta(hours=1))
+    assert article_fetches == ["https://example.com/a/1", "https://example.com/a/1"]
+    entry = direct_site_updates.CRAWL_STATE.seen_articles.get("seen-retry", "https://example.com/a/1")
+    assert entry["published_at"].startswith("2026-05-02T09:00") and entry["date_source"] == "article_regex"
+    assert entry["first_seen"] == day1.isoformat()
+
+
+def test_seen_article_store_prunes_by_last_seen(tmp_path):
+    from src.stores.seen_article_store import SeenArticleStore
+
+    store = SeenArticleStore(str(tmp_path / "seen.json"), ttl_days=30)
+    old = datetime(2026, 1, 1, tzinfo=ZoneInfo("UTC"))
+    store.record("s", "https://example.com/gone", old)
+    store.record("s", "https://example.com/still-listed", old)
+    store.record("s", "https://example.com/still-listed", datetime(2026, 3, 1, tzinfo=ZoneInfo("UTC")))
+    assert store.prune(datetime(2026, 3, 2, tzinfo=ZoneInfo("UTC"))) == 1
+    assert store.get("s", "https://example.com/still-listed")["first_seen"] == old.isoformat()
+
+
+def test_site_profile_is_compiled_once_with_run_window():
+    import dataclasses
+
+    import pytest
+
+    from direct_site_updates import SiteProfile
+
+    cfg = normalize_site_row(
+        {
+            "SiteName": "profile",
+            "ArticleUrlPattern": r"/news/\d+",
+            "ExcludeTitlePattern": "PR",
+            "ArticleLinkSelector": "ul.list a",
+            "NextPageSelector": "a[[broken",
+            "TargetDateMode": "calendar_day",
+        }
+    )
+    profile = cfg["profile"]
+    assert isinstance(profile, SiteProfile)
+    assert profile.article_url.search("https://example.com/news/12")
+    assert profile.next_page_selector is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        profile.site_name = "other"
+
+    tz = ZoneInfo("Asia/Tokyo")
+    run = profile.for_run(datetime(2026, 4, 5, 12, 0, tzinfo=tz))
+    assert run.in_window(datetime(2026, 4, 4, 0, 0, tzinfo=tz))
+    assert run.in_window(datetime(2026, 4, 5, 23, 59, 59, tzinfo=tz))
+    assert not run.in_window(datetime(2026, 4, 6, 0, 0, tzinfo=tz))
+    assert not run.in_window(datetime(2026, 4, 3, 23, 59, tzinfo=tz))
+    assert passes_title_filter("PR: new product", run) == (False, "exclude_pattern_matched")
+
+    html = '<ul class="list"><a href="/news/1">One</a><a href="/about">About</a></ul><a href="/news/2">Side</a>'
+    rows = extract_candidates_from_list_page(html, "https://example.com/", cfg)
+    assert [r["url"] for r in rows] == ["https://example.com/news/1"]
+
+
+def test_find_article_date_settles_on_partial_pages():
+    from direct_site_updates import find_article_date
+
+    selector_cfg = normalize_site_row({"SiteName": "sel", "ArticleDateSelector": "time.pub", "DateGranularity": "datetime"})
+    head = '<html><head><meta property="article:published_time" content="2026-05-01T00:30:00Z"></head><body>'
+    partial = head + '<time class="pub">2026/05/01 09:00</time><p>' + "x" * 1000
+    assert find_article_date(partial, selector_cfg["profile"], complete=False) == ("2026/05/01 09:00", "article_selector", True)
+    assert find_article_date(head + '<time class="pub">2026/05/', selector_cfg["profile"], complete=False)[2] is False
+    assert find_article_date(head + "<p>no date</p>", selector_cfg["profile"], complete=True) == (
+        "2026/05/01 09:30",
+        "article_meta",
+        True,
+    )
+
+    bare_cfg = normalize_site_row({"SiteName": "bare"})
+    ld = '<html><head><script type="application/ld+json">{"@graph": [{"datePublished": "2026-04-30T22:00:00+09:00"}]}</script></head><body>'
+    assert find_article_date(ld, bare_cfg["profile"], complete=False) == ("2026/04/30 22:00", "article_meta", True)
+
+
+def test_pagination_stops_when_page_is_older_than_window(monkeypatch):
+    pages = {
+        "https://example.com/list": '<p><a href="/a/1">New</a> 2026/05/01</p><p><a href="/a/2">Old</a> 2026/04/20</p><a rel="next" href="/list?p=2">next</a>',
+        "https://example.com/list?p=2": '<p><a href="/a/3">Older</a> 2026/04/10</p><a rel="next" href="/list?p=3">next</a>',
+        "https://example.com/list?p=3": '<p><a href="/a/4">Oldest</a> 2026/04/01</p>',
+    }
+    fetched = []
+
+    def fake_fetch(url, validators=None, until=None):
+        fetched.append(url)
+        return pages[url], 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    row = {
+        "SiteName": "paged",
+        "ListPageUrls": "https://example.com/list",
+        "ArticleUrlPattern": r"/a/\d+",
+        "ListDatePattern": r"\d{4}/\d{2}/\d{2}",
+        "DateGranularity": "date",
+        "TargetDateMode": "calendar_day",
+        "MaxPages": 5,
+    }
+    items = collect_site_items(normalize_site_row({**row, "StopPagingOutOfWindow": True}), now)
+    assert [i.url for i in items] == ["https://example.com/a/1"]
+    assert fetched == ["https://example.com/list", "https://example.com/list?p=2"]
+
+    fetched.clear()
+    collect_site_items(normalize_site_row(row), now)
+    assert len(fetched) == 3
+
+
+def test_search_cache_dedupes_and_respects_budget(monkeypatch, tmp_path):
+    import threading
+    import urllib.parse
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import direct_site_updates
+    from src.stores.search_cache_store import SearchCache
+
+    calls = []
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)["q"][0]
+            calls.append(query)
+            body = json.dumps({"organic_results": [{"title": query, "link": f"https://example.com/{len(calls)}"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr("direct_site_updates.SEARCH_API_ENDPOINT", f"http://127.0.0.1:{server.server_address[1]}/search.json")
+    monkeypatch.setattr("direct_site_updates.SEARCH_API_KEY", "test")
+    monkeypatch.setattr("direct_site_updates.DIRECT_SITE_SEARCH_MONTHLY_BUDGET", 1)
+    path = str(tmp_path / "search_cache.json")
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "search_cache", SearchCache(path))
+    now = datetime(2026, 5, 1, 7, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    shared = [normalize_site_row({"SiteName": f"s{i}", "FetchMode": "search_only", "SearchQuery": "steel", "DateFallbackMode": "use_fetched_at"}) for i in range(3)]
+    try:
+        results = collect_all_sites(shared, now, max_workers=3)
+        assert calls == ["steel"]
+        assert all(len(items) == 1 for items in results.values())
+
+        low = normalize_site_row({"SiteName": "low", "FetchMode": "direct_then_search", "SearchQuery": "scrap"})
+        high = normalize_site_row({"SiteName": "high", "FetchMode": "search_only", "SearchQuery": "iron"})
+        assert low["SearchPriority"] == "low"
+        assert search_candidates(low, now) == []
+        assert len(search_candidates(high, now)) == 1
+        assert calls == ["steel", "iron"]
+
+        direct_site_updates.CRAWL_STATE.search_cache.save(now)
+        reloaded = SearchCache(path)
+        monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "search_cache", reloaded)
+        assert len(search_candidates(shared[0], now + timedelta(hours=1))) == 1
+        assert calls == ["steel", "iron"]
+        assert reloaded.month_calls(now) == 2
+    finally:
+        server.shutdown()
+
+
+def test_index_documents_parse_news_sitemaps_and_feeds():
+    from src.sources.site_index import parse_index_document, parse_robots_sitemaps
+
+    tz = ZoneInfo("Asia/Tokyo")
+    sitemap = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url><loc>https://example.com/a/1</loc><news:news><news:publication_date>2026-05-01T00:30:00Z</news:publication_date><news:title>Steel output</news:title></news:news></url>
+  <url><loc>https://example.com/about</loc><lastmod>2026-05-01</lastmod></url>
+</urlset>"""
+    kind, entries, children = parse_index_document(sitemap, "https://example.com/sitemap.xml", tz)
+    assert kind == "sitemap" and children == []
+    assert entries == [{"title": "Steel output", "url": "https://example.com/a/1", "date_text": "2026/05/01 09:30", "date_source": "sitemap"}]
+
+    index = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"><sitemap><loc>https://example.com/news-1.xml</loc><lastmod>2026-05-01</lastmod></sitemap></sitemapindex>'
+    assert parse_index_document(index, "https://example.com/sitemap.xml", tz) == ("sitemap", [], [("https://example.com/news-1.xml", "2026-05-01")])
+
+    rss = """<rss version="2.0"><channel><title>t</title>
+<item><title>Scrap prices</title><link>/a/2</link><pubDate>Fri, 01 May 2026 01:00:00 GMT</pubDate></item>
+</channel></rss>"""
+    kind, entries, _ = parse_index_document(rss, "https://example.com/feed", tz)
+    assert kind == "feed"
+    assert entries == [{"title": "Scrap prices", "url": "https://example.com/a/2", "date_text": "2026/05/01 10:00", "date_source": "feed"}]
+    assert parse_robots_sitemaps("User-agent: *\nSitemap: https://example.com/news.xml\n") == ["https://example.com/news.xml"]
+
+
+def test_sitemap_mode_discovers_feed_and_falls_back_to_list_pages(monkeypatch, tmp_path):
+    import direct_site_updates
+    from src.stores.site_index_store import SiteIndexStore
+
+    rss = """<rss version="2.0"><channel><title>t</title>
+<item><title>Steel news</title><link>https://example.com/a/1</link><pubDate>Fri, 01 May 2026 01:00:00 GMT</pubDate></item>
+<item><title>Company info</title><link>https://example.com/about</link><pubDate>Fri, 01 May 2026 01:00:00 GMT</pubDate></item>
+</channel></rss>"""
+    pages = {
+        "https://example.com/list": '<html><head><link rel="alternate" type="application/rss+xml" href="/feed"></head><body><p><a href="/a/9">Listed</a> 2026/05/01</p></body></html>',
+        "https://example.com/feed": rss,
+        "https://example.com/robots.txt": "User-agent: *\n",
+    }
+    fetched = []
+
+    def fake_fetch(url, validators=None, until=None):
+        fetched.append(url)
+        return pages[url], 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    store = SiteIndexStore(str(tmp_path / "site_index.json"))
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "site_index", store)
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    row = {
+        "SiteName": "indexed",
+        "FetchMode": "sitemap",
+        "ListPageUrls": "https://example.com/list",
+        "ArticleUrlPattern": r"/a/\d+",
+        "ListDatePattern": r"\d{4}/\d{2}/\d{2}",
+        "DateGranularity": "date",
+        "TargetDateMode": "calendar_day",
+    }
+    items = collect_site_items(normalize_site_row(row), now)
+    assert [(i.url, i.date_source) for i in items] == [("https://example.com/a/1", "feed")]
+    assert store.get("indexed", now) == ["https://example.com/feed"]
+
+    fetched.clear()
+    items = collect_site_items(normalize_site_row(row), now)
+    assert fetched == ["https://example.com/feed"]
+
+    store.put("indexed", [], now)
+    items = collect_site_items(normalize_site_row(row), now)
+    assert [i.url for i in items] == ["https://example.com/a/9"]
+
+
+def test_header_probe_stands_in_for_article_fetch(monkeypatch):
+    from direct_site_updates import header_date_text
+
+    tz = ZoneInfo("Asia/Tokyo")
+    assert header_date_text({"Last-Modified": "Fri, 01 May 2026 01:00:00 GMT", "Date": "Fri, 01 May 2026 03:00:00 GMT"}, tz) == ("2026/05/01 10:00", "last_modified")
+    assert header_date_text({"Last-Modified": "Fri, 01 May 2026 03:00:00 GMT", "Date": "Fri, 01 May 2026 03:00:05 GMT"}, tz) == ("", "dynamic_last_modified")
+    assert header_date_text({}, tz) == ("", "no_last_modified")
+
+    headers = {"Last-Modified": "Fri, 01 May 2026 01:00:00 GMT", "Date": "Fri, 01 May 2026 03:00:00 GMT"}
+    body_fetches = []
+    monkeypatch.setattr("direct_site_updates.fetch_headers", lambda url: (200, headers, url))
+    monkeypatch.setattr("direct_site_updates.fetch_html", lambda url, *_: body_fetches.append(url) or ("<time>2026/04/30</time>", 200, url))
+    cfg = normalize_site_row({"SiteName": "cms", "DateFromHeaders": True, "ArticleDateSelector": "time"})
+    cand = enrich_date_from_article({"url": "https://example.com/a/1", "date_text": "", "date_source": "failed"}, cfg)
+    assert (cand["date_text"], cand["date_source"], body_fetches) == ("2026/05/01 10:00", "last_modified", [])
+
+    headers = {"Last-Modified": "Fri, 01 May 2026 03:00:00 GMT", "Date": "Fri, 01 May 2026 03:00:00 GMT"}
+    cand = enrich_date_from_article({"url": "https://example.com/a/2", "date_text": "", "date_source": "failed"}, cfg)
+    assert cand["date_text"] == "2026/04/30"
+    assert body_fetches == ["https://example.com/a/2"]
+
+
+def test_failing_site_is_backed_off_and_reprobed(monkeypatch, tmp_path):
+    import urllib.error
+
+    import direct_site_updates
+    from src.stores.site_health_store import SiteHealthStore
+
+    responses = {"status": 403}
+    fetched = []
+
+    def fake_fetch(url, validators=None, until=None):
+        fetched.append(url)
+        if responses["status"] >= 400:
+            raise urllib.error.HTTPError(url, responses["status"], "blocked", None, None)
+        return '<p><a href="/a/1">Steel</a> 2026/05/01</p>', 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    health = SiteHealthStore(str(tmp_path / "site_health.json"), fail_threshold=2)
+    monkeypatch.setattr(direct_site_updates.CRAWL_STATE, "site_health", health)
+    cfg = normalize_site_row({"SiteName": "blocked", "ListPageUrls": "https://example.com/list", "ArticleUrlPattern": r"/a/\d+", "ListDatePattern": r"\d{4}/\d{2}/\d{2}"})
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+
+    # 2 回失敗で 1 回休み、再試行でも失敗すると 2 回休む。
+    for _ in range(5):
+        collect_site_items(cfg, now)
+    assert len(fetched) == 3
+    entry = health.get("blocked")
+    assert (entry["consecutive_failures"], entry["last_status"], entry["skip_runs_remaining"]) == (3, "403", 1)
+    assert entry["last_success_at"] == ""
+    assert list(health.backed_off()) == ["blocked"]
+
+    responses["status"] = 200
+    collect_site_items(cfg, now)
+    assert len(fetched) == 3
+    collect_site_items(cfg, now)
+    assert len(fetched) == 4
+    entry = health.get("blocked")
+    assert (entry["consecutive_failures"], entry["skip_runs_remaining"], entry["last_success_at"]) == (0, 0, now.isoformat())
+    health.skipped_this_run.clear()
+    assert health.backed_off() == {}
+
+
+def test_site_budget_stops_collection_and_run_deadline_skips_late_sites(monkeypatch):
+    import time
+
+    pages = {
+        "https://example.com/list": '<p><a href="/a/1">Dated</a> 2026/05/01</p><p><a href="/a/2">Undated</a></p><a rel="next" href="/list?p=2">next</a>',
+        "https://example.com/list?p=2": '<p><a href="/a/3">Later</a> 2026/05/01</p>',
+    }
+    fetched = []
+
+    def fake_fetch(url, validators=None, until=None):
+        fetched.append(url)
+        time.sleep(0.05)
+        return pages.get(url, "<html></html>"), 200, url
+
+    monkeypatch.setattr("direct_site_updates.fetch_html", fake_fetch)
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=ZoneInfo("Asia/Tokyo"))
+    row = {
+        "ListPageUrls": "https://example.com/list",
+        "ArticleUrlPattern": r"/a/\d+",
+        "ListDatePattern": r"\d{4}/\d{2}/\d{2}",
+        "DateGranularity": "date",
+        "TargetDateMode": "calendar_day",
+        "MaxPages": 3,
+        "TimeBudgetSeconds": 1,
+    }
+    sites = [normalize_site_row({**row, "SiteName": "first", "DisplayOrder": 1}), normalize_site_row({**row, "SiteName": "second", "DisplayOrder": 2})]
+    monkeypatch.setattr("direct_site_updates.DIRECT_SITE_SITE_BUDGET_SECONDS", 0.01)
+    results = collect_all_sites([{**sites[0], "TimeBudgetSeconds": 0}], now, max_workers=1)
+    assert [i.url for i in results["first"]] == ["https://example.com/a/1"]
+    assert fetched == ["https://example.com/list"]
+
+    fetched.clear()
+    results = collect_all_sites(sites, now, max_workers=1, run_deadline_seconds=0.01)
+    assert results["second"] == []
+    assert fetched == ["https://example.com/list"]
+
+
+def test_list_container_selector_scopes_links_and_dates():
+    html = """
+    <ul class="news">
+      <li class="item"><a href="/a/1"><img src="x.png"></a><a href="/tag/steel">Steel</a>
+        <a href="/a/1">Output rises</a><span class="date">2026/05/01</span></li>
+      <li class="item"><a href="/a/2">Prices fall</a><span class="date">2026/04/30</span></li>
+      <li class="item"><a href="/a/3">No date here</a></li>
+    </ul>
+    <div class="sidebar"><a href="/a/9">Ranking</a> 2026/05/01</div>
+    """
+    base = {"SiteName": "scoped", "ArticleUrlPattern": r"/a/\d+", "ListDatePattern": r"\d{4}/\d{2}/\d{2}"}
+    rows = extract_candidates_from_list_page(html, "https://example.com/news", normalize_site_row({**base, "ListContainerSelector": "li.item"}))
+    assert [(r["title"], r["url"], r["date_text"]) for r in rows] == [
+        ("Output rises", "https://example.com/a/1", "2026/05/01"),
+        ("Prices fall", "https://example.com/a/2", "2026/04/30"),
+        ("No date here", "https://example.com/a/3", ""),
+    ]
+
+    rows = extract_candidates_from_list_page(
+        html, "https://example.com/news", normalize_site_row({**base, "ListContainerSelector": "li.item", "ListDateSelector": "span.date"})
+    )
+    assert [(r["date_text"], r["date_source"]) for r in rows] == [("2026/05/01", "list_selector"), ("2026/04/30", "list_selector"), ("", "failed")]
+
+    # 枠が見つからない場合はページ全体のアンカーに戻る。
+    rows = extract_candidates_from_list_page(html, "https://example.com/news", normalize_site_row({**base, "ListContainerSelector": "div.missing"}))
+    assert [r["url"] for r in rows][-1] == "https://example.com/a/9"
@@ -0,0 +1,154 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.sources.http_client import PooledHttpClient, detect_charset
+
+PAGE = '<html><head><meta charset="shift_jis"></head><body>鉄鋼ニュース</body></html>'.encode("shift_jis") * 20
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        body = PAGE
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_pooled_client_reuses_connection_and_decodes_gzip_with_meta_charset():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/list"
+    client = PooledHttpClient(pool_maxsize=2, timeout=5)
+    try:
+        first = client.get(url)
+        second = client.get(url)
+    finally:
+        client.close()
+        server.shutdown()
+    assert first.status == 200
+    assert first.encoding == "shift_jis"
+    assert "鉄鋼ニュース" in second.text
+    assert len(_Handler.connections) == 1
+    stats = client.stats_snapshot()[f"127.0.0.1:{server.server_address[1]}"]
+    assert stats.requests == 2
+    assert stats.body_bytes == 2 * len(PAGE)
+    assert 0 < stats.wire_bytes < stats.body_bytes
+
+
+def test_detect_charset_prefers_header_then_meta():
+    assert detect_charset("text/html; charset=EUC-JP", b'<meta charset="utf-8">') == "euc_jp"
+    assert detect_charset("text/html", b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">') == "shift_jis"
+    assert detect_charset("", b"<html></html>") == "utf-8"
+    assert detect_charset("text/html; charset=bogus", b"") == "utf-8"
+
+
+class _LargeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<html><head></head><body><time>2026/05/01</time>" + b"<p>filler</p>" * 40000 + b"</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def test_get_prefix_stops_reading_when_done():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LargeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/article"
+    client = PooledHttpClient(timeout=5)
+    seen_lengths = []
+
+    def done(prefix):
+        seen_lengths.append(len(prefix))
+        return "2026/05/01" in prefix
+
+    try:
+        result = client.get_prefix(url, None, done)
+    finally:
+        client.close()
+        server.shutdown()
+    assert result.complete is False
+    assert "2026/05/01" in result.text
+    assert len(result.text) < 100 * 1024
+    assert seen_lengths == [len(result.text)]
+
+
+def test_head_returns_headers_without_body():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/article"
+    client = PooledHttpClient(timeout=5)
+    try:
+        unsupported = client.head(url)
+        prefix = client.get_prefix(url, None, lambda _: True, first_chunk_bytes=1)
+    finally:
+        client.close()
+        server.shutdown()
+    assert unsupported.status == 501 and unsupported.text == ""
+    assert prefix.status == 200 and prefix.headers["Content-Type"] == "text/html"
+
+
+class _BrotliHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    accept_encodings = []
+
+    def do_GET(self):
+        import brotli
+
+        _BrotliHandler.accept_encodings.append(self.headers.get("Accept-Encoding", ""))
+        body = PAGE
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        if "br" in [x.strip() for x in self.headers.get("Accept-Encoding", "").split(",")]:
+            body = brotli.compress(body)
+            self.send_header("Content-Encoding", "br")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_brotli_is_advertised_and_decoded_when_installed():
+    pytest.importorskip("brotli")
+    from src.sources.http_client import ACCEPT_ENCODING
+
+    assert "br" in [x.strip() for x in ACCEPT_ENCODING.split(",")]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BrotliHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/list"
+    client = PooledHttpClient(timeout=5)
+    try:
+        result = client.get(url)
+    finally:
+        client.close()
+        server.shutdown()
+    assert "br" in _BrotliHandler.accept_encodings[0]
+    assert "鉄鋼ニュース" in result.text
+    stats = client.stats_snapshot()[f"127.0.0.1:{server.server_address[1]}"]
+    assert 0 < stats.wire_bytes < stats.body_bytes
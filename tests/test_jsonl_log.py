@@ -0,0 +1,35 @@
+import json
+import os
+
+from src.stores.jsonl_log import JsonlLog, read_jsonl, read_records
+
+
+def test_jsonl_log_flushes_each_write_and_ignores_torn_tail(tmp_path):
+    path = tmp_path / "out.jsonl"
+    log = JsonlLog(path)
+    log.write({"n": 1})
+    log.write({"n": 2}, {"n": 3})
+    assert read_jsonl(path) == [{"n": 1}, {"n": 2}, {"n": 3}]
+    log.close()
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"n": 4')
+    assert read_jsonl(path) == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+def test_read_records_prefers_the_newer_of_json_and_jsonl(tmp_path):
+    json_path = tmp_path / "articles.json"
+    jsonl_path = tmp_path / "articles.jsonl"
+    assert read_records(json_path) == []
+
+    jsonl_path.write_text('{"url": "a"}\n{"url": "b"}\n', encoding="utf-8")
+    assert read_records(json_path) == [{"url": "a"}, {"url": "b"}]
+
+    json_path.write_text(json.dumps([{"url": "final"}]), encoding="utf-8")
+    os.utime(jsonl_path, (1, 1))
+    assert read_records(json_path) == [{"url": "final"}]
+    assert read_records(jsonl_path) == [{"url": "final"}]
+
+    # 前回の .json が残っていても、今回の途中経過（より新しい .jsonl）を読む。
+    os.utime(json_path, (1, 1))
+    os.utime(jsonl_path, (2, 2))
+    assert read_records(json_path) == [{"url": "a"}, {"url": "b"}]
@@ -1,3 +1,8 @@
+import json
+import shutil
+
+import pytest
+
 from scripts.nikkei_fetch_articles_full import (
     classify_empty_body_reason,
     is_probably_navigation_text,
@@ -67,3 +72,696 @@ def test_navigation_classifier_rejects_link_list_text():
         ]
     )
     assert is_probably_navigation_text(text) is True
+
+
+def test_article_pool_keeps_input_order_and_sequential_limits():
+    import threading
+    import time
+    from contextlib import contextmanager
+
+    from scripts.nikkei_fetch_articles_full import merge_article_outcomes, run_article_pool
+
+    arts = [{'url': f'https://www.nikkei.com/paper/article/?ng={n}', 'title': str(n)} for n in range(1, 9)]
+    opened = []
+
+    @contextmanager
+    def open_worker():
+        opened.append(threading.current_thread().name)
+
+        def fetch(i, a):
+            time.sleep(0.02 if i % 2 else 0)
+            ok = i != 3
+            return {
+                'index': i,
+                'res': {'url': a['url']} if ok else None,
+                'fail': [] if ok else [{'status': 'failed', 'url': a['url']}],
+                'inventory': [{'url': a['url'], 'status': 'fetched_new' if ok else 'failed_other'}],
+                'dom_logs': [{'url': a['url']}],
+                'retry_without_resource_block_success': i == 2,
+            }
+
+        yield fetch
+
+    outcomes = run_article_pool(arts, open_worker, 3, 0, 0)
+    assert len(opened) == 3
+    # 1 ワーカーは呼び出し元スレッドで動く（共有ブラウザを使えるように）。
+    assert threading.current_thread().name in opened
+    assert [o['index'] for o in outcomes] == list(range(1, 9))
+    res, fail, inventory, dom_logs, attempted, retry_success = merge_article_outcomes(outcomes, 0, 0)
+    assert [r['url'] for r in res] == [a['url'] for n, a in enumerate(arts, 1) if n != 3]
+    assert fail == [{'status': 'failed', 'url': arts[2]['url'], 'retry_without_resource_block_success': True}]
+    assert [x['url'] for x in inventory] == [a['url'] for a in arts]
+    assert (attempted, retry_success) == (8, True)
+
+    # 並列時に上限を超えて取得した分は、逐次実行と同じ位置で切り捨てる。
+    outcomes = run_article_pool(arts, open_worker, 3, 2, 0)
+    res, fail, inventory, _, attempted, _ = merge_article_outcomes(outcomes, 2, 0)
+    assert [r['url'] for r in res] == [arts[0]['url'], arts[1]['url']]
+    assert attempted == 2 and fail == []
+
+
+def test_article_session_reuses_blocking_context_and_resets_on_demand():
+    from scripts.nikkei_fetch_articles_full import ArticleSession
+
+    class FakePage:
+        def __init__(self):
+            self.closed = False
+            self.visits = []
+
+        def goto(self, url, timeout=None):
+            self.visits.append(url)
+
+        def is_closed(self):
+            return self.closed
+
+        def close(self):
+            self.closed = True
+
+    class FakeContext:
+        def __init__(self):
+            self.routes = 0
+            self.closed = False
+            self.pages = []
+
+        def route(self, pattern, handler):
+            self.routes += 1
+
+        def on(self, event, handler):
+            pass
+
+        def new_page(self):
+            self.pages.append(FakePage())
+            return self.pages[-1]
+
+        def close(self):
+            self.closed = True
+
+    class FakeBrowser:
+        def __init__(self):
+            self.contexts = []
+
+        def new_context(self, **kwargs):
+            self.contexts.append(FakeContext())
+            return self.contexts[-1]
+
+    browser = FakeBrowser()
+    session = ArticleSession(browser, reuse=True)
+    first = session.open_page(True)
+    session.release(True)
+    second = session.open_page(True)
+    session.release(True)
+    assert first is second
+    assert second.visits == ['about:blank']
+    assert len(browser.contexts) == 1 and browser.contexts[0].routes == 1
+
+    unblocked = session.open_page(False)
+    session.release(False)
+    assert unblocked is not first
+    assert browser.contexts[1].routes == 0 and browser.contexts[1].closed
+    assert not browser.contexts[0].closed
+
+    session.reset('login_wall')
+    assert browser.contexts[0].closed
+    third = session.open_page(True)
+    assert third is not first and len(browser.contexts) == 3
+    session.close()
+    assert browser.contexts[2].closed
+
+    adopted = FakeContext()
+    session = ArticleSession(FakeBrowser(), reuse=True, context=adopted)
+    session.open_page(True)
+    session.release(True)
+    assert session.contexts_created == 0 and adopted.routes == 1 and len(adopted.pages) == 1
+
+    session = ArticleSession(FakeBrowser(), reuse=False)
+    session.open_page(True)
+    session.release(True)
+    session.open_page(True)
+    session.release(True)
+    assert session.contexts_created == 2 and all(c.closed for c in session.browser.contexts)
+
+
+def _article_paragraphs():
+    return [f"日本企業が設備投資を拡大する。景気回復への期待が高まっている。第{i}段落。" for i in range(1, 12)]
+
+
+# ブラウザなしで選択スクリプトを node 上で動かすための最小限の DOM（タグ・class・属性セレクタのみ対応）。
+_FAKE_DOM_JS = r"""
+const matchCompound = (el, sel) => {
+  const m = sel.trim().match(/^([a-z0-9]*)((?:\.[\w-]+|\[[^\]]+\])*)$/i);
+  if (!m) return false;
+  if (m[1] && el.tag !== m[1].toLowerCase()) return false;
+  for (const part of m[2].match(/\.[\w-]+|\[[^\]]+\]/g) || []) {
+    if (part[0] === '.') {
+      if (!(el.attrs.class || '').split(/\s+/).includes(part.slice(1))) return false;
+      continue;
+    }
+    const a = part.slice(1, -1).match(/^([\w-]+)(?:(\*?=)"([^"]*)")?$/);
+    const value = el.attrs[a[1]];
+    if (value === undefined) return false;
+    if (a[2] === '=' && value !== a[3]) return false;
+    if (a[2] === '*=' && !value.includes(a[3])) return false;
+  }
+  return true;
+};
+const matches = (el, sel) => sel.split(',').some(s => matchCompound(el, s));
+class El {
+  constructor(tag, attrs, kids) {
+    this.tag = tag; this.attrs = attrs || {}; this.parent = null;
+    this.text = typeof kids === 'string' ? kids : '';
+    this.children = Array.isArray(kids) ? kids : [];
+    this.children.forEach(c => { c.parent = this; });
+  }
+  descendants() { return this.children.flatMap(c => [c, ...c.descendants()]); }
+  querySelectorAll(sel) { return this.descendants().filter(d => matches(d, sel)); }
+  querySelector(sel) { return this.querySelectorAll(sel)[0] || null; }
+  closest(sel) { for (let n = this; n; n = n.parent) if (matches(n, sel)) return n; return null; }
+  cloneNode() { return new El(this.tag, {...this.attrs}, this.text || this.children.map(c => c.cloneNode())); }
+  remove() { if (this.parent) this.parent.children = this.parent.children.filter(c => c !== this); this.parent = null; }
+  get innerText() { return this.text || this.children.map(c => c.innerText).filter(Boolean).join('\n'); }
+  get outerHTML() { return ''; }
+}
+const build = (spec) => typeof spec === 'string' ? spec : new El(spec[0], spec[1], Array.isArray(spec[2]) ? spec[2].map(build) : spec[2]);
+"""
+
+
+def _run_in_fake_dom(spec, script, arg=None):
+    import json
+    import subprocess
+
+    program = (
+        _FAKE_DOM_JS
+        + f"const html = build({json.dumps(spec, ensure_ascii=False)});\n"
+        + "globalThis.document = {title: 't', readyState: 'complete', body: html.querySelector('body'),"
+        + " querySelectorAll: s => html.querySelectorAll(s), querySelector: s => html.querySelector(s)};\n"
+        + "globalThis.location = {href: 'https://www.nikkei.com/paper/article/'};\n"
+        + f"console.log(JSON.stringify(({script})({json.dumps(arg, ensure_ascii=False)})));\n"
+    )
+    done = subprocess.run(['node', '-'], input=program, capture_output=True, text=True, encoding='utf-8', check=True)
+    return json.loads(done.stdout)
+
+
+def test_parse_article_html_prefers_embedded_json_then_cmn_section():
+    import json
+
+    from scripts.nikkei_fetch_articles_full import parse_article_html
+
+    body = "\n".join(_article_paragraphs())
+    ld = json.dumps({'@type': 'NewsArticle', 'headline': '日本企業、設備投資を拡大', 'articleBody': body}, ensure_ascii=False)
+    html = (
+        '<html><head><title>日本企業、設備投資を拡大</title>'
+        f'<script type="application/ld+json">{ld}</script></head><body><header>メニュー ログイン</header>'
+        '<h1>日本企業、設備投資を拡大</h1><div class="cmn-section cmn-indent">'
+        + ''.join(f'<p>{t}</p>' for t in _article_paragraphs())
+        + '<div class="share">シェア</div></div></body></html>'
+    )
+    parsed = parse_article_html(html)
+    assert parsed['h1_text'] == '日本企業、設備投資を拡大'
+    assert [name for name, _ in parsed['candidates']] == ['embedded_json:json_ld', 'div.cmn-section.cmn-indent', '.cmn-section']
+    assert parsed['candidates'][0][1] == body
+    assert parsed['candidates'][1][1] == body
+    assert 'メニュー' not in parsed['page_text']
+
+
+def test_http_fetch_article_succeeds_or_reports_fallback_reason(tmp_path):
+    import json
+
+    from scripts.nikkei_fetch_articles_full import PolitenessLimiter, http_fetch_article, open_http_session
+
+    storage = tmp_path / 'state.json'
+    storage.write_text(json.dumps({'cookies': [{'name': 'sid', 'value': 'abc', 'domain': '.nikkei.com', 'path': '/'}]}), encoding='utf-8')
+    http = open_http_session(storage, pool_maxsize=2)
+    assert http.cookies.get('sid', domain='.nikkei.com') == 'abc'
+
+    url = 'https://www.nikkei.com/paper/article/?b=20261019&ng=DGKKZO1'
+    html = (
+        '<html><head><title>日本企業、設備投資を拡大</title></head><body><h1>日本企業、設備投資を拡大</h1>'
+        '<div class="cmn-section cmn-indent">' + ''.join(f'<p>{t}</p>' for t in _article_paragraphs()) + '</div></body></html>'
+    )
+
+    class FakeResponse:
+        def __init__(self, text, final_url=url, status_code=200):
+            self.text = text
+            self.url = final_url
+            self.status_code = status_code
+            self.encoding = 'utf-8'
+
+    class FakeHttp:
+        def __init__(self, response):
+            self.response = response
+
+        def get(self, target, timeout=None):
+            return self.response
+
+    limiter = PolitenessLimiter(0)
+    art = {'url': url, 'title': '日本企業、設備投資を拡大'}
+    out, reason = http_fetch_article(FakeHttp(FakeResponse(html)), limiter, 1, art, {})
+    assert reason == ''
+    assert out['res']['fetch_method'] == 'http'
+    assert out['res']['selector_used'] == 'http:div.cmn-section.cmn-indent'
+    assert out['inventory'][0]['status'] == 'fetched_new'
+
+    out, reason = http_fetch_article(FakeHttp(FakeResponse(html, final_url='https://www.nikkei.com/login')), limiter, 1, art, {})
+    assert out is None and reason == 'http_redirected'
+
+    teaser = '<html><body><h1>日本企業、設備投資を拡大</h1><div class="cmn-section">続きは会員限定です。ログイン</div></body></html>'
+    out, reason = http_fetch_article(FakeHttp(FakeResponse(teaser)), limiter, 1, art, {})
+    assert out is None and reason.startswith('http_')
+
+
+def test_wait_for_article_content_uses_single_in_page_check():
+    from scripts.nikkei_fetch_articles_full import READY_SELECTORS, wait_for_article_content
+
+    class FakeHandle:
+        def json_value(self):
+            return 'div.cmn-section.cmn-indent'
+
+    class FakePage:
+        def __init__(self, fail=False):
+            self.fail = fail
+            self.calls = []
+
+        def wait_for_function(self, script, arg=None, timeout=None):
+            self.calls.append((arg, timeout))
+            if self.fail:
+                raise TimeoutError('timeout')
+            return FakeHandle()
+
+    page = FakePage()
+    assert wait_for_article_content(page) == 'div.cmn-section.cmn-indent'
+    assert len(page.calls) == 1 and page.calls[0][0][0] == READY_SELECTORS
+    assert wait_for_article_content(FakePage(fail=True)) == ''
+
+
+def test_select_text_fast_mode_falls_back_to_full_diagnostics():
+    from scripts.nikkei_fetch_articles_full import FAST_SELECT_SCRIPT, select_text_with_candidates
+
+    body = "\n".join(_article_paragraphs())
+    full = {
+        'title': 't', 'h1Text': 'h', 'pageText': 'page', 'snippets': {'body': '<body>'},
+        'candidates': [
+            {'selector': 'div.cmn-section.cmn-indent', 'text': 'short', 'text_length': 5, 'link_text_ratio': 0},
+            {'selector': 'article', 'text': body, 'text_length': len(body), 'link_text_ratio': 0},
+        ],
+    }
+
+    class FakePage:
+        def __init__(self, fast_candidate):
+            self.fast_candidate = fast_candidate
+            self.scripts = []
+
+        def evaluate(self, script, arg=None):
+            self.scripts.append('fast' if script == FAST_SELECT_SCRIPT else 'full')
+            if script == FAST_SELECT_SCRIPT:
+                return {'title': 't', 'h1Text': 'h', 'snippets': {}, 'candidate': self.fast_candidate}
+            return full
+
+    fast = {'selector': 'div.cmn-section.cmn-indent', 'text': body, 'text_length': len(body), 'link_text_ratio': 0}
+    page = FakePage(fast)
+    data, title, candidates, best, page_text = select_text_with_candidates(page, diagnostics=False)
+    assert page.scripts == ['fast']
+    assert best is fast and candidates == [fast] and page_text == ''
+
+    page = FakePage({'selector': 'div.cmn-section.cmn-indent', 'text': 'short', 'text_length': 5, 'link_text_ratio': 0})
+    data, title, candidates, best, page_text = select_text_with_candidates(page, diagnostics=False)
+    assert page.scripts == ['fast', 'full']
+    # 全候補を評価した結果は従来どおり（短い本文もそのまま返し、判定は呼び出し側）。
+    assert best['text'] == 'short' and len(candidates) == 2 and page_text == 'page'
+
+    page = FakePage(fast)
+    select_text_with_candidates(page)
+    assert page.scripts == ['full']
+
+
+def test_fetch_checkpoint_resume_skips_completed_articles(tmp_path):
+    from contextlib import contextmanager
+
+    from scripts.nikkei_fetch_articles_full import FetchCheckpoint, merge_article_outcomes, run_article_pool
+    from src.stores.jsonl_log import read_jsonl
+
+    paths = {
+        'outcomes_path': tmp_path / 'outcomes.jsonl',
+        'checkpoint_path': tmp_path / 'checkpoint.json',
+        'articles_path': tmp_path / 'articles.jsonl',
+        'failed_path': tmp_path / 'failed.jsonl',
+        'inventory_path': tmp_path / 'inventory.jsonl',
+        'dom_path': tmp_path / 'dom.jsonl',
+    }
+    arts = [{'url': f'https://www.nikkei.com/paper/article/?ng={n}', 'title': str(n)} for n in range(1, 6)]
+    fetched = []
+
+    def outcome(i, a, ok):
+        return {
+            'index': i, 'res': {'url': a['url']} if ok else None,
+            'fail': [] if ok else [{'status': 'failed', 'url': a['url']}],
+            'inventory': [{'url': a['url']}], 'dom_logs': [], 'retry_without_resource_block_success': False,
+        }
+
+    def make_worker(crash_at=None, fail_urls=()):
+        @contextmanager
+        def open_worker():
+            def fetch(i, a):
+                if i == crash_at:
+                    raise RuntimeError('runner killed')
+                fetched.append(a['url'])
+                return outcome(i, a, a['url'] not in fail_urls)
+
+            yield fetch
+
+        return open_worker
+
+    checkpoint = FetchCheckpoint(resume=False, **paths)
+    try:
+        run_article_pool(arts, make_worker(crash_at=4, fail_urls={arts[1]['url']}), 1, 0, 0, done={}, on_outcome=checkpoint.record)
+    except RuntimeError:
+        pass
+    finally:
+        checkpoint.close()
+    assert [r['url'] for r in read_jsonl(paths['articles_path'])] == [arts[0]['url'], arts[2]['url']]
+    assert [r['url'] for r in read_jsonl(paths['failed_path'])] == [arts[1]['url']]
+
+    fetched.clear()
+    checkpoint = FetchCheckpoint(resume=True, **paths)
+    done = checkpoint.resumed_outcomes(arts)
+    assert sorted(done) == [1, 3]
+    outcomes = run_article_pool(arts, make_worker(), 1, 0, 0, done=done, on_outcome=checkpoint.record)
+    checkpoint.close()
+    # 失敗した記事と未処理の記事だけを取り直す。
+    assert fetched == [arts[1]['url'], arts[3]['url'], arts[4]['url']]
+    res, fail, _, _, attempted, _ = merge_article_outcomes(outcomes, 0, 0)
+    assert [r['url'] for r in res] == [a['url'] for a in arts] and fail == [] and attempted == 5
+    assert len(read_jsonl(paths['articles_path'])) == 5
+    assert json.loads(paths['checkpoint_path'].read_text(encoding='utf-8'))['completed_urls'] == [arts[n]['url'] for n in (0, 2, 1, 3, 4)]
+
+    # 成功上限は再開分も含めて数える。
+    fetched.clear()
+    checkpoint = FetchCheckpoint(resume=True, **paths)
+    outcomes = run_article_pool(arts, make_worker(), 1, 2, 0, done=checkpoint.resumed_outcomes(arts), on_outcome=checkpoint.record)
+    checkpoint.close()
+    assert fetched == [] and [o['index'] for o in outcomes] == [1, 2]
+
+
+def test_retry_policy_by_failure_class():
+    from collections import Counter
+
+    from scripts.nikkei_fetch_articles_full import next_attempt, parse_retry_policy
+
+    assert parse_retry_policy('timeout=1:5, paid_wall=2', 3)['timeout'] == (1, 5.0)
+    assert parse_retry_policy('timeout=1:5, paid_wall=2', 3)['paid_wall'] == (2, 0.0)
+
+    def plan(failure_class, attempts=4):
+        used, t, seen = Counter(), 0, [0]
+        while True:
+            t = next_attempt(failure_class, t, attempts, used)
+            if t is None:
+                return seen
+            seen.append(t)
+
+    # 既定（RETRIES=3 + 遮断なしの最終試行）: タイムアウトは従来どおり全試行。
+    assert plan('timeout') == [0, 1, 2, 3]
+    # 決定的な本文不正はブロック付きの再試行を省き、遮断なし試行だけ行う。
+    assert plan('invalid_body') == [0, 3]
+    assert plan('login_wall') == [0, 1]
+    assert plan('paid_wall') == [0]
+
+
+def test_login_wall_breaker_stops_scheduling():
+    from collections import Counter
+    from contextlib import contextmanager
+
+    from scripts.nikkei_fetch_articles_full import LoginWallBreaker, next_attempt, run_article_pool
+
+    breaker = LoginWallBreaker(3)
+    for wall in [True, True, False, True, True]:
+        breaker.record(wall)
+    assert not breaker.tripped
+    breaker.record(True)
+    assert breaker.tripped
+    assert next_attempt('timeout', 0, 4, Counter(), breaker) is None
+    assert not LoginWallBreaker(0).tripped
+
+    arts = [{'url': f'https://www.nikkei.com/paper/article/?ng={n}', 'title': str(n)} for n in range(1, 11)]
+    breaker = LoginWallBreaker(2)
+    fetched = []
+
+    @contextmanager
+    def open_worker():
+        def fetch(i, a):
+            fetched.append(i)
+            breaker.record(True)
+            return {'index': i, 'res': None, 'fail': [], 'inventory': [], 'dom_logs': [], 'retry_without_resource_block_success': False}
+
+        yield fetch
+
+    outcomes = run_article_pool(arts, open_worker, 1, 0, 0, stop=lambda: breaker.tripped)
+    assert fetched == [1, 2] and len(outcomes) == 2
+
+
+def test_main_uses_passed_browser_on_owner_thread_and_own_browser_elsewhere(tmp_path, monkeypatch):
+    import threading
+    from contextlib import contextmanager
+
+    import scripts.nikkei_fetch_articles_full as m
+
+    class FakePage:
+        def goto(self, url, timeout=None):
+            pass
+
+        def is_closed(self):
+            return False
+
+    class FakeContext:
+        def __init__(self):
+            self.closed = False
+
+        def new_page(self):
+            return FakePage()
+
+        def close(self):
+            self.closed = True
+
+    class FakeBrowser:
+        def __init__(self):
+            self.contexts = []
+            self.closed = False
+
+        def new_context(self, **kwargs):
+            self.contexts.append(FakeContext())
+            return self.contexts[-1]
+
+        def close(self):
+            self.closed = True
+
+    launched = []
+
+    class FakeChromium:
+        def launch(self, headless=True):
+            launched.append(FakeBrowser())
+            return launched[-1]
+
+    @contextmanager
+    def fake_sync_playwright():
+        yield type('P', (), {'chromium': FakeChromium()})()
+
+    # 2 ワーカーが 1 記事ずつ受け取ってから進むようにし、呼び出し元スレッドと別スレッドの両方を必ず通す。
+    barrier = threading.Barrier(2, timeout=10)
+    calls = []
+
+    def fake_fetch_article(session, limiter, i, a, existing_map, http=None, breaker=None):
+        barrier.wait()
+        session.open_page(m.BLOCK_HEAVY)
+        session.release(m.BLOCK_HEAVY)
+        calls.append((threading.get_ident(), session))
+        return {'index': i, 'res': {'url': a['url'], 'text': 'x'}, 'fail': [], 'inventory': [], 'dom_logs': [],
+                'retry_without_resource_block_success': False}
+
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(m, 'SKIP_EXISTING', False)
+    monkeypatch.setattr(m, 'HTTP_FIRST', False)
+    monkeypatch.setattr(m, 'BLOCK_HEAVY', True)
+    monkeypatch.setattr(m, 'REQUEST_POLICY', None)
+    monkeypatch.setattr(m, 'REUSE_CONTEXT', True)
+    monkeypatch.setattr(m, 'FETCH_WORKERS', 2)
+    monkeypatch.setattr(m, 'sync_playwright', fake_sync_playwright)
+    monkeypatch.setattr(m, 'fetch_article', fake_fetch_article)
+
+    arts = [{'url': f'https://www.nikkei.com/paper/article/?ng={n}', 'title': str(n)} for n in (1, 2)]
+    browser, context = FakeBrowser(), FakeContext()
+    assert m.main(arts=arts, browser=browser, context=context, resume=False) == 0
+
+    owner = threading.get_ident()
+    sessions = {tid: session for tid, session in calls}
+    assert len(calls) == 2 and owner in sessions and len(sessions) == 2
+    assert sessions[owner].browser is browser and sessions[owner].contexts_created == 0
+    assert not context.closed and browser.contexts == [] and not browser.closed
+    worker = next(s for tid, s in sessions.items() if tid != owner)
+    assert isinstance(worker.browser, m.LazyBrowser) and worker.browser.browser is launched[0]
+    assert len(launched) == 1 and launched[0].closed and launched[0].contexts[0].closed
+    assert len(json.loads((tmp_path / 'logs/nikkei_articles_full.json').read_text(encoding='utf-8'))) == 2
+
+
+def test_fast_and_full_selection_pick_same_body_on_page_with_json_ld(tmp_path, monkeypatch):
+    import scripts.nikkei_fetch_articles_full as m
+
+    monkeypatch.chdir(tmp_path)
+
+    body = "\n".join(_article_paragraphs())
+    candidate = {'selector': 'div.cmn-section.cmn-indent', 'text': body, 'text_length': len(body), 'preview': body[:240], 'link_text_ratio': 0}
+
+    class FakeHandle:
+        def json_value(self):
+            return 'div.cmn-section.cmn-indent'
+
+    class FakePage:
+        url = 'https://www.nikkei.com/paper/article/?ng=DGKKZO1'
+
+        def __init__(self):
+            self.scripts_removed = False
+
+        def goto(self, url, wait_until=None, timeout=None):
+            pass
+
+        def wait_for_function(self, script, arg=None, timeout=None):
+            return FakeHandle()
+
+        def evaluate(self, script, arg=None):
+            if script == m.FAST_SELECT_SCRIPT:
+                return {'title': '日本企業、設備投資を拡大', 'h1Text': '日本企業、設備投資を拡大', 'snippets': {}, 'candidate': candidate}
+            if 'application/ld+json' in script:
+                # 全候補の診断は <script> を DOM から取り除くため、その後は JSON-LD が見えない。
+                if self.scripts_removed:
+                    return {'articleBody': ''}
+                return {'articleBody': '日本企業が設備投資を拡大する。', 'source': 'json_ld'}
+            self.scripts_removed = True
+            return {'title': '日本企業、設備投資を拡大', 'h1Text': '日本企業、設備投資を拡大', 'pageText': body, 'snippets': {}, 'candidates': [candidate]}
+
+    class FakeSession:
+        def open_page(self, use_block):
+            return FakePage()
+
+        def release(self, use_block):
+            pass
+
+        def reuses(self, use_block):
+            return True
+
+    art = {'url': FakePage.url, 'title': '日本企業、設備投資を拡大'}
+    results = {}
+    for diagnostics in (False, True):
+        monkeypatch.setattr(m, 'DOM_DIAGNOSTICS', diagnostics)
+        out = m.fetch_article(FakeSession(), m.PolitenessLimiter(0), 1, art, {})
+        results[diagnostics] = (out['res']['selector_used'], out['res']['text'])
+    assert results[False] == results[True] == ('div.cmn-section.cmn-indent', m.clean_article_text(body))
+
+
+def test_nav_login_link_does_not_classify_failure_as_login_wall(tmp_path, monkeypatch):
+    import scripts.nikkei_fetch_articles_full as m
+
+    monkeypatch.chdir(tmp_path)
+    nav = 'メニュー 日経ID ログイン 購読のお申し込み'
+
+    class FakePage:
+        url = 'https://www.nikkei.com/paper/article/?ng=DGKKZO1'
+
+        def __init__(self, body):
+            self.body = body
+
+        def goto(self, url, wait_until=None, timeout=None):
+            pass
+
+        def wait_for_function(self, script, arg=None, timeout=None):
+            raise TimeoutError('not ready')
+
+        def wait_for_timeout(self, ms):
+            pass
+
+        def evaluate(self, script, arg=None):
+            candidate = {'selector': 'div.cmn-section.cmn-indent', 'text': self.body, 'text_length': len(self.body), 'preview': self.body, 'link_text_ratio': 0}
+            if script == m.FAST_SELECT_SCRIPT:
+                return {'title': '日本企業、設備投資を拡大', 'h1Text': '', 'snippets': {}, 'candidate': candidate}
+            if 'application/ld+json' in script:
+                return {'articleBody': ''}
+            if 'candidates: out' in script:
+                # 全候補の診断はヘッダー/ナビを取り除いた本文テキストを返す。
+                return {'title': '日本企業、設備投資を拡大', 'h1Text': '', 'pageText': self.body, 'snippets': {}, 'candidates': [candidate]}
+            # 生の innerText にはナビの「ログイン」「購読」が含まれる。
+            return nav + '\n' + self.body
+
+    class FakeSession:
+        def __init__(self, body):
+            self.body = body
+
+        def open_page(self, use_block):
+            return FakePage(self.body)
+
+        def release(self, use_block):
+            pass
+
+        def reuses(self, use_block):
+            return True
+
+        def reset(self, reason):
+            pass
+
+    art = {'url': FakePage.url, 'title': '日本企業、設備投資を拡大'}
+    breaker = m.LoginWallBreaker(1)
+    out = m.fetch_article(FakeSession('日本企業が設備投資を拡大する。'), m.PolitenessLimiter(0), 1, art, {}, breaker=breaker)
+    assert out['res'] is None
+    assert set(out['attempt_failure_classes']) == {'invalid_body'}
+    assert out['fail'][0]['failure_class'] == 'invalid_body' and not out['fail'][0]['is_login_wall_detected']
+    assert not breaker.tripped
+
+    out = m.fetch_article(FakeSession('この記事を読むにはログインしてください。'), m.PolitenessLimiter(0), 2, art, {}, breaker=breaker)
+    assert out['attempt_failure_classes'][0] == 'login_wall' and breaker.tripped
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is required to run the in-page selection scripts')
+def test_fast_selection_skips_preferred_selector_inside_removal_container():
+    from scripts.nikkei_fetch_articles_full import select_text_with_candidates
+
+    related = [['p', {}, f"関連記事: 別の企業も設備投資を拡大する方針を示した。第{i}報。"] for i in range(1, 12)]
+    spec = ['html', {}, [
+        ['body', {}, [
+            ['h1', {}, '日本企業、設備投資を拡大'],
+            ['aside', {'class': 'related'}, [['div', {'class': 'cmn-section'}, related]]],
+            ['article', {}, [['p', {}, t] for t in _article_paragraphs()]],
+        ]],
+    ]]
+
+    class FakePage:
+        def evaluate(self, script, arg=None):
+            # 全候補の診断は DOM を書き換えるため、毎回まっさらな DOM で実行する。
+            return _run_in_fake_dom(spec, script, arg)
+
+    fast = select_text_with_candidates(FakePage(), diagnostics=False)[3]
+    full = select_text_with_candidates(FakePage(), diagnostics=True)[3]
+    assert fast['selector'] == full['selector'] == 'paragraph_fallback'
+    assert fast['text'] == full['text'] and '関連記事' not in fast['text']
+
+
+def test_main_exits_non_zero_when_login_wall_breaker_trips(tmp_path, monkeypatch):
+    import scripts.nikkei_fetch_articles_full as m
+
+    fetched = []
+
+    def fake_fetch_article(session, limiter, i, a, existing_map, http=None, breaker=None):
+        fetched.append(i)
+        breaker.record(True)
+        return {'index': i, 'res': None, 'fail': [{'status': 'failed', 'url': a['url'], 'is_login_wall_detected': True}],
+                'inventory': [], 'dom_logs': [], 'retry_without_resource_block_success': False}
+
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(m, 'SKIP_EXISTING', False)
+    monkeypatch.setattr(m, 'HTTP_FIRST', False)
+    monkeypatch.setattr(m, 'FETCH_WORKERS', 1)
+    monkeypatch.setattr(m, 'LOGIN_WALL_BREAKER_THRESHOLD', 2)
+    monkeypatch.setattr(m, 'REQUEST_POLICY', None)
+    monkeypatch.setattr(m, 'fetch_article', fake_fetch_article)
+
+    arts = [{'url': f'https://www.nikkei.com/paper/article/?ng={n}', 'title': str(n)} for n in range(1, 6)]
+    assert m.main(arts=arts, browser=object(), context=object(), resume=False) == 1
+    assert fetched == [1, 2]
+    summary = json.loads((tmp_path / 'logs/nikkei_fetch_summary.json').read_text(encoding='utf-8'))
+    assert summary['login_wall_breaker_tripped'] and summary['systemic_failure_reason'] == 'login_state_invalid'
@@ -0,0 +1,95 @@
+import re
+
+from src.pattern_engine import (
+    compile_user_pattern,
+    find_backtracking_risks,
+    pattern_stats_snapshot,
+    reset_pattern_engine,
+    search_user_pattern,
+)
+
+
+def setup_function():
+    reset_pattern_engine()
+
+
+def test_nested_quantifier_is_rejected_and_never_matches():
+    errors, _ = find_backtracking_risks(r"(a+)+$")
+    assert errors == ["nested_quantifier"]
+    entry = compile_user_pattern(r"(\w+\s?)*$", label="t")
+    assert entry.status == "rejected"
+    assert search_user_pattern(r"(\w+\s?)*$", "abc def") is None
+
+
+def test_config_patterns_pass_validation():
+    for pattern in [
+        r"https://www\.kallanish\.com/en/news/[^\"\s]+",
+        r"\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{2}",
+        r"news-t(\d{4})(\d{2})(\d{2})\d+\.html",
+        r"(?:\d{2}){1,3}",
+    ]:
+        errors, warnings = find_backtracking_risks(pattern)
+        assert errors == []
+        assert warnings == []
+
+
+def test_invalid_pattern_does_not_raise():
+    entry = compile_user_pattern("([unclosed", label="t")
+    assert entry.status == "invalid"
+    assert search_user_pattern("([unclosed", "anything") is None
+
+
+def test_input_is_capped_and_cost_is_recorded(monkeypatch):
+    monkeypatch.setattr("src.pattern_engine.PATTERN_MAX_INPUT_CHARS", 10)
+    assert search_user_pattern(r"\d{4}", "x" * 20 + "2026") is None
+    m = search_user_pattern(r"\d{4}", "2026/04/05", flags=re.DOTALL)
+    assert m.group(0) == "2026"
+    stats = pattern_stats_snapshot()
+    assert stats[r"\d{4}"]["truncated_inputs"] == 1
+    assert stats[f"\\d{{4}} (flags={int(re.DOTALL)})"]["matches"] == 1
+
+
+def test_slow_pattern_is_stopped_and_tripped(monkeypatch):
+    monkeypatch.setattr("src.pattern_engine.PATTERN_MATCH_TIMEOUT_MS", 50)
+    pattern = r"(a|aa)+$"
+    assert "quantified_alternation" in compile_user_pattern(pattern).warnings
+    assert search_user_pattern(pattern, "a" * 60 + "b") is None
+    assert compile_user_pattern(pattern).tripped is True
+    assert search_user_pattern(pattern, "aa") is None
+    assert pattern_stats_snapshot()[pattern]["timeouts"] == 1
+
+
+def test_budget_stops_slow_pattern_in_worker_thread(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr("src.pattern_engine.PATTERN_MATCH_TIMEOUT_MS", 50)
+    pattern = r"(a|aa)+$"
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # 中断されなければ数十秒以上かかる入力。
+        future = pool.submit(search_user_pattern, pattern, "a" * 80 + "b")
+        assert future.result(timeout=5) is None
+    assert compile_user_pattern(pattern).tripped is True
+    stats = pattern_stats_snapshot()[pattern]
+    assert stats["timeouts"] == 1 and stats["max_ms"] < 2000
+
+
+def test_single_slow_wall_clock_call_is_recorded_but_does_not_trip(monkeypatch):
+    clock = iter(i * 0.3 for i in range(100))
+    monkeypatch.setattr("src.pattern_engine.time.perf_counter", lambda: next(clock))
+    monkeypatch.setattr("src.pattern_engine.PATTERN_SLOW_CALLS_TO_TRIP", 2)
+    pattern = r"/slow-clock/\d+"
+
+    # スレッドの待ちなどで 1 回だけ予算を超えても、パターンは使い続ける。
+    assert search_user_pattern(pattern, "/slow-clock/1").group(0) == "/slow-clock/1"
+    assert compile_user_pattern(pattern).tripped is False
+    stats = pattern_stats_snapshot()[pattern]
+    assert stats["slow_calls"] == 1 and stats["timeouts"] == 0
+
+    monkeypatch.setattr("src.pattern_engine.time.perf_counter", lambda: 0.0)
+    search_user_pattern(pattern, "/slow-clock/2")
+    monkeypatch.setattr("src.pattern_engine.time.perf_counter", lambda: next(clock))
+    search_user_pattern(pattern, "/slow-clock/3")
+    assert compile_user_pattern(pattern).tripped is False
+    search_user_pattern(pattern, "/slow-clock/4")
+    assert compile_user_pattern(pattern).tripped is True
+    assert pattern_stats_snapshot()[pattern]["slow_calls"] == 3
@@ -0,0 +1,91 @@
+from src.sources.request_policy import RequestPolicy, request_policy_from_env
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self):
+        self.action = ""
+
+    def abort(self):
+        self.action = "abort"
+
+    def continue_(self):
+        self.action = "continue"
+
+
+class FakeResponse:
+    def __init__(self, url, length):
+        self.url = url
+        self.headers = {"content-length": str(length)}
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+        self.handlers = []
+
+    def route(self, pattern, handler):
+        self.routes.append(handler)
+
+    def on(self, event, handler):
+        self.handlers.append((event, handler))
+
+
+def test_policy_blocks_types_blocklist_and_optionally_third_party():
+    policy = RequestPolicy(
+        block_types=["image", "stylesheet"],
+        first_party=["nikkei.com"],
+        blocklist=["doubleclick.net"],
+    )
+    assert policy.decide("https://www.nikkei.com/paper/article/?ng=1", "document") == ""
+    assert policy.decide("https://www.nikkei.com/a.css", "stylesheet") == "type:stylesheet"
+    assert policy.decide("https://ad.doubleclick.net/x", "document") == "blocklist"
+    assert policy.decide("https://cdn.example.net/app.js", "script") == ""
+    assert policy.decide("https://assets.nikkei.com/app.js", "script") == ""
+
+    strict = RequestPolicy(first_party=["nikkei.com"], block_third_party=True)
+    assert strict.decide("https://cdn.example.net/app.js", "script") == "third_party"
+    assert strict.decide("https://assets.nikkei.com/app.js", "script") == ""
+    assert strict.decide("https://cdn.example.net/frame.html", "document") == ""
+
+
+def test_policy_installs_once_and_counts_requests_and_bytes():
+    policy = RequestPolicy(block_types=["font"], first_party=["nikkei.com"], blocklist=["taboola.com"])
+    context = FakeContext()
+    policy.install(context)
+    policy.install(context)
+    assert len(context.routes) == 1 and len(context.handlers) == 1
+
+    handler = context.routes[0]
+    on_response = context.handlers[0][1]
+    for url, kind in [
+        ("https://www.nikkei.com/x.woff2", "font"),
+        ("https://cdn.taboola.com/t.js", "script"),
+        ("https://www.nikkei.com/app.js", "script"),
+    ]:
+        route = FakeRoute()
+        handler(route, FakeRequest(url, kind))
+        assert route.action == ("continue" if url.endswith("app.js") else "abort")
+    on_response(FakeResponse("https://www.nikkei.com/app.js", 2048))
+    on_response(FakeResponse("https://cdn.example.net/lib.js", 100))
+
+    assert policy.summary() == {
+        "blocked_requests": 2,
+        "blocked_by_reason": {"blocklist": 1, "type:font": 1},
+        "allowed_requests": 2,
+        "allowed_third_party_requests": 1,
+        "allowed_bytes": 2148,
+    }
+
+
+def test_policy_from_env():
+    assert request_policy_from_env({"NIKKEI_BLOCK_HEAVY_RESOURCES": "false"}) is None
+    policy = request_policy_from_env({"NIKKEI_BLOCK_RESOURCE_TYPES": "image, Stylesheet", "NIKKEI_THIRD_PARTY_BLOCKLIST": ".ads.example"})
+    assert policy.block_types == {"image", "stylesheet"}
+    assert policy.blocklist == ("ads.example",)
+    assert "stylesheet" in request_policy_from_env({}).block_types